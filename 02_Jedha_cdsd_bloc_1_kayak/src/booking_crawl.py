@@ -0,0 +1,99 @@
+import os
+import logging
+import argparse
+import scrapy
+from scrapy.crawler import CrawlerProcess
+
+from feed_io import feed_options
+from polite_crawl import polite_settings
+from hotel_store import incremental_settings
+from booking_url_hotel import BookingURLSpider, BOOKING_URL, DATA_DIR
+from booking_info_hotel import BookingDetailsSpider
+
+
+def is_hotel_url(item):
+    return 'nom' not in item
+
+
+class HotelURLFilter:
+    """Filtre de feed : seulement les URLs d'hôtels (fichier intermédiaire)"""
+
+    def __init__(self, feed_options):
+        self.feed_options = feed_options
+
+    def accepts(self, item):
+        return is_hotel_url(item)
+
+
+class HotelDetailsFilter(HotelURLFilter):
+    """Filtre de feed : seulement les fiches hôtels"""
+
+    def accepts(self, item):
+        return not is_hotel_url(item)
+
+
+class BookingCrawlSpider(BookingURLSpider, BookingDetailsSpider):
+    """
+    Recherche et fiches hôtels dans un seul crawl : chaque lien trouvé sur une page de résultats
+    est demandé aussitôt (dédoublonné), sans attendre la fin de la recherche ni de fichier intermédiaire.
+    """
+    name = "booking_crawl"
+
+    custom_settings = polite_settings()
+
+    def __init__(self, keep_urls=False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.keep_urls = keep_urls  # renvoyer aussi les URLs comme items (fichier intermédiaire)
+
+    def parse(self, response):
+        """Page de résultats : page suivante et fiches des nouveaux hôtels"""
+        for result in super().parse(response):
+            if isinstance(result, scrapy.Request):
+                yield result
+                continue
+            if self.keep_urls:
+                yield result
+            request = self.hotel_request(result['url'], result['city'])
+            if request is not None:
+                # Priorité aux fiches : elles avancent pendant que la recherche continue
+                yield request.replace(priority=1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Recherche + détails des hôtels Booking en un seul crawl")
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'hotels_details.json'),
+                        help=".json (réécrit) ou .jsonl / .jsonl.gz (ajout au fil du crawl)")
+    parser.add_argument('--urls-output', default=None, help="écrire aussi les URLs trouvées (optionnel)")
+    parser.add_argument('--base-url', default=BOOKING_URL, help="autre serveur, ex. booking_stub.py")
+    parser.add_argument('--cities', default=None, help="villes séparées par des virgules (par défaut : cities_weather.csv)")
+    parser.add_argument('--max-pages', type=int, default=3, help="pages de résultats par ville")
+    parser.add_argument('--max-hotels', type=int, default=None, help="hôtels par ville (tous par défaut)")
+    parser.add_argument('--concurrency', type=int, default=4, help="requêtes simultanées max par domaine")
+    parser.add_argument('--min-delay', type=float, default=1.0, help="délai minimum entre deux requêtes")
+    parser.add_argument('--incremental', action='store_true', help="voir booking_info_hotel.py")
+    parser.add_argument('--store', default=os.path.join(DATA_DIR, 'hotels_store.sqlite'))
+    parser.add_argument('--max-age-days', type=float, default=7)
+    parser.add_argument('--cache-dir', default=os.path.join(DATA_DIR, 'httpcache'))
+    parser.add_argument('--job-dir', default=None)
+    args = parser.parse_args()
+
+    BookingCrawlSpider.custom_settings = polite_settings(max_concurrency=args.concurrency, min_delay=args.min_delay)
+
+    settings = {'LOG_LEVEL': logging.INFO, 'FEEDS': {}}
+    if args.job_dir:
+        settings['JOBDIR'] = args.job_dir
+    spider_args = {'cities': args.cities, 'base_url': args.base_url, 'max_pages': args.max_pages, 'max_hotels': args.max_hotels}
+    if args.incremental:
+        # Fiches exportées depuis le store à la fin, comme booking_info_hotel.py --incremental
+        settings.update(incremental_settings(args.cache_dir, args.job_dir))
+        spider_args.update(store_path=args.store, max_age_days=args.max_age_days, export_path=args.output)
+    else:
+        settings['FEEDS'][args.output] = feed_options(args.output, encoding='utf-8', indent=2,
+                                                      item_filter=HotelDetailsFilter)
+    if args.urls_output:
+        settings['FEEDS'][args.urls_output] = feed_options(args.urls_output, item_filter=HotelURLFilter)
+        spider_args['keep_urls'] = True
+
+    process = CrawlerProcess(settings=settings)
+    process.crawl(BookingCrawlSpider, **spider_args)
+    process.start()
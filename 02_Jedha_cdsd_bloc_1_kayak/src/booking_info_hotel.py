@@ -1,7 +1,132 @@
+import os
 import logging
+import argparse
 import scrapy
+from scrapy import signals
 from scrapy.crawler import CrawlerProcess
-import json
+
+from feed_io import feed_options, iter_items
+from hotel_store import HotelStore, incremental_settings
+from selector_engine import FieldChain, SelectorStats, json_ld_hotel, json_ld_text
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+# Sélecteurs de repli de chaque champ, dans l'ordre d'essai
+NOM_SELECTORS = [
+    ('css', 'h2.pp-header__title::text'),
+    ('css', 'h2[data-testid="property-name"]::text'),
+    ('xpath', '//*[@id="hp_hotel_name"]/div/h2/text()'),
+    ('css', 'h1.d2fee87262::text'),
+]
+# Note globale (ex: 8.5)
+NOTE_SELECTORS = [
+    ('css', 'div.b5cd09854e::text'),
+    ('css', 'div[data-testid="review-score-component"] div::text'),
+    ('xpath', '//*[@id="js--hp-gallery-scorecard"]/a/div/div/div/div[2]/text()'),
+]
+ADRESSE_SELECTORS = [
+    ('css', 'span.hp_address_subtitle::text'),
+    ('css', 'span[data-node_tt_id="location_score_tooltip"]::text'),
+    ('xpath', '//*[@id="wrap-hotelpage-top"]/div[3]/div/div/div/div/div/span[1]/button/div/text()'),
+]
+# Essayer de construire l'adresse depuis plusieurs éléments
+ADRESSE_PARTS_SELECTORS = [('css', 'p.address span::text')]
+# La description est souvent dans plusieurs paragraphes
+DESCRIPTION_SELECTORS = [
+    ('css', 'div#property_description_content p::text'),
+    ('css', 'div.hp_desc_main_content p::text'),
+    ('xpath', '//*[@id="basiclayout"]/div/div[3]/div[1]/div[1]/div[1]/div[1]/div/div/p[1]/text()'),
+]
+# Si pas de description complète, un texte plus court
+DESCRIPTION_SHORT_SELECTORS = [('css', 'div.a53cbfa6de::text')]
+
+
+def json_ld_note(rating):
+    """aggregateRating.ratingValue au format du texte de la page ('Avec une note de 8.5', '... de 9')"""
+    value = rating.get('ratingValue') if isinstance(rating, dict) else None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = f'{value:g}'
+    value = json_ld_text(value)
+    return f"Avec une note de {value}" if value else None
+
+
+def json_ld_address(address):
+    """Adresse JSON-LD (texte ou PostalAddress) en une ligne"""
+    if not isinstance(address, dict):
+        return json_ld_text(address)
+    street = json_ld_text(address.get('streetAddress')) or ''
+    parts = [street]
+    for key in ('postalCode', 'addressLocality', 'addressCountry'):
+        value = address.get(key)
+        value = str(value) if isinstance(value, int) and not isinstance(value, bool) else json_ld_text(value)
+        if value and value not in street:
+            parts.append(value)
+    return ', '.join(part for part in parts if part) or None
+
+
+class HotelExtractor:
+    """
+    Champs d'une fiche hôtel en un passage, avec les chaînes de sélecteurs compilées une seule fois.
+    `json_ld=True` lit d'abord nom, note et adresse dans le bloc JSON-LD de la page ; désactivé par
+    défaut : sur les vraies pages, ces valeurs peuvent différer du texte affiché (à vérifier avec
+    parse_bench.py --httpcache avant de l'activer).
+
+    Les succès de chaque sélecteur sont comptés (`stats`) ; avec `reorder_every`, les chaînes sont
+    réordonnées toutes les N pages pour essayer d'abord les sélecteurs qui trouvent le plus souvent
+    (désactivé par défaut : si deux sélecteurs trouvent, l'ordre change la valeur gardée).
+    `backend='parsel'` refait les appels response.css / xpath d'origine (pour le benchmark).
+    """
+
+    def __init__(self, json_ld=False, backend='compiled', reorder_every=None):
+        self.json_ld = json_ld
+        self.backend = backend
+        self.reorder_every = reorder_every
+        self.stats = SelectorStats()
+        self.pages = 0
+        self.chains = {
+            'nom': FieldChain('nom', NOM_SELECTORS),
+            'note': FieldChain('note', NOTE_SELECTORS),
+            'adresse': FieldChain('adresse', ADRESSE_SELECTORS),
+            'adresse_parts': FieldChain('adresse_parts', ADRESSE_PARTS_SELECTORS, many=True),
+            'description': FieldChain('description', DESCRIPTION_SELECTORS, many=True),
+            'description_short': FieldChain('description_short', DESCRIPTION_SHORT_SELECTORS),
+        }
+
+    def field(self, response, name):
+        chain = self.chains[name]
+        if self.backend == 'parsel':
+            return chain.extract_parsel(response, self.stats)
+        return chain.extract(response.selector.root, self.stats, response.body)
+
+    def extract(self, response):
+        """{'nom', 'note', 'adresse', 'description'} bruts (None si introuvable)"""
+        fields = dict.fromkeys(('nom', 'note', 'adresse', 'description'))
+        if self.json_ld:
+            hotel = json_ld_hotel(response.selector.root, response.body)
+            self.stats.record('json_ld', 'json-ld:Hotel', hotel is not None)
+            if hotel is not None:
+                fields['nom'] = json_ld_text(hotel.get('name'))
+                fields['note'] = json_ld_note(hotel.get('aggregateRating'))
+                fields['adresse'] = json_ld_address(hotel.get('address'))
+
+        for name in ('nom', 'note', 'adresse'):
+            if not fields[name]:
+                fields[name] = self.field(response, name)
+        if not fields['adresse']:
+            adresse_parts = self.field(response, 'adresse_parts')
+            fields['adresse'] = ' '.join(adresse_parts) if adresse_parts else None
+
+        description_parts = self.field(response, 'description')
+        fields['description'] = ' '.join(description_parts).strip() if description_parts else None
+        if not fields['description']:
+            fields['description'] = self.field(response, 'description_short')
+
+        self.pages += 1
+        if self.reorder_every and self.pages % self.reorder_every == 0:
+            for chain in self.chains.values():
+                chain.reorder(self.stats)
+        return fields
+
 
 class BookingDetailsSpider(scrapy.Spider):
     name = "booking_details"
@@ -15,29 +140,55 @@ class BookingDetailsSpider(scrapy.Spider):
         'DOWNLOAD_TIMEOUT': 60,
         'RETRY_TIMES': 3,
     }
-    
-    def start_requests(self):
-        """Charge les URLs depuis le fichier JSON"""
-        # Chemin vers votre fichier JSON avec les URLs
-        json_path = r'..\data\all_cities_urls_hotels.json'
-        
-        # Charger le JSON
-        with open(json_path, 'r', encoding='utf-8') as f:
-            hotels_data = json.load(f)
-        
-        self.logger.info(f"📂 Chargement de {len(hotels_data)} URLs d'hôtels")
+
+    def __init__(self, urls_path=os.path.join(DATA_DIR, 'all_cities_urls_hotels.json'), store_path=None,
+                 max_age_days=7, export_path=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.urls_path = urls_path
+        # Mode incrémental : fiches déjà extraites gardées dans SQLite, les récentes ne sont pas redemandées
+        self.store = HotelStore(store_path) if store_path else None
+        self.max_age = float(max_age_days) * 24 * 3600
+        self.fresh_urls = self.store.fresh_urls(self.max_age) if self.store is not None else set()
+        self.export_path = export_path
+        self.scheduled_urls = set()  # URLs déjà demandées (un hôtel peut apparaître pour deux villes)
+        self.extractor = HotelExtractor()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+        return spider
+
+    async def start(self):
+        """Lit les URLs au fil du fichier (.json, .jsonl ou .jsonl.gz)"""
+        self.logger.info(f"📂 Lecture des URLs d'hôtels depuis {self.urls_path}")
+        if self.fresh_urls:
+            self.logger.info(f"⏭️  {len(self.fresh_urls)} hôtels extraits depuis moins de {self.max_age / 86400:g} jours ignorés")
         
         # Créer une requête pour chaque URL
-        for hotel in hotels_data:
-            url = hotel['url']
-            city = hotel['city']
-            
-            yield scrapy.Request(
-                url=url,
-                callback=self.parse_hotel,
-                meta={'city': city, 'url': url},
-                errback=self.handle_error
-            )
+        count = 0
+        for hotel in iter_items(self.urls_path):
+            count += 1
+            request = self.hotel_request(hotel['url'], hotel['city'])
+            if request is not None:
+                yield request
+        self.logger.info(f"📂 {count} URLs d'hôtels lues")
+
+    def hotel_request(self, url, city):
+        """Requête de la fiche d'un hôtel, None s'il est déjà demandé ou extrait récemment"""
+        if url in self.fresh_urls:
+            self.crawler.stats.inc_value('incremental/skipped_fresh')
+            return None
+        if url in self.scheduled_urls:
+            self.crawler.stats.inc_value('hotels/duplicate_url')
+            return None
+        self.scheduled_urls.add(url)
+        return scrapy.Request(
+            url=url,
+            callback=self.parse_hotel,
+            meta={'city': city, 'url': url},
+            errback=self.handle_error
+        )
     
     def parse_hotel(self, response):
         """Extrait les détails d'un hôtel"""
@@ -47,58 +198,10 @@ class BookingDetailsSpider(scrapy.Spider):
         # Log pour suivi
         self.logger.info(f"🏨 Extraction: {response.url}")
         
-        # === NOM DE L'HÔTEL ===
-        # Plusieurs sélecteurs possibles
-        nom = response.css('h2.pp-header__title::text').get()
-        if not nom:
-            nom = response.css('h2[data-testid="property-name"]::text').get()
-        if not nom:
-            nom = response.xpath('//*[@id="hp_hotel_name"]/div/h2/text()').get()
-            # nom = response.xpath('//h2[@class="hp__hotel-name"]/text()').get()
-        if not nom:
-            nom = response.css('h1.d2fee87262::text').get()
-        
-        # === Note ===
-        # Note globale (ex: 8.5)
-        note = response.css('div.b5cd09854e::text').get()
-        if not note:
-            note = response.css('div[data-testid="review-score-component"] div::text').get() 
-        if not note:
-            note = response.xpath('//*[@id="js--hp-gallery-scorecard"]/a/div/div/div/div[2]/text()').get()
-        
-            # note = response.xpath('//div[@class="b5cd09854e d10a6220b4"]/text()').get() #//*[@id="js--hp-gallery-scorecard"] //*[@id="js--hp-gallery-scorecard"]/a/div/div/div/div[1]  //*[@id="js--hp-gallery-scorecard"]/a/div/div/div/div[2]
-        
-        # # Nombre d'avis
-        # nb_avis = response.css('div.d8eab2cf7f::text').get()
-        # if not nb_avis:
-        #     nb_avis = response.css('div[data-testid="review-score-component"] span::text').get()
-        
-        # === ADRESSE COMPLÈTE ===
-        adresse = response.css('span.hp_address_subtitle::text').get()
-        if not adresse:
-            adresse = response.css('span[data-node_tt_id="location_score_tooltip"]::text').get()
-        if not adresse:
-            adresse = response.xpath('//*[@id="wrap-hotelpage-top"]/div[3]/div/div/div/div/div/span[1]/button/div/text()').get()
-            # adresse = response.xpath('//span[@data-node_tt_id="location_score_tooltip"]/text()').get()
-        if not adresse:
-            # Essayer de construire l'adresse depuis plusieurs éléments
-            adresse_parts = response.css('p.address span::text').getall()
-            adresse = ' '.join(adresse_parts) if adresse_parts else None
-        
-        # === DESCRIPTION ===
-        # La description est souvent dans plusieurs paragraphes
-        description_parts = response.css('div#property_description_content p::text').getall()
-        if not description_parts:
-            description_parts = response.css('div.hp_desc_main_content p::text').getall()
-        if not description_parts:
-            description_parts = response.xpath('//*[@id="basiclayout"]/div/div[3]/div[1]/div[1]/div[1]/div[1]/div/div/p[1]/text()').getall()
-            # description_parts = response.xpath('//div[@id="property_description_content"]//p/text()').getall()
-        
-        description = ' '.join(description_parts).strip() if description_parts else None
-        
-        # Si pas de description complète, essayer un texte plus court
-        if not description:
-            description = response.css('div.a53cbfa6de::text').get()
+        # === NOM, NOTE, ADRESSE, DESCRIPTION ===
+        # Sélecteurs de repli compilés (voir HotelExtractor)
+        fields = self.extractor.extract(response)
+        nom, note, adresse, description = (fields[key] for key in ('nom', 'note', 'adresse', 'description'))
         
         # # === INFORMATIONS SUPPLÉMENTAIRES (BONUS) ===
         # # Prix (si disponible)
@@ -130,6 +233,10 @@ class BookingDetailsSpider(scrapy.Spider):
         
         # Log de confirmation
         self.logger.info(f"✅ Extrait: {hotel_data['nom']} - Note: {hotel_data['note']}")
+
+        if self.store is not None:
+            status = self.store.save(hotel_data)  # 'new', 'changed' ou 'unchanged'
+            self.crawler.stats.inc_value(f'incremental/{status}')
         
         yield hotel_data
     
@@ -138,26 +245,50 @@ class BookingDetailsSpider(scrapy.Spider):
         self.logger.error(f"❌ Erreur lors du scraping: {failure.value}")
         self.logger.error(f"URL concernée: {failure.request.url}")
 
+    def spider_closed(self, spider, reason):
+        """Mode incrémental : réécrit le fichier de sortie avec toutes les fiches connues"""
+        if self.store is None:
+            return
+        if self.export_path:
+            self.store.export(self.export_path)
+            self.logger.info(f"💾 {len(self.store)} hôtels écrits dans {self.export_path} (arrêt : {reason})")
+        self.store.close()
+
 
 # === CONFIGURATION ET LANCEMENT ===
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Détails des hôtels Booking")
+    parser.add_argument('--urls', default=os.path.join(DATA_DIR, 'all_cities_urls_hotels.json'),
+                        help=".json, .jsonl ou .jsonl.gz")
     # Fichier de sortie pour les détails
-    output_path = r'C:\Users\alber\Desktop\visual_studio_code\dossier_jedha\Jedha_Full_stack\03_Data_Collection_&_Management_(DCM)\00- projet kayak\data\hotels_details.json'
-    
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'hotels_details.json'),
+                        help=".json (réécrit) ou .jsonl / .jsonl.gz (ajout au fil du crawl)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="ne redemande que les hôtels anciens, requêtes conditionnelles via le cache HTTP")
+    parser.add_argument('--store', default=os.path.join(DATA_DIR, 'hotels_store.sqlite'))
+    parser.add_argument('--max-age-days', type=float, default=7, help="fraîcheur d'une fiche en mode incrémental")
+    parser.add_argument('--cache-dir', default=os.path.join(DATA_DIR, 'httpcache'))
+    parser.add_argument('--job-dir', default=None, help="sauvegarde de la file : relancer avec le même dossier pour reprendre")
+    args = parser.parse_args()
+
     # Configuration du processus
-    process = CrawlerProcess(settings={
+    settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'LOG_LEVEL': logging.INFO,
-        'FEEDS': {
-            output_path: {
-                "format": "json",
-                'overwrite': True,
-                'encoding': 'utf-8',
-                'indent': 2
-            },
+    }
+    if args.job_dir:
+        settings['JOBDIR'] = args.job_dir
+    if args.incremental:
+        # La sortie est réécrite depuis le store à la fin (fiches des runs précédents comprises)
+        settings.update(incremental_settings(args.cache_dir, args.job_dir))
+        spider_args = {'store_path': args.store, 'max_age_days': args.max_age_days, 'export_path': args.output}
+    else:
+        settings['FEEDS'] = {
+            args.output: feed_options(args.output, encoding='utf-8', indent=2),
         }
-    })
+        spider_args = {}
+    process = CrawlerProcess(settings=settings)
     
     # Lancement du spider
-    process.crawl(BookingDetailsSpider)
+    process.crawl(BookingDetailsSpider, urls_path=args.urls, **spider_args)
     process.start()
\ No newline at end of file
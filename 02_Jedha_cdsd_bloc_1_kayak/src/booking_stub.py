@@ -0,0 +1,231 @@
+"""
+Faux Booking local pour tester les spiders sans réseau.
+
+Sert les pages sauvegardées de `--pages-dir` (searchresults/<ville>_<offset>.html,
+hotel/<slug>.html) et génère sinon des pages synthétiques avec le même balisage.
+Peut simuler la latence et la limite de débit du vrai site (429 + Retry-After).
+Les pages ont un ETag / Last-Modified et répondent 304 aux requêtes conditionnelles.
+
+    python booking_stub.py --port 8000 --latency 0.2 --max-rps 20
+    python booking_url_hotel.py --base-url http://127.0.0.1:8000
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import random
+import argparse
+import threading
+import unicodedata
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from email.utils import formatdate
+
+RESULTS_PER_PAGE = 25
+SYNTHETIC_LAST_MODIFIED = formatdate(1735689600, usegmt=True)  # 2025-01-01, pages synthétiques
+
+
+def slugify(text):
+    """'Gorges du Verdon' -> 'gorges-du-verdon'"""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def search_page(city, offset, hotels_per_city):
+    """Page de résultats synthétique : cartes d'hôtels avec le lien titre de Booking"""
+    slug = slugify(city)
+    cards = []
+    for i in range(offset, min(offset + RESULTS_PER_PAGE, hotels_per_city)):
+        cards.append(
+            f'<div data-testid="property-card"><h3><a data-testid="title-link" '
+            f'href="/hotel/fr/{slug}-{i}.fr.html?aid=304142&amp;ucfs=1&amp;srpvid=stub">'
+            f'<div data-testid="title">Hôtel {i} {city}</div></a></h3></div>'
+        )
+    return f'<html><head><title>{city}</title></head><body>{"".join(cards)}</body></html>'
+
+
+HOTEL_LAYOUTS = ('pp-header', 'testid', 'legacy')
+
+
+def hotel_page(slug, filler=0):
+    """
+    Fiche hôtel synthétique avec les sélecteurs de BookingDetailsSpider.parse_hotel.
+
+    Trois mises en page (selon le slug) pour que chaque sélecteur de repli serve, un bloc JSON-LD
+    comme sur Booking (sauf mise en page 'legacy') et `filler` éléments de remplissage pour
+    approcher la taille d'une vraie page.
+    """
+    rng = random.Random(slug)
+    score = round(rng.uniform(6.0, 9.9), 1)
+    name = slug.replace('-', ' ').title()
+    address = f'{rng.randint(1, 99)} rue de la Plage, 66190 Collioure, France'
+    note = f"Avec une note de {score:g}"  # comme les pages réelles : 8.5, 9, 10
+    paragraphs = [f'Bienvenue au {name}.', 'Vue sur la mer.']
+    layout = HOTEL_LAYOUTS[int(hashlib.md5(slug.encode()).hexdigest(), 16) % len(HOTEL_LAYOUTS)]
+
+    head = f'<title>{name}</title>'
+    if layout != 'legacy':
+        json_ld = {
+            '@context': 'http://schema.org', '@type': 'Hotel', 'name': name,
+            'aggregateRating': {'@type': 'AggregateRating', 'ratingValue': score, 'bestRating': 10},
+            'address': {'@type': 'PostalAddress', 'streetAddress': address, 'postalCode': '66190',
+                        'addressLocality': 'Collioure', 'addressCountry': 'France'},
+            'description': paragraphs[0],
+        }
+        head += f'<script type="application/ld+json">{json.dumps(json_ld, ensure_ascii=False)}</script>'
+
+    filler_html = ''.join(f'<div class="f{i % 50}"><span>{i}</span><a href="#s{i}">lien</a></div>'
+                          for i in range(filler))
+    if layout == 'pp-header':
+        body = (f'<div id="wrap-hotelpage-top"><h2 class="pp-header__title">{name}</h2>'
+                f'<span class="hp_address_subtitle">{address}</span></div>'
+                f'<div data-testid="review-score-component"><div>{note}</div></div>'
+                f'{filler_html}<div id="property_description_content">'
+                + ''.join(f'<p>{p}</p>' for p in paragraphs) + '</div>')
+    elif layout == 'testid':
+        body = (f'<h2 data-testid="property-name">{name}</h2>'
+                f'<span data-node_tt_id="location_score_tooltip">{address}</span>'
+                f'<div class="b5cd09854e">{note}</div>'
+                f'{filler_html}<div class="hp_desc_main_content">'
+                + ''.join(f'<p>{p}</p>' for p in paragraphs) + '</div>')
+    else:
+        body = (f'<div id="hp_hotel_name"><div><h2>{name}</h2></div></div>'
+                f'<p class="address">' + ''.join(f'<span>{part}</span>' for part in address.split(', ')) + '</p>'
+                f'<div id="js--hp-gallery-scorecard"><a><div><div><div><div>Note</div><div>{note}</div></div></div></div></a></div>'
+                f'{filler_html}<div class="a53cbfa6de">{" ".join(paragraphs)}</div>')
+    return f'<html><head>{head}</head><body>{body}</body></html>'
+
+
+class StubState:
+    """Options et compteurs du serveur, partagés par les threads de requêtes"""
+
+    def __init__(self, pages_dir=None, hotels_per_city=60, latency=0.0, max_rps=None, filler=0):
+        self.pages_dir = pages_dir
+        self.filler = filler
+        self.hotels_per_city = hotels_per_city
+        self.latency = latency
+        self.max_rps = max_rps
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.stats = {'search': 0, 'hotel': 0, 'not_modified': 0, 'throttled': 0, 'not_found': 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def over_limit(self):
+        """Fenêtre fixe d'une seconde : au-delà de `max_rps` requêtes, le serveur répond 429"""
+        if not self.max_rps:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            return self.window_count > self.max_rps
+
+    def saved_page(self, *parts):
+        """(contenu, Last-Modified) d'une page sauvegardée, None si absente"""
+        if not self.pages_dir:
+            return None
+        path = os.path.join(self.pages_dir, *parts)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read(), formatdate(os.path.getmtime(path), usegmt=True)
+        return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None  # StubState, fixé par make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body, status=200, content_type='text/html; charset=utf-8', headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_page(self, page, default_body):
+        """Page HTML avec validateurs ; 304 sans corps si le client a déjà cette version"""
+        body, last_modified = page or (default_body.encode('utf-8'), SYNTHETIC_LAST_MODIFIED)
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        # Pages dynamiques : le client peut les garder mais doit les revalider (max-age=0, car
+        # avec no-cache la politique RFC 2616 de Scrapy redemande la page sans validateurs)
+        headers = {'ETag': etag, 'Last-Modified': last_modified, 'Cache-Control': 'private, max-age=0'}
+        if etag in self.headers.get('If-None-Match', ''):
+            self.state.count('not_modified')
+            self.send_response(304)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            return
+        self.send_body(body, headers=headers)
+
+    def do_GET(self):
+        state = self.state
+        url = urlsplit(self.path)
+        if url.path == '/__stats':
+            return self.send_body(json.dumps(state.stats), content_type='application/json')
+
+        if state.over_limit():
+            state.count('throttled')
+            return self.send_body('Too Many Requests', status=429, headers={'Retry-After': '1'})
+        if state.latency:
+            time.sleep(state.latency)
+
+        if url.path.startswith('/searchresults'):
+            query = parse_qs(url.query)
+            city = query.get('ss', [''])[0].split(',')[0].strip()
+            offset = int(query.get('offset', ['0'])[0])
+            state.count('search')
+            page = state.saved_page('searchresults', f'{slugify(city)}_{offset}.html')
+            return self.send_page(page, search_page(city, offset, state.hotels_per_city))
+
+        match = re.match(r'^/hotel/fr/(?P<slug>[\w-]+)\.fr\.html$', url.path)
+        if match:
+            state.count('hotel')
+            page = state.saved_page('hotel', f'{match["slug"]}.html')
+            return self.send_page(page, hotel_page(match['slug'], state.filler))
+
+        state.count('not_found')
+        self.send_body('Not Found', status=404)
+
+
+def make_server(port=0, host='127.0.0.1', **options):
+    """Serveur prêt à lancer (`serve_forever`) ; port=0 choisit un port libre (server.server_port)"""
+    handler = type('BoundStubHandler', (StubHandler,), {'state': StubState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(port=0, **options):
+    """Lance le faux Booking dans un thread, pour les scripts de test ; renvoie (server, base_url)"""
+    server = make_server(port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Faux Booking local pour tester les spiders')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages-dir', default=None, help='pages HTML sauvegardées (searchresults/, hotel/)')
+    parser.add_argument('--hotels-per-city', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.0, help='secondes ajoutées à chaque réponse')
+    parser.add_argument('--max-rps', type=int, default=None, help='au-delà, réponses 429')
+    parser.add_argument('--filler', type=int, default=0, help='éléments ajoutés aux fiches hôtels (taille de page)')
+    args = parser.parse_args()
+
+    server = make_server(args.port, pages_dir=args.pages_dir, hotels_per_city=args.hotels_per_city,
+                         latency=args.latency, max_rps=args.max_rps, filler=args.filler)
+    print(f"Faux Booking sur http://127.0.0.1:{server.server_port}")
+    server.serve_forever()
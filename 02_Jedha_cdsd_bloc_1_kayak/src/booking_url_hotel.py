@@ -1,82 +1,134 @@
+import os
 import logging
+import argparse
 import scrapy
 from scrapy.crawler import CrawlerProcess
 import pandas as pd
 
-# Charger les villes depuis le CSV
-path_cities = r'..\data\cities_weather.csv'
-cities_df = pd.read_csv(path_cities)
+from feed_io import feed_options
+from polite_crawl import polite_settings
+from selector_engine import FieldChain, SelectorStats
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+BOOKING_URL = 'https://www.booking.com'
+RESULTS_PER_PAGE = 25  # résultats par page de searchresults (paramètre offset)
+
+# Liens des hôtels d'une page de résultats, du plus fiable au plus large
+HOTEL_LINK_SELECTORS = [
+    ('css', 'a[data-testid="title-link"]::attr(href)'),  # MÉTHODE 1 : TOUS les liens d'un coup (MEILLEURE)
+    ('css', 'h3 a::attr(href)'),                          # MÉTHODE 2 : si la première ne marche pas
+    ('xpath', '//div[@data-testid="property-card"]//h3/a/@href'),  # MÉTHODE 3 : XPath alternatif
+]
+
+
+def load_cities(path=os.path.join(DATA_DIR, 'cities_weather.csv')):
+    """Charger les villes depuis le CSV"""
+    return pd.read_csv(path).iloc[:, 1].tolist()
+
+
+def search_url(city, base_url=BOOKING_URL, checkin='2025-10-03', checkout='2025-10-06', offset=0):
+    """URL d'une page de résultats Booking pour une ville"""
+    url = (f"{base_url}/searchresults.fr.html?ss={city.replace(' ', '+')}%2C+France"
+           f"&checkin={checkin}&checkout={checkout}&order=review_score_and_price")
+    return f"{url}&offset={offset}" if offset else url
+
 
 class BookingURLSpider(scrapy.Spider):
     name = "booking_urls"
-    
-    # Liste des villes
-    cities = cities_df.iloc[:, 1].tolist()
-    
-    custom_settings = {
-        'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
-        'ROBOTSTXT_OBEY': False,
-        'CONCURRENT_REQUESTS': 1,  # UNE SEULE requête à la fois
-        'DOWNLOAD_DELAY': 5,        # 3 secondes suffisent généralement
-        'RANDOMIZE_DOWNLOAD_DELAY': True,    
-        'REACTOR_THREADPOOL_MAXSIZE': 20,
-    }
-    
-    def start_requests(self):
-        """Génère les requêtes pour chaque ville"""
+
+    # Débit réglé par domaine (AutoThrottle + recul sur 429 / 503) au lieu d'une requête toutes les 5 s
+    custom_settings = polite_settings()
+
+    def __init__(self, cities=None, base_url=BOOKING_URL, max_pages=3, max_hotels=None,
+                 checkin='2025-10-03', checkout='2025-10-06', *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Liste des villes (arguments -a de scrapy : chaîne séparée par des virgules)
+        if isinstance(cities, str):
+            cities = [city.strip() for city in cities.split(',') if city.strip()]
+        self.cities = cities if cities is not None else load_cities()
+        self.base_url = base_url.rstrip('/')
+        self.max_pages = int(max_pages)
+        self.max_hotels = int(max_hotels) if max_hotels else None
+        self.checkin = checkin
+        self.checkout = checkout
+        self.hotels_found = {}  # ville -> URLs déjà vues (pages qui se recouvrent)
+        self.selector_stats = SelectorStats()
+        self.hotel_links = FieldChain('hotel_links', HOTEL_LINK_SELECTORS, many=True)
+        self.parse_backend = 'compiled'  # 'parsel' : appels response.css / xpath d'origine (benchmark)
+
+    async def start(self):
+        """Génère la première page de résultats de chaque ville (Scrapy >= 2.13)"""
         for city in self.cities:
-            url = f"https://www.booking.com/searchresults.fr.html?ss={city.replace(' ', '+')}%2C+France&checkin=2025-10-03&checkout=2025-10-06&order=review_score_and_price"
-            yield scrapy.Request(
-                url=url, 
-                callback=self.parse, 
-                meta={"city": city}  # IMPORTANT : on passe la ville ici
-            )
-    
+            yield self.search_request(city, offset=0)
+
+    def search_request(self, city, offset):
+        return scrapy.Request(
+            url=search_url(city, self.base_url, self.checkin, self.checkout, offset),
+            callback=self.parse,
+            meta={"city": city, "offset": offset}  # IMPORTANT : on passe la ville ici
+        )
+
     def parse(self, response):
         """Parse les résultats - MÉTHODE ROBUSTE"""
         city = response.meta['city']  # Récupération propre de la ville
-        
-        # MÉTHODE 1 : Récupérer TOUS les liens d'un coup (MEILLEURE)
-        hotel_links = response.css('a[data-testid="title-link"]::attr(href)').getall()
-        
-        # MÉTHODE 2 : Si la première ne marche pas
-        if not hotel_links:
-            hotel_links = response.css('h3 a::attr(href)').getall()
-        
-        # MÉTHODE 3 : XPath alternatif
-        if not hotel_links:
-            hotel_links = response.xpath('//div[@data-testid="property-card"]//h3/a/@href').getall()
-        
-        # Log pour débuggage
-        self.logger.info(f"🏙️  {city}: {len(hotel_links)} hôtels trouvés")
-        
-        # Limiter aux 20 premiers
-        for link in hotel_links[:20]:
-            # Nettoyer l'URL
-            clean_url = link.split('?')[0] if '?' in link else link
-            
-            if clean_url.startswith('//'):
-                clean_url = 'https:' + clean_url
-            elif clean_url.startswith('/'):
-                clean_url = 'https://www.booking.com' + clean_url
-            
+        offset = response.meta.get('offset', 0)
+        seen = self.hotels_found.setdefault(city, set())
+
+        # Premier sélecteur qui trouve des liens (sélecteurs compilés une fois)
+        if self.parse_backend == 'parsel':
+            hotel_links = self.hotel_links.extract_parsel(response, self.selector_stats)
+        else:
+            hotel_links = self.hotel_links.extract(response.selector.root, self.selector_stats, response.body)
+
+        new_hotels = 0
+        for link in hotel_links:
+            if self.max_hotels and len(seen) >= self.max_hotels:
+                break
+            # Nettoyer l'URL (sans paramètres de suivi, absolue)
+            clean_url = response.urljoin(link.split('?')[0])
+            if clean_url in seen:
+                continue
+            seen.add(clean_url)
+            new_hotels += 1
+
             yield {
                 'city': city,
                 'url': clean_url
             }
 
-# Fichier de sortie
-filenamepath = r'C:\Users\alber\Desktop\visual_studio_code\dossier_jedha\Jedha_Full_stack\03_Data_Collection_&_Management_(DCM)\00- projet kayak\data\all_cities_urls_hotels.json'
-
-# Configuration du processus
-process_url = CrawlerProcess(settings={
-    'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-    'LOG_LEVEL': logging.INFO,
-    'FEEDS': {
-        filenamepath: {"format": "json", 'overwrite': True},
-    }
-})
-
-# Lancement
-process_url.crawl(BookingURLSpider)
-process_url.start()
\ No newline at end of file
+        # Log pour débuggage
+        page = offset // RESULTS_PER_PAGE + 1
+        self.logger.info(f"🏙️  {city} (page {page}): {new_hotels} nouveaux hôtels, {len(seen)} au total")
+
+        # Page suivante tant qu'elle apporte des hôtels, dans la limite de max_pages / max_hotels
+        full = self.max_hotels and len(seen) >= self.max_hotels
+        if new_hotels and page < self.max_pages and not full:
+            yield self.search_request(city, offset + RESULTS_PER_PAGE)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="URLs des hôtels Booking de chaque ville")
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'all_cities_urls_hotels.json'),
+                        help=".json (réécrit) ou .jsonl / .jsonl.gz (ajout au fil du crawl)")
+    parser.add_argument('--base-url', default=BOOKING_URL, help="autre serveur, ex. booking_stub.py")
+    parser.add_argument('--cities', default=None, help="villes séparées par des virgules (par défaut : cities_weather.csv)")
+    parser.add_argument('--max-pages', type=int, default=3, help="pages de résultats par ville")
+    parser.add_argument('--max-hotels', type=int, default=None, help="hôtels par ville (tous par défaut)")
+    parser.add_argument('--concurrency', type=int, default=4, help="requêtes simultanées max par domaine")
+    parser.add_argument('--min-delay', type=float, default=1.0, help="délai minimum entre deux requêtes")
+    args = parser.parse_args()
+
+    BookingURLSpider.custom_settings = polite_settings(max_concurrency=args.concurrency, min_delay=args.min_delay)
+
+    # Configuration du processus
+    process_url = CrawlerProcess(settings={
+        'LOG_LEVEL': logging.INFO,
+        'FEEDS': {
+            args.output: feed_options(args.output),
+        }
+    })
+
+    # Lancement
+    process_url.crawl(BookingURLSpider, cities=args.cities, base_url=args.base_url, max_pages=args.max_pages,
+                      max_hotels=args.max_hotels)
+    process_url.start()
@@ -0,0 +1,163 @@
+"""
+Fichiers de sortie des spiders en JSON Lines : une fiche par ligne, ajoutée au fichier au fil du crawl.
+
+Avec l'extension .jsonl (ou .jsonl.gz, compressé), le fichier n'est jamais réécrit ni tronqué :
+chaque crawl ajoute ses lignes, vidées sur disque régulièrement, et un crawl interrompu garde tout
+ce qui a déjà été écrit. Les fichiers .json restent des tableaux réécrits à chaque crawl.
+"""
+import os
+import gzip
+import json
+import time
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Vidage sur disque au plus tard toutes les FLUSH_SECONDS secondes ou FLUSH_ITEMS fiches
+FLUSH_SECONDS = 5
+FLUSH_ITEMS = 100
+
+
+def is_jsonlines(path):
+    return path.endswith(('.jsonl', '.jsonl.gz'))
+
+
+def open_text(path, mode='r'):
+    """Fichier texte UTF-8, décompressé / compressé à la volée si `path` finit par .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class StreamingPlugin:
+    """
+    Plugin de post-traitement des feeds Scrapy : compression gzip optionnelle (`jsonl_gzip`) et
+    vidage sur disque toutes les `flush_seconds` secondes ou `flush_items` lignes. Avec gzip, chaque
+    vidage termine un bloc compressé : le fichier se lit jusqu'à la dernière ligne vidée.
+    """
+
+    def __init__(self, file, feed_options):
+        self.file = file
+        self.gzipfile = gzip.GzipFile(fileobj=file, mode='wb') if feed_options.get('jsonl_gzip') else None
+        self.flush_seconds = feed_options.get('flush_seconds', FLUSH_SECONDS)
+        self.flush_items = feed_options.get('flush_items', FLUSH_ITEMS)
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def write(self, data):
+        written = (self.gzipfile or self.file).write(data)
+        self.pending += data.count(b'\n')
+        if self.pending >= self.flush_items or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+        return written
+
+    def flush(self):
+        if self.gzipfile is not None:
+            self.gzipfile.flush()
+        self.file.flush()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        # Le fichier lui-même est fermé par le stockage du feed
+        if self.gzipfile is not None:
+            self.gzipfile.close()
+        self.file.flush()
+
+
+def gzip_complete(path):
+    """Flux gzip entier et lisible jusqu'au bout (lu par blocs, sans tout garder en mémoire)"""
+    try:
+        with gzip.open(path, 'rb') as f:
+            while f.read(1 << 20):
+                pass
+        return True
+    except (EOFError, gzip.BadGzipFile, zlib.error):
+        return False
+
+
+def repair_tail(path):
+    """
+    Avant d'ajouter des lignes à un JSON Lines laissé par un crawl interrompu : termine la dernière
+    ligne (.jsonl) ou réécrit les lignes lisibles en un flux gzip complet (.jsonl.gz), sinon les
+    lignes ajoutées derrière une fin tronquée seraient illisibles.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    if path.endswith('.gz'):
+        if not gzip_complete(path):
+            logger.warning(f"{path} : fin tronquée, réécriture des lignes lisibles avant ajout")
+            write_items(path, iter_items(path))
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            f.write(b'\n')
+
+
+def feed_options(path, flush_seconds=FLUSH_SECONDS, flush_items=FLUSH_ITEMS, **options):
+    """
+    Entrée FEEDS de `path` : JSON Lines en ajout pour .jsonl / .jsonl.gz (fin tronquée réparée
+    d'abord), sinon tableau JSON réécrit à chaque crawl (comportement d'origine). `options` : options de feed en plus
+    (encoding, indent, item_filter...).
+    """
+    if not is_jsonlines(path):
+        return {'format': 'json', 'overwrite': True, **options}
+    options.pop('indent', None)
+    repair_tail(path)
+    return {
+        'format': 'jsonlines',
+        'overwrite': False,
+        'encoding': 'utf-8',
+        'postprocessing': [StreamingPlugin],
+        'jsonl_gzip': path.endswith('.gz'),
+        'flush_seconds': flush_seconds,
+        'flush_items': flush_items,
+        **options,
+    }
+
+
+def iter_items(path):
+    """
+    Fiches d'un fichier .json, .jsonl ou .jsonl.gz, une par une. Les JSON Lines sont lus ligne à
+    ligne (mémoire constante) ; une fin de fichier tronquée par un crawl interrompu est ignorée.
+    """
+    if not is_jsonlines(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+
+    skipped = 0
+    with open_text(path) as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    skipped += 1
+        except (EOFError, gzip.BadGzipFile, zlib.error) as error:
+            logger.warning(f"{path} : fin du fichier illisible ({error}), crawl interrompu ?")
+    if skipped:
+        logger.warning(f"{path} : {skipped} lignes illisibles ignorées")
+
+
+def write_items(path, items):
+    """
+    Écrit toutes les fiches (format selon l'extension) au fil de l'itérateur, dans un fichier
+    temporaire puis renommé : jamais de fichier tronqué.
+    """
+    tmp_path = f'{path}.tmp.gz' if path.endswith('.gz') else f'{path}.tmp'
+    with open_text(tmp_path, 'w') as f:
+        if is_jsonlines(path):
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        else:
+            f.write('[')
+            for i, item in enumerate(items):
+                f.write(',\n' if i else '\n')
+                f.write('  ' + json.dumps(item, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+            f.write('\n]')
+    os.replace(tmp_path, path)
@@ -0,0 +1,189 @@
+"""
+Enrichit les fiches hôtels avec la météo de leur ville et classe les destinations et les hôtels,
+comme les parties 4.3 et 5 du notebook, mais par paquets de fiches : la mémoire ne dépend que du
+nombre de villes, pas du nombre d'hôtels.
+
+    python hotel_ranking.py
+    python hotel_ranking.py --hotels data/hotels_details.jsonl.gz --top 10 --w-rain 2 --max-rain 5
+"""
+import os
+import argparse
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from feed_io import iter_items
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+WEATHER_COLUMNS = ['insee', 'lat', 'lon', 'date', 'pluiew_mean', 'tw_mean']
+# Colonnes de hotels_info.csv (lat_h / lon_h : géocodage HERE des adresses, vides s'il n'a pas été fait)
+ENRICHED_COLUMNS = ['url', 'ville', 'nom', 'note', 'adresse', 'description',
+                    *WEATHER_COLUMNS, 'lat_h', 'lon_h']
+DEFAULT_WEIGHTS = {'temperature': 1.0, 'rain': 1.0, 'note': 1.0}
+NOTE_PATTERN = r'(\d+(?:[.,]\d+)?)\s*$'
+
+
+def city_key(villes):
+    """
+    Clé de jointure : 'Gorges du Verdon', 'gorges du verdon ' -> 'gorges-du-verdon'. Calculée une
+    fois par nom distinct (quelques milliers de villes pour des millions de fiches).
+    """
+    names = pd.Series(villes.dropna().unique()).astype('string')
+    keys = (names.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+            .str.lower().str.replace(r'[^a-z0-9]+', '-', regex=True).str.strip('-'))
+    return villes.map(pd.Series(keys.to_numpy(), index=names.to_numpy()))
+
+
+def parse_note(notes):
+    """'Avec une note de 8.5' / '8,5' / 9 -> 8.5 / 8.5 / 9.0 ; 'Non disponible' -> NaN"""
+    text = notes.astype('string').str.extract(NOTE_PATTERN, expand=False).str.replace(',', '.', regex=False)
+    return pd.to_numeric(text, errors='coerce').astype(float)
+
+
+def scaled(values):
+    """Ramené entre 0 et 1 (0.5 si toutes les valeurs sont égales)"""
+    spread = values.max() - values.min()
+    return (values - values.min()) / spread if spread else pd.Series(0.5, index=values.index)
+
+
+def load_weather(path, weights=DEFAULT_WEIGHTS):
+    """
+    cities_weather.csv indexé par clé de ville, avec la part météo du score : température moyenne
+    (plus chaude = mieux) et pluie moyenne (moins = mieux) ramenées entre 0 et 1 et pondérées.
+    """
+    weather = pd.read_csv(path)
+    weather['city_key'] = city_key(weather['ville'])
+    weather = weather.drop_duplicates('city_key', keep='last').set_index('city_key').sort_index()
+    weather['weather_points'] = (weights['temperature'] * scaled(weather['tw_mean']).fillna(0)
+                                 + weights['rain'] * (1 - scaled(weather['pluiew_mean'])).fillna(0))
+    return weather
+
+
+def hotel_chunks(path, chunk_size):
+    """Fiches par paquets de `chunk_size` (DataFrame) : .csv, ou .json / .jsonl / .jsonl.gz des spiders"""
+    if path.endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=chunk_size)
+        return
+    items = iter_items(path)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield pd.DataFrame(chunk)
+
+
+def enrich(chunk, weather):
+    """Note numérique et colonnes météo de la ville (jointure sur l'index de `weather`)"""
+    chunk = chunk.drop(columns=[column for column in WEATHER_COLUMNS if column in chunk])
+    chunk['note'] = parse_note(chunk['note']) if 'note' in chunk else np.nan
+    chunk['city_key'] = city_key(chunk['ville'])
+    return chunk.join(weather[WEATHER_COLUMNS + ['weather_points']], on='city_key')
+
+
+class Ranking:
+    """
+    Classement mis à jour paquet par paquet : nombre d'hôtels et somme des notes par ville, et les
+    `per_city` meilleurs hôtels de chaque ville. Score = (points météo + poids note × note / 10)
+    divisé par la somme des poids, entre 0 et 1 ; une fiche sans note compte 0 pour la note.
+    """
+
+    def __init__(self, weather, weights=DEFAULT_WEIGHTS, per_city=5):
+        self.weather = weather
+        self.weights = weights
+        self.per_city = per_city
+        self.total_weight = sum(weights.values()) or 1.0
+        self.city_stats = pd.DataFrame(columns=['hotels', 'noted', 'note_sum'], dtype=float)
+        self.best_hotels = None
+
+    def score(self, weather_points, notes):
+        return (weather_points.fillna(0) + self.weights['note'] * notes.fillna(0) / 10) / self.total_weight
+
+    def add(self, chunk):
+        """`chunk` : fiches enrichies (voir enrich)"""
+        chunk = chunk[chunk['weather_points'].notna()]
+        stats = chunk.groupby('city_key').agg(hotels=('city_key', 'size'), noted=('note', 'count'),
+                                              note_sum=('note', 'sum'))
+        self.city_stats = self.city_stats.add(stats, fill_value=0)
+
+        chunk = chunk.assign(score=self.score(chunk['weather_points'], chunk['note']))
+        best = chunk if self.best_hotels is None else pd.concat([self.best_hotels, chunk])
+        self.best_hotels = (best.sort_values('score', ascending=False, kind='stable')
+                            .drop_duplicates('url').groupby('city_key').head(self.per_city))
+
+    def destinations(self, top=5, max_rain=None, min_hotels=1):
+        """Les `top` meilleures villes (pluie moyenne <= `max_rain`, au moins `min_hotels` hôtels)"""
+        cities = self.weather.join(self.city_stats)
+        cities['hotels'] = cities['hotels'].fillna(0).astype(int)
+        cities['note_mean'] = cities['note_sum'] / cities['noted'].replace(0, np.nan)
+        cities['score'] = self.score(cities['weather_points'], cities['note_mean'])
+        if max_rain is not None:
+            cities = cities[cities['pluiew_mean'] <= max_rain]
+        cities = cities[cities['hotels'] >= min_hotels]
+        cities = cities.sort_values('score', ascending=False, kind='stable').head(top)
+        cities.insert(0, 'rank', range(1, len(cities) + 1))
+        return cities[['rank', 'insee', 'ville', 'lat', 'lon', 'date', 'pluiew_mean', 'tw_mean',
+                       'hotels', 'note_mean', 'score']]
+
+    def hotels(self, destinations):
+        """Meilleurs hôtels des destinations retenues, dans l'ordre des destinations"""
+        if self.best_hotels is None:
+            return pd.DataFrame(columns=['rank', 'ville', 'nom', 'note', 'score'])
+        ranks = destinations['rank']
+        hotels = self.best_hotels[self.best_hotels['city_key'].isin(ranks.index)]
+        hotels = hotels.assign(rank=hotels['city_key'].map(ranks))
+        hotels = hotels.sort_values(['rank', 'score'], ascending=[True, False], kind='stable')
+        columns = ['rank', 'ville', 'nom', 'note', 'score', 'adresse', 'url', 'lat_h', 'lon_h']
+        return hotels[[column for column in columns if column in hotels]]
+
+
+def run(hotels_path, weather_path, output_path=None, weights=DEFAULT_WEIGHTS, per_city=5, chunk_size=50000):
+    """Enrichit les fiches paquet par paquet (écrites dans `output_path` si donné) et renvoie le classement"""
+    weather = load_weather(weather_path, weights)
+    ranking = Ranking(weather, weights, per_city)
+    tmp_path = f'{output_path}.tmp' if output_path else None
+    for i, chunk in enumerate(hotel_chunks(hotels_path, chunk_size)):
+        chunk = enrich(chunk, weather)
+        ranking.add(chunk)
+        if tmp_path:
+            chunk.reindex(columns=ENRICHED_COLUMNS).to_csv(tmp_path, mode='w' if i == 0 else 'a',
+                                                           header=i == 0, index=False)
+    if tmp_path and os.path.exists(tmp_path):
+        os.replace(tmp_path, output_path)
+    return ranking
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Météo des hôtels et classement des destinations")
+    parser.add_argument('--hotels', default=os.path.join(DATA_DIR, 'hotels_details.json'),
+                        help="sortie des spiders (.json, .jsonl, .jsonl.gz) ou .csv")
+    parser.add_argument('--weather', default=os.path.join(DATA_DIR, 'cities_weather.csv'))
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'hotels_enriched.csv'),
+                        help="fiches enrichies (colonnes de hotels_info.csv)")
+    parser.add_argument('--destinations-output', default=None, help="classement des villes (CSV)")
+    parser.add_argument('--hotels-output', default=None, help="meilleurs hôtels des villes retenues (CSV)")
+    parser.add_argument('--top', type=int, default=5, help="nombre de destinations")
+    parser.add_argument('--hotels-per-destination', type=int, default=5)
+    parser.add_argument('--max-rain', type=float, default=3.0, help="pluie moyenne max (mm / jour), comme le notebook")
+    parser.add_argument('--min-hotels', type=int, default=1, help="hôtels min pour classer une ville")
+    parser.add_argument('--w-temperature', type=float, default=DEFAULT_WEIGHTS['temperature'])
+    parser.add_argument('--w-rain', type=float, default=DEFAULT_WEIGHTS['rain'])
+    parser.add_argument('--w-note', type=float, default=DEFAULT_WEIGHTS['note'])
+    parser.add_argument('--chunk-size', type=int, default=50000, help="fiches lues à la fois")
+    args = parser.parse_args()
+
+    weights = {'temperature': args.w_temperature, 'rain': args.w_rain, 'note': args.w_note}
+    ranking = run(args.hotels, args.weather, args.output, weights, args.hotels_per_destination, args.chunk_size)
+    destinations = ranking.destinations(args.top, args.max_rain, args.min_hotels)
+    hotels = ranking.hotels(destinations)
+
+    pd.set_option('display.width', 200)
+    print("🏆 Destinations")
+    print(destinations.to_string(index=False, float_format='{:.2f}'.format))
+    print("\n🏨 Hôtels")
+    print(hotels[['rank', 'ville', 'nom', 'note', 'score']].to_string(index=False, float_format='{:.2f}'.format))
+    if args.destinations_output:
+        destinations.to_csv(args.destinations_output, index=False)
+    if args.hotels_output:
+        hotels.to_csv(args.hotels_output, index=False)
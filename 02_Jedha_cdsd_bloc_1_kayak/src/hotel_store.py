@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+from feed_io import write_items
+
+# Champs qui décrivent l'hôtel : un changement de l'un d'eux = fiche modifiée
+CONTENT_FIELDS = ('ville', 'nom', 'note', 'adresse', 'description')
+
+
+def incremental_settings(cache_dir, job_dir=None):
+    """
+    Réglages Scrapy du mode incrémental.
+
+    Cache HTTP sur disque avec la politique RFC 2616 : une page déjà téléchargée est redemandée
+    avec If-None-Match / If-Modified-Since et un 304 réutilise la copie locale. Avec `job_dir`,
+    la file des requêtes est sauvegardée sur disque et un crawl interrompu reprend où il s'était arrêté.
+    """
+    settings = {
+        'HTTPCACHE_ENABLED': True,
+        'HTTPCACHE_POLICY': 'scrapy.extensions.httpcache.RFC2616Policy',
+        'HTTPCACHE_STORAGE': 'scrapy.extensions.httpcache.FilesystemCacheStorage',
+        'HTTPCACHE_DIR': os.path.abspath(cache_dir),
+        'HTTPCACHE_IGNORE_HTTP_CODES': [429, 500, 502, 503, 504],
+    }
+    if job_dir:
+        settings['JOBDIR'] = job_dir
+    return settings
+
+
+def item_fingerprint(item):
+    """Empreinte du contenu d'une fiche (sans l'URL ni la date)"""
+    content = json.dumps([item.get(field) for field in CONTENT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class HotelStore:
+    """
+    Fiches hôtels déjà extraites, persistées dans SQLite : URL, dernière fiche, empreinte et date.
+
+    Chaque fiche est validée dès son extraction, donc un crawl interrompu ne perd rien, et un
+    nouveau crawl saute les URLs extraites depuis moins de `max_age` secondes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS hotels ('
+            ' url TEXT PRIMARY KEY, item TEXT NOT NULL, fingerprint TEXT NOT NULL,'
+            ' scraped_at REAL NOT NULL, changed_at REAL NOT NULL)'
+        )
+        self.db.commit()
+
+    def fresh_urls(self, max_age):
+        """URLs extraites depuis moins de `max_age` secondes"""
+        limit = time.time() - max_age
+        return {url for (url,) in self.db.execute('SELECT url FROM hotels WHERE scraped_at >= ?', (limit,))}
+
+    def save(self, item):
+        """Enregistre une fiche, renvoie 'new', 'changed' ou 'unchanged'"""
+        now = time.time()
+        fingerprint = item_fingerprint(item)
+        row = self.db.execute('SELECT fingerprint FROM hotels WHERE url = ?', (item['url'],)).fetchone()
+        if row is None:
+            status = 'new'
+        else:
+            status = 'unchanged' if row[0] == fingerprint else 'changed'
+
+        if status == 'unchanged':
+            self.db.execute('UPDATE hotels SET scraped_at = ? WHERE url = ?', (now, item['url']))
+        else:
+            self.db.execute(
+                'INSERT INTO hotels (url, item, fingerprint, scraped_at, changed_at) VALUES (?, ?, ?, ?, ?)'
+                ' ON CONFLICT(url) DO UPDATE SET item = excluded.item, fingerprint = excluded.fingerprint,'
+                ' scraped_at = excluded.scraped_at, changed_at = excluded.changed_at',
+                (item['url'], json.dumps(dict(item), ensure_ascii=False), fingerprint, now, now),
+            )
+        self.db.commit()
+        return status
+
+    def items(self):
+        """Toutes les fiches, dans l'ordre d'insertion"""
+        for (item,) in self.db.execute('SELECT item FROM hotels ORDER BY rowid'):
+            yield json.loads(item)
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM hotels').fetchone()[0]
+
+    def export(self, path):
+        """Écrit toutes les fiches dans `path` (.json, .jsonl ou .jsonl.gz), voir feed_io.write_items"""
+        write_items(path, self.items())
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,154 @@
+"""
+Benchmark hors ligne du parsing des spiders sur des pages HTML sauvegardées.
+
+Rejoue `BookingDetailsSpider.parse_hotel` et `BookingURLSpider.parse` sur un corpus, sans réseau,
+et affiche les pages / s de chaque méthode d'extraction et le taux de succès de chaque sélecteur.
+
+    python parse_bench.py --generate 300 --filler 3000 --corpus /tmp/booking_pages
+    python parse_bench.py --corpus /tmp/booking_pages
+    python parse_bench.py --httpcache ../data/httpcache       # pages gardées par --incremental
+"""
+import os
+import glob
+import json
+import time
+import pickle
+import logging
+import argparse
+
+from scrapy.http import HtmlResponse, Request
+
+from booking_stub import hotel_page, search_page, slugify
+from booking_url_hotel import BookingURLSpider
+from booking_info_hotel import BookingDetailsSpider, HotelExtractor
+
+STUB_URL = 'http://127.0.0.1:8000'
+
+# Méthodes comparées : (nom, options de HotelExtractor)
+VARIANTS = [
+    ('parsel (origine)', {'backend': 'parsel', 'json_ld': False, 'reorder_every': None}),
+    ('compilé', {'backend': 'compiled', 'json_ld': False, 'reorder_every': None}),
+    ('compilé + JSON-LD', {'backend': 'compiled', 'json_ld': True, 'reorder_every': None}),
+    ('compilé + JSON-LD + réordonné', {'backend': 'compiled', 'json_ld': True, 'reorder_every': 50}),
+]
+
+
+def generate_corpus(path, n_hotels, filler=0, cities=('Collioure', 'Ariege', 'Gorges du Verdon')):
+    """Corpus synthétique au format de booking_stub.py : hotel/<slug>.html et searchresults/<ville>_<offset>.html"""
+    os.makedirs(os.path.join(path, 'hotel'), exist_ok=True)
+    os.makedirs(os.path.join(path, 'searchresults'), exist_ok=True)
+    for i in range(n_hotels):
+        slug = f'{slugify(cities[i % len(cities)])}-{i}'
+        with open(os.path.join(path, 'hotel', f'{slug}.html'), 'w', encoding='utf-8') as f:
+            f.write(hotel_page(slug, filler))
+    for city in cities:
+        for offset in (0, 25, 50):
+            with open(os.path.join(path, 'searchresults', f'{slugify(city)}_{offset}.html'), 'w', encoding='utf-8') as f:
+                f.write(search_page(city, offset, 60))
+
+
+def load_corpus(path):
+    """[(type, url, corps)] depuis un dossier de pages (hotel/, searchresults/)"""
+    pages = []
+    for kind, pattern in (('hotel', 'hotel/*.html'), ('search', 'searchresults/*.html')):
+        for file in sorted(glob.glob(os.path.join(path, pattern))):
+            name = os.path.splitext(os.path.basename(file))[0]
+            url = f'{STUB_URL}/hotel/fr/{name}.fr.html' if kind == 'hotel' else f'{STUB_URL}/searchresults.fr.html?ss={name}'
+            with open(file, 'rb') as f:
+                pages.append((kind, url, f.read()))
+    return pages
+
+
+def load_httpcache(path):
+    """[(type, url, corps)] depuis le cache HTTP de Scrapy (FilesystemCacheStorage)"""
+    pages = []
+    for meta_file in glob.glob(os.path.join(path, '*', '*', '*', 'pickled_meta')):
+        folder = os.path.dirname(meta_file)
+        with open(meta_file, 'rb') as f:
+            meta = pickle.load(f)
+        if meta.get('status') != 200:
+            continue
+        kind = 'search' if '/searchresults' in meta['url'] else 'hotel' if '/hotel/' in meta['url'] else None
+        if kind:
+            with open(os.path.join(folder, 'response_body'), 'rb') as f:
+                pages.append((kind, meta['url'], f.read()))
+    return pages
+
+
+def responses(pages, kind):
+    """Nouvelles réponses à chaque passage : l'arbre HTML est reconstruit, comme pendant un crawl"""
+    for page_kind, url, body in pages:
+        if page_kind == kind:
+            request = Request(url, meta={'city': 'bench', 'url': url, 'offset': 0})
+            yield HtmlResponse(url, body=body, encoding='utf-8', request=request)
+
+
+def bench_hotels(pages, options, repeat):
+    spider = BookingDetailsSpider(urls_path=None)
+    spider.extractor = HotelExtractor(**options)
+    items = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        items = [item for response in responses(pages, 'hotel') for item in spider.parse_hotel(response)]
+    seconds = time.perf_counter() - started
+    return len(items) * repeat / seconds, items, spider.extractor.stats
+
+
+def bench_search(pages, backend, repeat):
+    spider = BookingURLSpider(cities=[])
+    spider.parse_backend = backend
+    started = time.perf_counter()
+    count = 0
+    for _ in range(repeat):
+        spider.hotels_found = {}
+        for response in responses(pages, 'search'):
+            list(spider.parse(response))
+            count += 1
+    return count / (time.perf_counter() - started), spider.selector_stats
+
+
+def print_stats(title, stats):
+    print(f"\n{title}")
+    for row in stats.report():
+        print(f"  {row['field']:<18} {row['hit_rate']:>6.1%}  {row['hits']:>6}/{row['tries']:<6} {row['selector']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne de parse_hotel / parse")
+    parser.add_argument('--corpus', help="dossier de pages (hotel/*.html, searchresults/*.html)")
+    parser.add_argument('--httpcache', help="ou cache HTTP de Scrapy (booking_info_hotel.py --incremental)")
+    parser.add_argument('--generate', type=int, default=0, help="créer d'abord N fiches synthétiques dans --corpus")
+    parser.add_argument('--filler', type=int, default=3000, help="éléments de remplissage des fiches générées")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="rapport JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.generate:
+        generate_corpus(args.corpus, args.generate, args.filler)
+    pages = load_httpcache(args.httpcache) if args.httpcache else load_corpus(args.corpus)
+    n_hotels = sum(kind == 'hotel' for kind, _, _ in pages)
+    print(f"{n_hotels} fiches hôtels, {len(pages) - n_hotels} pages de résultats")
+
+    report = {'hotel': {}, 'search': {}}
+    reference = None
+    for name, options in VARIANTS:
+        pages_per_second, items, stats = bench_hotels(pages, options, args.repeat)
+        reference = reference if reference is not None else items
+        mismatches = sum(a != b for a, b in zip(items, reference))
+        report['hotel'][name] = {'pages_per_second': round(pages_per_second, 1), 'mismatches': mismatches,
+                                 'selectors': stats.report()}
+        print(f"parse_hotel {name:<32} {pages_per_second:8.1f} pages/s  ({mismatches} fiches différentes de l'origine)")
+        if options['backend'] == 'parsel':
+            print_stats("Taux de succès des sélecteurs (ordre d'origine) :", stats)
+            print()
+
+    for backend in ('parsel', 'compiled'):
+        pages_per_second, stats = bench_search(pages, backend, args.repeat)
+        report['search'][backend] = {'pages_per_second': round(pages_per_second, 1), 'selectors': stats.report()}
+        print(f"parse (recherche) {backend:<26} {pages_per_second:8.1f} pages/s")
+    print_stats("Sélecteurs des pages de résultats :", stats)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
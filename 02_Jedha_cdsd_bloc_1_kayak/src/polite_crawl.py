@@ -0,0 +1,95 @@
+import logging
+
+from scrapy.downloadermiddlewares.retry import get_retry_request
+from scrapy.settings.default_settings import RETRY_HTTP_CODES
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36'
+
+# Codes qui veulent dire "trop vite" : on ralentit le domaine au lieu de simplement réessayer
+BACKOFF_HTTP_CODES = [429, 503]
+
+
+def polite_settings(max_concurrency=4, min_delay=1.0, max_delay=60.0, target_concurrency=2.0, backoff_retries=5):
+    """
+    Réglages Scrapy d'un crawl poli mais parallèle.
+
+    AutoThrottle ajuste le délai de chaque domaine selon la latence mesurée (viser
+    `target_concurrency` requêtes en cours), sans descendre sous `min_delay` ni dépasser
+    `max_concurrency` requêtes simultanées par domaine. Sur un 429 / 503, `BackoffMiddleware`
+    double le délai du domaine (ou applique Retry-After) puis replanifie la requête, au plus
+    `backoff_retries` fois : ces codes sont retirés de RETRY_HTTP_CODES pour que RetryMiddleware
+    ne les réessaie pas une deuxième fois après l'abandon.
+    """
+    return {
+        'USER_AGENT': USER_AGENT,
+        'ROBOTSTXT_OBEY': False,
+        'CONCURRENT_REQUESTS': max_concurrency * 4,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': max_concurrency,  # plafond par domaine
+        'DOWNLOAD_DELAY': min_delay,                         # délai minimum (point de départ d'AutoThrottle)
+        'RANDOMIZE_DOWNLOAD_DELAY': True,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': max(min_delay, 1.0),
+        'AUTOTHROTTLE_MAX_DELAY': max_delay,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': target_concurrency,
+        'BACKOFF_HTTP_CODES': BACKOFF_HTTP_CODES,
+        'BACKOFF_MAX_RETRIES': backoff_retries,
+        'BACKOFF_MAX_DELAY': max_delay,
+        'DOWNLOADER_MIDDLEWARES': {
+            # Après RetryMiddleware (550) côté téléchargeur : voit les 429 / 503 en premier
+            'polite_crawl.BackoffMiddleware': 560,
+        },
+        'DOWNLOAD_TIMEOUT': 60,
+        'RETRY_TIMES': 3,
+        'RETRY_HTTP_CODES': [code for code in RETRY_HTTP_CODES if code not in BACKOFF_HTTP_CODES],
+        'REACTOR_THREADPOOL_MAXSIZE': 20,
+    }
+
+
+def retry_after_seconds(response):
+    """Valeur de l'en-tête Retry-After en secondes (None si absente ou sous forme de date)"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return float(value.decode('latin-1'))
+    except ValueError:
+        return None
+
+
+class BackoffMiddleware:
+    """Ralentit un domaine qui répond 429 / 503 et replanifie la requête refusée"""
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.codes = set(settings.getlist('BACKOFF_HTTP_CODES', BACKOFF_HTTP_CODES))
+        self.max_retries = settings.getint('BACKOFF_MAX_RETRIES', 5)
+        self.max_delay = settings.getfloat('BACKOFF_MAX_DELAY', 60.0)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_response(self, request, response, spider):
+        if response.status not in self.codes:
+            return response
+
+        downloader = self.crawler.engine.downloader
+        slot = downloader.slots.get(downloader.get_slot_key(request))
+        if slot is not None:
+            wait = retry_after_seconds(response)
+            slot.delay = min(self.max_delay, max(slot.delay * 2, wait or 0, 1.0))
+            self.crawler.stats.inc_value(f'backoff/{response.status}')
+            self.crawler.stats.max_value('backoff/max_delay', slot.delay)
+            logger.info(f"⏳ {response.status} sur {request.url} : délai du domaine porté à {slot.delay:.1f}s")
+
+        retry = get_retry_request(
+            request,
+            spider=spider,
+            reason=f'backoff_{response.status}',
+            max_retry_times=self.max_retries,
+            stats_base_key='backoff',
+        )
+        return retry or response
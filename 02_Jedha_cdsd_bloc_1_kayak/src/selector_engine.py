@@ -0,0 +1,131 @@
+import re
+import json
+from collections import defaultdict
+
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+
+_translator = HTMLTranslator()
+
+JSON_LD = etree.XPath('//script[@type="application/ld+json"]/text()')
+JSON_LD_MARKER = b'application/ld+json'
+JSON_LD_TYPES = {'Hotel', 'LodgingBusiness', 'BedAndBreakfast', 'Hostel', 'Resort', 'Campground', 'Apartment'}
+
+
+class SelectorStats:
+    """Essais et succès de chaque sélecteur, par champ"""
+
+    def __init__(self):
+        self.tries = defaultdict(int)
+        self.hits = defaultdict(int)
+
+    def record(self, field, label, hit):
+        self.tries[field, label] += 1
+        if hit:
+            self.hits[field, label] += 1
+
+    def hit_rate(self, field, label):
+        tries = self.tries.get((field, label), 0)
+        return self.hits.get((field, label), 0) / tries if tries else 0.0
+
+    def report(self):
+        """Une ligne par (champ, sélecteur) : essais, succès, taux"""
+        return [
+            {'field': field, 'selector': label, 'tries': tries, 'hits': self.hits[field, label],
+             'hit_rate': round(self.hits[field, label] / tries, 3)}
+            for (field, label), tries in self.tries.items()
+        ]
+
+
+def markers(expression):
+    """
+    Textes qui doivent figurer dans le HTML brut pour que le sélecteur trouve quelque chose :
+    valeurs d'attributs entre guillemets, classes (.nom) et ids (#nom) du sélecteur.
+    """
+    quoted = re.findall(r'"([^"]+)"|\'([^\']+)\'', expression)
+    names = re.findall(r'[.#]([A-Za-z_][\w-]*)', re.sub(r'"[^"]*"|\'[^\']*\'|::\w+(\([^)]*\))?', '', expression))
+    return [value.encode('utf-8') for value in [a or b for a, b in quoted] + names]
+
+
+class FieldChain:
+    """
+    Sélecteurs de repli d'un champ, essayés dans l'ordre jusqu'au premier résultat non vide.
+
+    Chaque sélecteur est ('css' | 'xpath', expression). Les CSS sont traduits une fois en XPath et
+    tous sont compilés avec lxml : pas de traduction ni d'objets Selector à chaque page.
+    `many=True` renvoie tous les résultats du premier sélecteur qui trouve quelque chose.
+    Avec le HTML brut (`body`), un sélecteur dont une classe / un id / une valeur d'attribut n'y
+    figure pas est sauté sans parcourir l'arbre.
+    """
+
+    def __init__(self, field, selectors, many=False):
+        self.field = field
+        self.many = many
+        self.selectors = []
+        for kind, expression in selectors:
+            xpath = _translator.css_to_xpath(expression) if kind == 'css' else expression
+            self.selectors.append((f'{kind}:{expression}', etree.XPath(xpath), markers(expression)))
+
+    def extract(self, root, stats=None, body=None):
+        for label, xpath, needed in self.selectors:
+            if body is not None and not all(marker in body for marker in needed):
+                values = []
+            else:
+                values = [str(value) for value in xpath(root)]
+            if not self.many:
+                values = values[:1]
+            if stats is not None:
+                stats.record(self.field, label, bool(values))
+            if values:
+                return values if self.many else values[0]
+        return [] if self.many else None
+
+    def extract_parsel(self, selector, stats=None):
+        """Même chaîne via parsel (response.css / response.xpath), la méthode d'origine, pour comparer"""
+        for label, _, _ in self.selectors:
+            kind, expression = label.split(':', 1)
+            result = selector.css(expression) if kind == 'css' else selector.xpath(expression)
+            values = result.getall() if self.many else [v for v in [result.get()] if v is not None]
+            if stats is not None:
+                stats.record(self.field, label, bool(values))
+            if values:
+                return values if self.many else values[0]
+        return [] if self.many else None
+
+    def reorder(self, stats):
+        """Sélecteurs qui trouvent le plus souvent en premier (ordre d'origine en cas d'égalité)"""
+        self.selectors.sort(key=lambda selector: -stats.hit_rate(self.field, selector[0]))
+
+
+def json_ld_objects(root, body=None):
+    """Objets JSON-LD de la page (les blocs illisibles sont ignorés)"""
+    if body is not None and JSON_LD_MARKER not in body:
+        return
+    for block in JSON_LD(root):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            data = data.get('@graph', [data])
+            data = [data] if isinstance(data, dict) else data
+        if not isinstance(data, list):
+            continue  # texte ou nombre seul : pas un objet JSON-LD
+        for obj in data:
+            if isinstance(obj, dict):
+                yield obj
+
+
+def json_ld_text(value):
+    """Valeur texte d'un champ JSON-LD (None si absente ou d'un autre type : liste, objet...)"""
+    return value.strip() or None if isinstance(value, str) else None
+
+
+def json_ld_hotel(root, body=None):
+    """Bloc JSON-LD de l'hébergement (schema.org Hotel...), None s'il n'y en a pas"""
+    for obj in json_ld_objects(root, body):
+        types = obj.get('@type')
+        types = {value for value in (types if isinstance(types, list) else [types]) if isinstance(value, str)}
+        if types & JSON_LD_TYPES:
+            return obj
+    return None
@@ -0,0 +1,360 @@
+"""
+Prévisions Météo-France de toutes les villes en parallèle, comme la partie 3 du notebook :
+data/weather.csv (tmin / tmax / pluie jour par jour) et data/cities_weather.csv (moyennes sur 7 jours).
+
+Requêtes asynchrones (aiohttp) avec un nombre de connexions borné, un débit maximum par hôte,
+des nouveaux essais sur 429 / 5xx / erreurs réseau et un cache disque par (insee, jour) : relancer
+le même jour ne refait aucune requête. Les lignes sont écrites au fil des réponses.
+
+    python weather_fetch.py
+    python weather_stub.py --port 8001 --latency 0.2
+    python weather_fetch.py --base-url http://127.0.0.1:8001 --geocoder-url http://127.0.0.1:8001/search
+"""
+import os
+import re
+import csv
+import json
+import time
+import asyncio
+import logging
+import argparse
+import unicodedata
+from collections import defaultdict
+from datetime import date, datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+try:
+    from meteofrance_api.const import METEOFRANCE_API_URL, METEOFRANCE_API_TOKEN
+except ImportError:  # sans le paquet meteofrance-api : --base-url et --token obligatoires
+    METEOFRANCE_API_URL, METEOFRANCE_API_TOKEN = None, None
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
+USER_AGENT = 'meteo_app'  # comme le géocodeur du notebook
+
+FORECAST_DAYS = 7
+WEATHER_COLUMNS = ['insee', 'ville', 'lat', 'lon', 'date', 'tmin', 'tmax', 'pluie']
+CITIES_COLUMNS = ['insee', 'ville', 'lat', 'lon', 'date', 'pluiew_mean', 'tw_mean']
+RETRY_CODES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger('weather_fetch')
+
+
+def slugify(text):
+    """'Gorges du Verdon' -> 'gorges-du-verdon' (noms de fichiers du cache)"""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def read_cities(path):
+    """Villes à rafraîchir (CSV avec au moins `ville` ; lat / lon / insee s'ils sont déjà connus)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row['lat'] = float(row['lat']) if row.get('lat') else None
+        row['lon'] = float(row['lon']) if row.get('lon') else None
+    return rows
+
+
+def insee_key(insee):
+    """Code insee comparable entre fichiers : '041440' (API) et 41440 (relu par pandas)"""
+    return str(insee or '').lstrip('0')
+
+
+def read_daily(path):
+    """Lignes d'un weather.csv existant par insee (valeurs numériques converties), {} s'il n'existe pas"""
+    days = defaultdict(list)
+    if not os.path.exists(path):
+        return days
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            for column in ('lat', 'lon', 'tmin', 'tmax', 'pluie'):
+                row[column] = float(row[column]) if row[column] else None
+            days[insee_key(row['insee'])].append(row)
+    return days
+
+
+class HostRateLimiter:
+    """
+    Au plus `rps` requêtes par seconde vers chaque hôte : chaque requête réserve le créneau suivant.
+    `limits` donne un autre débit à certaines clés (hôte, ou 'geocoder' pour le géocodeur).
+    Un 429 met la clé en pause et divise son débit par deux ; chaque succès le fait remonter.
+    """
+
+    def __init__(self, rps, limits=None):
+        self.rps = rps
+        self.limits = limits or {}
+        self.rates = {}
+        self.next_slot = defaultdict(float)
+        self.paused_until = defaultdict(float)
+
+    def limit(self, key):
+        return self.limits.get(key, self.rps)
+
+    async def wait(self, key):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self.next_slot[key], self.paused_until[key])
+        self.next_slot[key] = slot + 1 / self.rates.get(key, self.limit(key))
+        await asyncio.sleep(slot - now)
+        # Pause décidée pendant l'attente : elle vaut aussi pour les créneaux déjà réservés
+        while loop.time() < self.paused_until[key]:
+            await asyncio.sleep(self.paused_until[key] - loop.time())
+
+    def slow_down(self, key, seconds):
+        """429 : plus de requête pour `key` avant `seconds` secondes, puis débit divisé par deux"""
+        self.paused_until[key] = max(self.paused_until[key], asyncio.get_running_loop().time() + seconds)
+        self.rates[key] = max(self.rates.get(key, self.limit(key)) / 2, 0.1)
+
+    def speed_up(self, key):
+        """Succès : le débit remonte de 5 % du maximum, jusqu'au maximum"""
+        if key in self.rates:
+            self.rates[key] = min(self.rates[key] + self.limit(key) / 20, self.limit(key))
+
+
+class ResponseCache:
+    """Réponses JSON sur disque : <dossier>/<groupe>/<clé>.json (groupe = jour des prévisions, ou 'geocode')"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def file(self, group, key):
+        return os.path.join(self.path, group, f'{key}.json')
+
+    def get(self, group, key):
+        try:
+            with open(self.file(group, key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, group, key, data):
+        path = self.file(group, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def daily_rows(city, forecast, days=FORECAST_DAYS):
+    """Lignes de weather.csv d'une ville : les `days` premiers jours de daily_forecast"""
+    insee = forecast['position']['insee']
+    return [
+        {
+            'insee': insee,
+            'ville': city['ville'],
+            'lat': city['lat'],
+            'lon': city['lon'],
+            'date': datetime.fromtimestamp(day['dt']).strftime('%Y-%m-%d'),
+            'tmin': day['T']['min'],
+            'tmax': day['T']['max'],
+            'pluie': day['precipitation']['24h'],
+        }
+        for day in forecast['daily_forecast'][:days]
+    ]
+
+
+class WeeklyMeans:
+    """
+    Lignes de cities_weather.csv, mises à jour à chaque ligne de weather.csv : pluie moyenne et
+    moyenne des températures du jour ((tmin + tmax) / 2), valeurs manquantes ignorées comme pandas.
+    """
+
+    def __init__(self):
+        self.cities = {}
+
+    def add(self, row):
+        city = self.cities.setdefault(row['insee'], {'pluie': [0.0, 0], 't': [0.0, 0]})
+        city.update(ville=row['ville'], lat=row['lat'], lon=row['lon'], date=row['date'])
+        if row['pluie'] is not None:
+            city['pluie'][0] += row['pluie']
+            city['pluie'][1] += 1
+        temperatures = [t for t in (row['tmin'], row['tmax']) if t is not None]
+        if temperatures:
+            city['t'][0] += sum(temperatures) / len(temperatures)
+            city['t'][1] += 1
+
+    def rows(self):
+        """Une ligne par ville, triées par insee comme le groupby du notebook"""
+        def sort_key(insee):
+            insee = str(insee)
+            return (0, int(insee), '') if insee.isdigit() else (1, 0, insee)
+
+        for insee in sorted(self.cities, key=sort_key):
+            city = self.cities[insee]
+            (pluie, n_pluie), (t, n_t) = city['pluie'], city['t']
+            yield {
+                'insee': insee, 'ville': city['ville'], 'lat': city['lat'], 'lon': city['lon'],
+                'date': city['date'],
+                'pluiew_mean': pluie / n_pluie if n_pluie else None,
+                'tw_mean': t / n_t if n_t else None,
+            }
+
+
+class WeatherFetcher:
+    """Requêtes Météo-France et géocodage, avec limite de débit, nouveaux essais et cache"""
+
+    def __init__(self, session, limiter, cache, base_url=METEOFRANCE_API_URL, token=METEOFRANCE_API_TOKEN,
+                 geocoder_url=NOMINATIM_URL, concurrency=10, retries=4, backoff=0.5):
+        self.session = session
+        # Requêtes en cours bornées ici et pas seulement par le pool de connexions : le délai
+        # d'expiration ne compte alors pas l'attente d'une connexion libre
+        self.slots = asyncio.Semaphore(concurrency)
+        self.limiter = limiter
+        self.cache = cache
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.geocoder_url = geocoder_url
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = defaultdict(int)
+
+    async def get_json(self, url, params, limit_key=None):
+        """GET JSON ; 429 / 5xx / erreurs réseau réessayés avec attente exponentielle (ou Retry-After)"""
+        limit_key = limit_key or urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            async with self.slots:
+                await self.limiter.wait(limit_key)
+                self.stats['requests'] += 1
+                try:
+                    async with self.session.get(url, params=params) as response:
+                        if response.status not in RETRY_CODES:
+                            response.raise_for_status()
+                            self.limiter.speed_up(limit_key)
+                            return await response.json(content_type=None)
+                        error = f'HTTP {response.status}'
+                        delay = self.backoff * 2 ** attempt
+                        try:
+                            delay = float(response.headers.get('Retry-After', delay))
+                        except ValueError:
+                            pass
+                        if response.status == 429:
+                            self.limiter.slow_down(limit_key, delay)
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as exc:
+                    error, delay = repr(exc), self.backoff * 2 ** attempt
+            if attempt == self.retries:
+                break
+            self.stats['retries'] += 1
+            logger.debug(f"{url} : {error}, nouvel essai dans {delay:.1f} s")
+            await asyncio.sleep(delay)
+        raise RuntimeError(f"{url} : échec après {self.retries + 1} essais ({error})")
+
+    async def geocode(self, ville):
+        """(lat, lon) d'une ville, gardé en cache sans limite de durée"""
+        key = slugify(ville)
+        location = self.cache.get('geocode', key)
+        if location is None:
+            results = await self.get_json(self.geocoder_url, {'q': f'{ville}, France', 'format': 'json', 'limit': 1},
+                                          limit_key='geocoder')
+            if not results:
+                raise RuntimeError(f"{ville} : lieu introuvable")
+            location = {'lat': float(results[0]['lat']), 'lon': float(results[0]['lon'])}
+            self.cache.put('geocode', key, location)
+        return location['lat'], location['lon']
+
+    async def forecast(self, city, day):
+        """Prévision brute d'une ville : cache (insee, jour), sinon l'API"""
+        key = city.get('insee') or f"{city['lat']:.4f}_{city['lon']:.4f}"
+        data = self.cache.get(day, key)
+        if data is not None:
+            self.stats['cache_hits'] += 1
+            return data
+        data = await self.get_json(f'{self.base_url}/forecast',
+                                   {'lat': city['lat'], 'lon': city['lon'], 'lang': 'fr', 'token': self.token})
+        self.cache.put(day, key, data)
+        insee = str(data.get('position', {}).get('insee') or '')
+        if insee and insee != key:
+            self.cache.put(day, insee, data)  # retrouvée par son insee aux lancements suivants
+        return data
+
+    async def city_rows(self, city, day):
+        """(ville, lignes de weather.csv), lignes None en cas d'échec"""
+        try:
+            if city['lat'] is None or city['lon'] is None:
+                city['lat'], city['lon'] = await self.geocode(city['ville'])
+            return city, daily_rows(city, await self.forecast(city, day))
+        except Exception as error:
+            logger.error(f"❌ {city['ville']} : {error}")
+            return city, None
+
+
+async def refresh(cities, weather_path, cities_path, cache_dir, day=None, concurrency=10, rps=20.0,
+                  geocoder_rps=1.0, **fetcher_options):
+    """
+    Récupère les prévisions de `cities` et écrit weather.csv au fil des réponses, puis cities_weather.csv.
+    Une ville en échec garde ses lignes du weather.csv précédent. Les fichiers sont écrits à côté
+    puis renommés : un lancement interrompu ne laisse pas de fichier partiel.
+    """
+    day = day or date.today().isoformat()
+    limiter = HostRateLimiter(rps, {'geocoder': geocoder_rps})  # Nominatim : 1 requête / s au plus
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    means = WeeklyMeans()
+    previous_days = read_daily(weather_path)
+    # Villes données sans insee (à géocoder) : lignes précédentes retrouvées par leur nom
+    previous_by_ville = {slugify(rows[0]['ville']): rows for rows in previous_days.values()}
+    failed = []
+
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30),
+                                     headers={'User-Agent': USER_AGENT}) as session:
+        fetcher = WeatherFetcher(session, limiter, ResponseCache(cache_dir), concurrency=concurrency, **fetcher_options)
+        tasks = [asyncio.create_task(fetcher.city_rows(city, day)) for city in cities]
+        tmp_path = f'{weather_path}.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=WEATHER_COLUMNS, lineterminator='\n')
+            writer.writeheader()
+            for task in asyncio.as_completed(tasks):
+                city, rows = await task
+                if rows is None:
+                    failed.append(city['ville'])
+                    rows = (previous_days.get(insee_key(city.get('insee')))
+                            or previous_by_ville.get(slugify(city['ville']), []))
+                writer.writerows(rows)
+                f.flush()
+                for row in rows:
+                    means.add(row)
+        os.replace(tmp_path, weather_path)
+
+    tmp_path = f'{cities_path}.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CITIES_COLUMNS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(means.rows())
+    os.replace(tmp_path, cities_path)
+    return fetcher.stats, failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prévisions Météo-France des villes : weather.csv et cities_weather.csv")
+    parser.add_argument('--cities', default=os.path.join(DATA_DIR, 'cities_weather.csv'),
+                        help="CSV des villes (colonne ville ; lat, lon, insee si connus)")
+    parser.add_argument('--weather-output', default=os.path.join(DATA_DIR, 'weather.csv'))
+    parser.add_argument('--cities-output', default=os.path.join(DATA_DIR, 'cities_weather.csv'))
+    parser.add_argument('--base-url', default=METEOFRANCE_API_URL, help="autre serveur, ex. weather_stub.py")
+    parser.add_argument('--token', default=os.getenv('METEOFRANCE_TOKEN', METEOFRANCE_API_TOKEN))
+    parser.add_argument('--geocoder-url', default=NOMINATIM_URL)
+    parser.add_argument('--cache-dir', default=os.path.join(DATA_DIR, 'weather_cache'))
+    parser.add_argument('--date', default=None, help="jour des prévisions en cache (aujourd'hui par défaut)")
+    parser.add_argument('--concurrency', type=int, default=10, help="connexions simultanées max")
+    parser.add_argument('--rps', type=float, default=20, help="requêtes / s max vers l'API météo")
+    parser.add_argument('--geocoder-rps', type=float, default=1, help="requêtes / s max vers le géocodeur")
+    parser.add_argument('--retries', type=int, default=4)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    if not args.base_url or not args.token:
+        parser.error("paquet meteofrance-api absent : donner --base-url et --token")
+
+    cities = read_cities(args.cities)
+    started = time.perf_counter()
+    stats, failed = asyncio.run(refresh(
+        cities, args.weather_output, args.cities_output, args.cache_dir, day=args.date,
+        concurrency=args.concurrency, rps=args.rps, geocoder_rps=args.geocoder_rps,
+        base_url=args.base_url, token=args.token, geocoder_url=args.geocoder_url, retries=args.retries,
+    ))
+    logger.info(f"🌦️  {len(cities) - len(failed)}/{len(cities)} villes en {time.perf_counter() - started:.1f} s"
+                f" ({stats['requests']} requêtes, {stats['retries']} nouveaux essais, {stats['cache_hits']} en cache)")
+    if failed:
+        logger.error(f"❌ Échec : {', '.join(failed)} (lignes précédentes gardées si connues)")
+        raise SystemExit(1)
@@ -0,0 +1,119 @@
+"""
+Faux Météo-France (et géocodeur) local pour tester weather_fetch.py sans réseau.
+
+Sert /forecast (même format que l'API utilisée par meteofrance-api) et /search (comme Nominatim)
+avec des données synthétiques stables. Peut simuler la latence, la limite de débit (429 +
+Retry-After) et des erreurs 503 aléatoires.
+
+    python weather_stub.py --port 8001 --latency 0.2 --max-rps 50 --error-rate 0.05
+    python weather_fetch.py --base-url http://127.0.0.1:8001 --geocoder-url http://127.0.0.1:8001/search
+"""
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from booking_stub import StubState, StubHandler
+
+
+def geocode_data(query):
+    """Résultat Nominatim synthétique : un point en France métropolitaine, toujours le même pour `query`"""
+    rng = random.Random(query)
+    return [{'lat': f'{rng.uniform(42.5, 50.5):.7f}', 'lon': f'{rng.uniform(-1.5, 7.5):.7f}', 'display_name': query}]
+
+
+def forecast_data(lat, lon, days=15):
+    """Réponse /forecast synthétique : position (insee) et daily_forecast à partir d'aujourd'hui"""
+    rng = random.Random(f'{lat:.4f},{lon:.4f}')
+    insee = str(int(hashlib.md5(f'{lat:.4f},{lon:.4f}'.encode()).hexdigest(), 16) % 950000 + 10000)
+    today = datetime.combine(date.today(), datetime.min.time())
+    daily = []
+    for i in range(days):
+        tmin = round(rng.uniform(2, 16), 1)
+        daily.append({
+            'dt': int((today + timedelta(days=i)).timestamp()),
+            'T': {'min': tmin, 'max': round(tmin + rng.uniform(3, 12), 1), 'sea': None},
+            'humidity': {'min': rng.randint(40, 70), 'max': rng.randint(70, 100)},
+            'precipitation': {'24h': round(max(0.0, rng.gauss(0, 3)), 1)},
+            'uv': rng.randint(1, 6),
+            'weather12H': {'icon': 'p1j', 'desc': 'Ensoleillé'},
+        })
+    position = {'lat': lat, 'lon': lon, 'alti': rng.randint(0, 1500), 'name': f'Lieu {insee}',
+                'country': 'FR - France', 'dept': insee[:2], 'timezone': 'Europe/Paris', 'insee': insee}
+    return {'position': position, 'updated_on': int(time.time()), 'daily_forecast': daily, 'forecast': []}
+
+
+class WeatherStubState(StubState):
+    """Options et compteurs du serveur, plus le taux d'erreurs 503 simulées"""
+
+    def __init__(self, error_rate=0.0, **options):
+        super().__init__(**options)
+        self.error_rate = error_rate
+        self.stats = {'forecast': 0, 'geocode': 0, 'throttled': 0, 'errors': 0, 'not_found': 0}
+
+
+class WeatherStubHandler(StubHandler):
+
+    def send_json(self, data, status=200):
+        self.send_body(json.dumps(data), status=status, content_type='application/json')
+
+    def do_GET(self):
+        state = self.state
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/__stats':
+            return self.send_json(state.stats)
+
+        if state.over_limit():
+            state.count('throttled')
+            return self.send_body('Too Many Requests', status=429, headers={'Retry-After': '1'})
+        if state.latency:
+            time.sleep(state.latency)
+        if state.error_rate and random.random() < state.error_rate:
+            state.count('errors')
+            return self.send_body('Service Unavailable', status=503)
+
+        if url.path == '/forecast':
+            if not query.get('token'):
+                return self.send_json({'message': 'token manquant'}, status=401)
+            state.count('forecast')
+            return self.send_json(forecast_data(float(query['lat'][0]), float(query['lon'][0])))
+        if url.path == '/search':
+            state.count('geocode')
+            return self.send_json(geocode_data(query.get('q', [''])[0]))
+
+        state.count('not_found')
+        self.send_body('Not Found', status=404)
+
+
+def make_server(port=0, host='127.0.0.1', **options):
+    """Serveur prêt à lancer (`serve_forever`) ; port=0 choisit un port libre (server.server_port)"""
+    handler = type('BoundWeatherStubHandler', (WeatherStubHandler,), {'state': WeatherStubState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(port=0, **options):
+    """Lance le faux Météo-France dans un thread, pour les scripts de test ; renvoie (server, base_url)"""
+    server = make_server(port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Faux Météo-France local pour tester weather_fetch.py')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.0, help='secondes ajoutées à chaque réponse')
+    parser.add_argument('--max-rps', type=int, default=None, help='au-delà, réponses 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='part des réponses en 503')
+    args = parser.parse_args()
+
+    server = make_server(args.port, latency=args.latency, max_rps=args.max_rps, error_rate=args.error_rate)
+    print(f"Faux Météo-France sur http://127.0.0.1:{server.server_port}")
+    server.serve_forever()
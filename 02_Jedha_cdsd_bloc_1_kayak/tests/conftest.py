@@ -0,0 +1,31 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+# Les scripts de src/ s'importent entre eux par leur nom (lancés depuis src/)
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+import booking_stub  # noqa: E402
+
+
+@pytest.fixture
+def booking():
+    """Faux Booking dans un thread, renvoie (state, base_url) ; options modifiables sur `state`"""
+    server, base_url = booking_stub.start_in_thread()
+    yield server.RequestHandlerClass.state, base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def run_script():
+    """Lance un script de src/ dans un autre processus (un seul CrawlerProcess par processus), renvoie son log"""
+    def run(name, *args):
+        result = subprocess.run([sys.executable, name, *map(str, args)], cwd=SRC_DIR,
+                                capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, result.stderr[-3000:]
+        return result.stderr
+    return run
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from feed_io import iter_items
+
+
+def card(slug):
+    """Carte d'une page de résultats, même balisage que booking_stub.search_page"""
+    return (f'<div data-testid="property-card"><h3><a data-testid="title-link" '
+            f'href="/hotel/fr/{slug}.fr.html?aid=304142&amp;srpvid=stub"><div>{slug}</div></a></h3></div>')
+
+
+@pytest.fixture
+def overlapping_pages(booking, tmp_path):
+    """
+    Pages de résultats qui se recouvrent : la page 2 de Collioure reprend 5 hôtels de la page 1 et
+    la page 1 de Banyuls 5 hôtels de Collioure. Les autres pages sont celles, synthétiques, du stub.
+    """
+    pages = {
+        'collioure_0.html': [f'collioure-{i}' for i in range(0, 25)],
+        'collioure_25.html': [f'collioure-{i}' for i in range(20, 45)],
+        'banyuls_0.html': [f'banyuls-{i}' for i in range(0, 25)] + [f'collioure-{i}' for i in range(5)],
+    }
+    os.makedirs(tmp_path / 'pages' / 'searchresults')
+    for name, slugs in pages.items():
+        (tmp_path / 'pages' / 'searchresults' / name).write_text(
+            f'<html><body>{"".join(card(slug) for slug in slugs)}</body></html>', encoding='utf-8')
+    state, base_url = booking
+    state.pages_dir = str(tmp_path / 'pages')
+    # Collioure : 0-44 puis 50-59 (page synthétique) ; Banyuls : 0-24 puis 25-59
+    hotels = {f'{base_url}/hotel/fr/collioure-{i}.fr.html' for i in [*range(45), *range(50, 60)]}
+    hotels |= {f'{base_url}/hotel/fr/banyuls-{i}.fr.html' for i in range(60)}
+    return state, base_url, hotels
+
+
+def test_incremental_crawl_resumes_without_requests(overlapping_pages, run_script, tmp_path):
+    state, base_url, hotels = overlapping_pages
+    output = tmp_path / 'hotels.jsonl'
+    args = ['--base-url', base_url, '--cities', 'Collioure,Banyuls', '--max-pages', 3, '--min-delay', 0,
+            '--concurrency', 8, '--incremental', '--store', tmp_path / 'store.sqlite',
+            '--cache-dir', tmp_path / 'httpcache', '--job-dir', tmp_path / 'job', '--output', output]
+    run_script('booking_crawl.py', *args)
+
+    # Chaque hôtel demandé et exporté une seule fois, malgré les pages qui se recouvrent
+    items = list(iter_items(str(output)))
+    assert sorted(item['url'] for item in items) == sorted(hotels)
+    assert all(item['nom'] != 'Non disponible' for item in items)
+    assert state.stats['hotel'] == len(hotels)
+    assert state.stats['search'] == 2 * 3
+    served = dict(state.stats)
+
+    # Même JOBDIR, même cache, même store : aucune requête, l'export est réécrit à la fermeture
+    os.remove(output)
+    run_script('booking_crawl.py', *args)
+    assert state.stats == served
+    assert sorted(item['url'] for item in iter_items(str(output))) == sorted(hotels)
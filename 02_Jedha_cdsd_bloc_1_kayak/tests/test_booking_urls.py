@@ -0,0 +1,40 @@
+import re
+
+from feed_io import iter_items
+from polite_crawl import BACKOFF_HTTP_CODES, polite_settings
+
+CITIES = ['Collioure', 'Gorges du Verdon']
+
+
+def crawl_stats(log):
+    """Statistiques Scrapy affichées à la fin du crawl ('clé': valeur)"""
+    return {key: int(value) for key, value in re.findall(r"'([\w/ .-]+)': (\d+)", log)}
+
+
+def test_paging_with_throttled_stub(booking, run_script, tmp_path):
+    state, base_url = booking
+    state.max_rps = 2  # 429 + Retry-After au-delà
+    output = tmp_path / 'urls.jsonl'
+    log = run_script('booking_url_hotel.py', '--base-url', base_url, '--cities', ','.join(CITIES),
+                     '--output', output, '--max-pages', 3, '--min-delay', 0, '--concurrency', 8)
+
+    # 60 hôtels par ville sur 3 pages de 25 : toutes les pages servies une fois, malgré les 429
+    urls = list(iter_items(str(output)))
+    assert len(urls) == 2 * 60
+    assert len({item['url'] for item in urls}) == len(urls)
+    assert {item['city'] for item in urls} == set(CITIES)
+    assert state.stats['search'] == 2 * 3
+    assert state.stats['throttled'] > 0
+
+    # Les 429 sont replanifiés par BackoffMiddleware seul, pas une deuxième fois par RetryMiddleware
+    stats = crawl_stats(log)
+    assert stats['backoff/429'] == state.stats['throttled']
+    assert stats['backoff/count'] == state.stats['throttled']
+    assert not any(key.startswith('retry/') for key in stats)
+
+
+def test_backoff_codes_left_to_backoff_middleware():
+    # Après l'abandon de BackoffMiddleware, RetryMiddleware ne doit pas recommencer avec RETRY_TIMES
+    settings = polite_settings(backoff_retries=1)
+    assert not set(BACKOFF_HTTP_CODES) & set(settings['RETRY_HTTP_CODES'])
+    assert 500 in settings['RETRY_HTTP_CODES']
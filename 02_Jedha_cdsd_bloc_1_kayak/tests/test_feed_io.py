@@ -0,0 +1,74 @@
+import gzip
+import json
+
+from feed_io import feed_options, gzip_complete, iter_items, repair_tail, write_items
+
+ITEMS = [{'ville': 'Collioure', 'nom': f'Hôtel {i}', 'note': 'Avec une note de 8.5'} for i in range(50)]
+
+
+def append_lines(path, items):
+    """Ajout comme le feed : un nouveau membre gzip pour un .jsonl.gz"""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'ab') as f:
+        for item in items:
+            f.write((json.dumps(item, ensure_ascii=False) + '\n').encode('utf-8'))
+
+
+def test_missing_or_empty_file_is_left_alone(tmp_path):
+    repair_tail(str(tmp_path / 'absent.jsonl'))
+    assert not (tmp_path / 'absent.jsonl').exists()
+    empty = tmp_path / 'empty.jsonl'
+    empty.write_bytes(b'')
+    repair_tail(str(empty))
+    assert empty.read_bytes() == b''
+
+
+def test_truncated_jsonl_line_is_terminated(tmp_path):
+    path = tmp_path / 'hotels.jsonl'
+    write_items(str(path), ITEMS)
+    path.write_bytes(path.read_bytes()[:-20])  # crawl interrompu au milieu d'une ligne
+    repair_tail(str(path))
+    assert path.read_bytes().endswith(b'\n')
+
+    append_lines(path, ITEMS[:3])
+    assert list(iter_items(str(path))) == ITEMS[:-1] + ITEMS[:3]
+
+
+def test_complete_jsonl_is_unchanged(tmp_path):
+    path = tmp_path / 'hotels.jsonl'
+    write_items(str(path), ITEMS)
+    before = path.read_bytes()
+    repair_tail(str(path))
+    assert path.read_bytes() == before
+
+
+def test_truncated_gzip_is_rewritten_before_append(tmp_path):
+    path = tmp_path / 'hotels.jsonl.gz'
+    write_items(str(path), ITEMS)
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) // 2])
+    assert not gzip_complete(str(path))
+    readable = list(iter_items(str(path)))
+    assert readable == ITEMS[:len(readable)]
+
+    repair_tail(str(path))
+    assert gzip_complete(str(path))
+    append_lines(path, ITEMS[:3])
+    assert list(iter_items(str(path))) == readable + ITEMS[:3]
+
+
+def test_feed_options_repairs_before_appending(tmp_path):
+    path = tmp_path / 'hotels.jsonl'
+    path.write_bytes(b'{"nom": "A"}\n{"nom": "B')
+    options = feed_options(str(path), indent=2)
+    assert options['format'] == 'jsonlines' and options['overwrite'] is False
+    assert 'indent' not in options and not options['jsonl_gzip']
+    assert path.read_bytes() == b'{"nom": "A"}\n{"nom": "B\n'
+    assert list(iter_items(str(path))) == [{'nom': 'A'}]
+    assert feed_options(str(tmp_path / 'hotels.json'), indent=2) == {'format': 'json', 'overwrite': True, 'indent': 2}
+
+
+def test_write_items_json_matches_json_dump(tmp_path):
+    path = tmp_path / 'hotels.json'
+    write_items(str(path), iter(ITEMS))
+    assert path.read_text(encoding='utf-8') == json.dumps(ITEMS, ensure_ascii=False, indent=2)
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from hotel_ranking import DATA_DIR, ENRICHED_COLUMNS, city_key, parse_note, run
+
+HOTELS = os.path.join(DATA_DIR, 'hotels_details.json')
+WEATHER = os.path.join(DATA_DIR, 'cities_weather.csv')
+HOTELS_INFO = os.path.join(DATA_DIR, 'hotels_info.csv')
+TEMPERATURE_ONLY = {'temperature': 1.0, 'rain': 0.0, 'note': 0.0}
+
+
+def test_parse_note():
+    notes = pd.Series(['Avec une note de 8.5', 'Avec une note de 9', '8,5', 'Non disponible', None, 7])
+    parsed = parse_note(notes)
+    assert parsed.isna().tolist() == [False, False, False, True, True, False]
+    assert parsed.dropna().tolist() == [8.5, 9.0, 8.5, 7.0]
+
+
+def test_city_key():
+    keys = city_key(pd.Series(['Gorges du Verdon', 'gorges du verdon ', 'Château-d’Oléron', None]))
+    assert keys.tolist()[:3] == ['gorges-du-verdon', 'gorges-du-verdon', 'chateau-doleron']
+    assert pd.isna(keys.iloc[3])
+
+
+def test_enriched_hotels_match_hotels_info(tmp_path):
+    output = tmp_path / 'hotels_enriched.csv'
+    run(HOTELS, WEATHER, str(output), chunk_size=100)
+    enriched = pd.read_csv(output)
+    assert list(enriched.columns) == ENRICHED_COLUMNS
+    assert len(enriched) == 689 and enriched['note'].isna().sum() == 14
+
+    # hotels_info.csv : jointure faite dans le notebook (une ligne en double par URL présente pour deux villes)
+    notebook = pd.read_csv(HOTELS_INFO).drop_duplicates('url').set_index('url')
+    enriched = enriched.set_index('url').loc[notebook.index]
+    for column in ('note', 'insee', 'pluiew_mean', 'tw_mean'):
+        np.testing.assert_allclose(enriched[column], notebook[column], equal_nan=True)
+
+
+def test_temperature_only_ranking_is_the_notebook_top_5():
+    destinations = run(HOTELS, WEATHER, weights=TEMPERATURE_ONLY).destinations(top=5, max_rain=3)
+    weather = pd.read_csv(WEATHER)
+    notebook = weather[weather['pluiew_mean'] <= 3].nlargest(5, 'tw_mean')
+    assert destinations['ville'].tolist() == notebook['ville'].tolist()
+    assert destinations['rank'].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_ranking_does_not_depend_on_chunks():
+    rankings = [run(HOTELS, WEATHER, per_city=3, chunk_size=chunk_size) for chunk_size in (7, 100000)]
+    destinations = [ranking.destinations(top=10, max_rain=5) for ranking in rankings]
+    pd.testing.assert_frame_equal(destinations[0], destinations[1])
+    hotels = [ranking.hotels(top).reset_index(drop=True) for ranking, top in zip(rankings, destinations)]
+    pd.testing.assert_frame_equal(hotels[0], hotels[1])
+    assert (hotels[0].groupby('rank').size() <= 3).all()
+
+    scores = destinations[0]['score']
+    assert scores.between(0, 1).all() and scores.is_monotonic_decreasing
+    assert (destinations[0]['pluiew_mean'] <= 5).all()
+
+
+def test_csv_input_gives_the_same_hotels():
+    from_json = run(HOTELS, WEATHER)
+    from_csv = run(HOTELS_INFO, WEATHER, chunk_size=50)
+    top = from_json.destinations(top=5)
+    columns = ['rank', 'ville', 'nom', 'note', 'score', 'url']
+    pd.testing.assert_frame_equal(from_json.hotels(top)[columns].reset_index(drop=True),
+                                  from_csv.hotels(from_csv.destinations(top=5))[columns].reset_index(drop=True))
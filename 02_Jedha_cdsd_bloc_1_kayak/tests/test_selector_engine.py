@@ -0,0 +1,48 @@
+import json
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from booking_info_hotel import HotelExtractor
+
+PAGE = ('<html><head>{json_ld}</head><body>'
+        '<h2 class="pp-header__title">Le Glacis</h2>'
+        '<div class="b5cd09854e">Avec une note de 9.3</div>'
+        '<span class="hp_address_subtitle">18 Rue Boramar, 66190 Collioure</span>'
+        '<div id="property_description_content"><p>Face à la mer.</p></div>'
+        '</body></html>')
+FROM_PAGE = {'nom': 'Le Glacis', 'note': 'Avec une note de 9.3',
+             'adresse': '18 Rue Boramar, 66190 Collioure', 'description': 'Face à la mer.'}
+
+
+def response(json_ld=None):
+    block = f'<script type="application/ld+json">{json_ld}</script>' if json_ld is not None else ''
+    return HtmlResponse('http://booking.test/hotel/fr/glacis.html', body=PAGE.format(json_ld=block).encode('utf-8'),
+                        encoding='utf-8', request=Request('http://booking.test/hotel/fr/glacis.html'))
+
+
+def test_compiled_chains_match_parsel():
+    page = response()
+    assert HotelExtractor().extract(page) == HotelExtractor(backend='parsel').extract(page) == FROM_PAGE
+
+
+def test_json_ld_is_off_by_default():
+    hotel = {'@type': 'Hotel', 'name': 'Autre nom', 'aggregateRating': {'ratingValue': 8}}
+    assert HotelExtractor().extract(response(json.dumps(hotel))) == FROM_PAGE
+
+
+@pytest.mark.parametrize('json_ld', [
+    '"x"', '3', 'null', '[1, "a"]', '{pas du json',
+    '{"@type": {"x": 1}}',
+    '{"@graph": {"@type": "Hotel", "name": ["a"]}}',
+    '{"@type": ["Hotel"], "name": 5, "address": ["rue"], "aggregateRating": {"ratingValue": [9]}}',
+])
+def test_unexpected_json_ld_falls_back_to_selectors(json_ld):
+    assert HotelExtractor(json_ld=True).extract(response(json_ld)) == FROM_PAGE
+
+
+def test_json_ld_values():
+    hotel = {'@type': 'Hotel', 'name': ' Le Glacis ', 'aggregateRating': {'ratingValue': 9.0},
+             'address': {'streetAddress': '18 Rue Boramar', 'postalCode': 66190, 'addressLocality': 'Collioure'}}
+    fields = HotelExtractor(json_ld=True).extract(response(json.dumps(hotel)))
+    assert fields == dict(FROM_PAGE, note='Avec une note de 9', adresse='18 Rue Boramar, 66190, Collioure')
@@ -0,0 +1,86 @@
+import asyncio
+import csv
+import itertools
+
+import pandas as pd
+import pytest
+
+import weather_stub
+from weather_fetch import read_cities, refresh
+
+DAY = '2025-10-06'
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    # Une réponse sur trois en 503 (tirage remplacé par une suite fixe)
+    draws = itertools.cycle([0.0, 0.9, 0.9])
+    monkeypatch.setattr(weather_stub.random, 'random', lambda: next(draws))
+    server, base_url = weather_stub.start_in_thread(error_rate=0.5)
+    yield server.RequestHandlerClass.state, base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cities_csv(tmp_path):
+    """30 villes : la moitié avec lat / lon, l'autre moitié à géocoder"""
+    path = tmp_path / 'cities.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ville', 'lat', 'lon'])
+        for i in range(30):
+            writer.writerow([f'Ville {i}', 43 + i / 10, 3 + i / 10] if i % 2 else [f'Ville {i}', '', ''])
+    return str(path)
+
+
+def run(stub, cities_csv, tmp_path, day=DAY, retries=6):
+    state, base_url = stub
+    return asyncio.run(refresh(
+        read_cities(cities_csv), str(tmp_path / 'weather.csv'), str(tmp_path / 'cities_weather.csv'),
+        str(tmp_path / 'cache'), day=day, rps=100, geocoder_rps=100, base_url=base_url, token='test',
+        geocoder_url=f'{base_url}/search', retries=retries, backoff=0.01,
+    ))
+
+
+def test_refresh_retries_and_means(stub, cities_csv, tmp_path):
+    state, _ = stub
+    state.max_rps = 25  # 429 + Retry-After au-delà
+    stats, failed = run(stub, cities_csv, tmp_path)
+    assert failed == []
+    assert stats['retries'] > 0 and state.stats['errors'] > 0 and state.stats['throttled'] > 0
+    assert state.stats['forecast'] == 30 and state.stats['geocode'] == 15
+
+    weather = pd.read_csv(tmp_path / 'weather.csv')
+    assert len(weather) == 30 * 7 and weather['ville'].nunique() == 30
+    # Mêmes moyennes que le groupby du notebook
+    weather['tw'] = (weather['tmin'] + weather['tmax']) / 2
+    expected = weather.groupby('insee').agg(pluiew_mean=('pluie', 'mean'), tw_mean=('tw', 'mean'))
+    cities = pd.read_csv(tmp_path / 'cities_weather.csv').set_index('insee')
+    assert list(cities.index) == sorted(expected.index)
+    pd.testing.assert_frame_equal(cities[['pluiew_mean', 'tw_mean']], expected, check_exact=False)
+
+
+def test_second_run_same_day_is_served_from_cache(stub, cities_csv, tmp_path):
+    state, _ = stub
+    run(stub, cities_csv, tmp_path)
+    first = (tmp_path / 'cities_weather.csv').read_text(encoding='utf-8')
+    served = dict(state.stats)
+
+    stats, failed = run(stub, cities_csv, tmp_path)
+    assert failed == []
+    assert stats['requests'] == 0 and stats['cache_hits'] == 30
+    assert state.stats == served
+    assert (tmp_path / 'cities_weather.csv').read_text(encoding='utf-8') == first
+
+
+def test_failed_cities_keep_previous_rows(stub, cities_csv, tmp_path):
+    state, _ = stub
+    run(stub, cities_csv, tmp_path)
+    previous = pd.read_csv(tmp_path / 'weather.csv').sort_values(['insee', 'date']).reset_index(drop=True)
+
+    state.error_rate = 1.0  # l'API ne répond plus qu'en 503
+    stats, failed = run(stub, cities_csv, tmp_path, day='2025-10-07', retries=1)
+    assert len(failed) == 30
+    weather = pd.read_csv(tmp_path / 'weather.csv').sort_values(['insee', 'date']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(weather, previous)
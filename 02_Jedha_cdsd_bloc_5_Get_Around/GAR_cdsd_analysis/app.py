@@ -1,9 +1,17 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
-import joblib
-from pydantic import BaseModel
+
+from gar_inference import PredictionFeatures, make_predictor
+from data_cache import ColumnarCache
+from delay_index import GroupedRangeIndex
+from previous_rentals import delay_impact_data
+from threshold_simulator import simulate_thresholds
+from sweep import SWEEP_RANGES, run_sweep
+from frame_cache import FrameCache
+from table_view import sort_positions, page_count, page_rows, downsample
 
 # --- Global Configuration and Data Loading ---
 
@@ -11,83 +19,167 @@ from pydantic import BaseModel
 DELAY_ANALYSIS_URL = 'https://full-stack-assets.s3.eu-west-3.amazonaws.com/Deployment/get_around_delay_analysis.xlsx'
 PRICING_DATA_URL = "https://full-stack-assets.s3.eu-west-3.amazonaws.com/Deployment/get_around_pricing_project.csv"
 
+# Local Feather copies of the datasets (re-downloaded only when the source ETag / mtime changes)
+DATA_CACHE_DIR = os.getenv("GAR_DATA_CACHE_DIR", "data_cache")
+data_cache = ColumnarCache(DATA_CACHE_DIR)
+
+# Bin widths (minutes) of the pre-binned histograms, aligned on the slider steps
+TIME_DELTA_BIN_WIDTH = 15.0
+PREVIOUS_DELAY_BIN_WIDTH = 10.0
+
+# Prediction backend (shared with the API, see gar_inference) :
+# - GAR_PREDICTION_MODE=local (default) : the model is loaded in this process
+# - GAR_PREDICTION_MODE=api : predictions are asked to the API at GAR_API_URL (no model in memory here)
+PREDICTION_MODE = os.getenv("GAR_PREDICTION_MODE", "local")
+# Copy of the API's model (GAR_cdsd_pred/modele_GAR.joblib), kept in sync by ../sync_shared.py
+MODEL_PATH = os.getenv("GAR_MODEL_PATH", "modele_GAR.joblib")
+API_URL = os.getenv("GAR_API_URL", "http://localhost:7860")
+
+@st.cache_resource
+def get_predictor():
+    """Model (or API client) loaded once per process and shared by all sessions and reruns."""
+    return make_predictor(PREDICTION_MODE, model_path=MODEL_PATH, api_url=API_URL)
+
+
 try:
-    # NOTE: Ensure 'modele_GAR.joblib' is available in your Docker container or GitHub repo root.
-    loaded_model = joblib.load('modele_GAR.joblib') 
+    # NOTE: in local mode, 'modele_GAR.joblib' must be next to app.py (or set GAR_MODEL_PATH).
+    predictor = get_predictor()
     MODEL_LOADED = True
 except Exception as e:
     # Error message if the model file is not found or fails to load
-    st.error(f"Error loading model: {e}. Prediction feature is disabled. Please ensure 'modele_GAR.joblib' is in the root directory.")
+    st.error(f"Error loading model: {e}. Prediction feature is disabled. Please ensure the model file exists ({MODEL_PATH}).")
     MODEL_LOADED = False
 
+# Cache of the loaded / derived frames, shared by all sessions, bounded in entries, age and memory
+CACHE_MAX_ENTRIES = int(os.getenv("GAR_FRAME_CACHE_MAX_ENTRIES", "32"))
+CACHE_TTL_SECONDS = float(os.getenv("GAR_FRAME_CACHE_TTL_SECONDS", "21600"))
+CACHE_MAX_MB = float(os.getenv("GAR_FRAME_CACHE_MAX_MB", "512"))
+
 
-# Prediction Features Definition (used as reference for input fields)
-class PredictionFeatures(BaseModel):
-    model_key: str
-    mileage: float
-    engine_power: float
-    fuel: str
-    paint_color: str
-    car_type: str
-    private_parking_available: bool
-    has_gps: bool
-    has_air_conditioning: bool
-    automatic_car: bool
-    has_getaround_connect: bool
-    has_speed_regulator: bool
-    winter_tires: bool
+@st.cache_resource
+def get_frame_cache():
+    """Created once per process (the script itself is re-executed at each interaction)."""
+    return FrameCache(max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_MB * 1024 ** 2)
+
+
+frame_cache = get_frame_cache()
 
 # --- CACHED DATA LOADING FUNCTIONS ---
+# Values are shared, not copied : they must not be modified in place.
 
-@st.cache_data
+@frame_cache.memoize
 def load_delay_data(url):
-    """Loads the rental delay analysis dataset."""
-    data_delay = pd.read_excel(url, sheet_name=['rentals_data', 'Documentation'])
-    return data_delay['rentals_data']
+    """Loads the rental delay analysis dataset (only the rentals_data sheet, from the local Feather copy when up to date)."""
+    return data_cache.load_excel_sheet(url, 'rentals_data')
 
 # NOUVELLE FONCTION POUR PRÉPARER LES DONNÉES D'IMPACT DU RETARD
-@st.cache_data
-def calculate_delay_impact_data(data_delay_rentals):
+@frame_cache.memoize
+def calculate_delay_impact_data(url, max_hops=1):
     """
     Prépare les données pour l'analyse de l'impact du retard de la location précédente.
     """
-    # on filtre les locations avec une location juste avant elles (previous_ended_rental_id > 0)
-    condi2 = data_delay_rentals['previous_ended_rental_id'].notna()
-    data_delay_rentals_data_withpreviousrental = data_delay_rentals[condi2].copy()
-
-    # on trouve les valeurs de retard de checkout (delay_at_checkout_in_minutes) de la location précédente (previous_ended_rental_id)
-    data_delay_rentals_data_withpreviousrental_withdelay = pd.merge(
-        data_delay_rentals_data_withpreviousrental, 
-        data_delay_rentals[['rental_id', 'delay_at_checkout_in_minutes']],
-        left_on='previous_ended_rental_id',
-        right_on='rental_id',
-        how='left',
-        suffixes=('_current', '_previous')
+    data_delay_rentals = load_delay_data(url)
+    # on trouve le retard de checkout de la location précédente (previous_ended_rental_id) par un index trié
+    # sur rental_id (pas de merge), et on garde les locations précédées d'une location en retard (> 0).
+    # max_hops > 1 : on remonte aussi la chaîne des locations précédentes de la même voiture
+    return delay_impact_data(data_delay_rentals, max_hops=max_hops)
+
+
+# Thresholds (minutes) simulated for the minimum delay feature
+SIMULATION_THRESHOLDS = np.arange(0, 721, 15)
+
+@frame_cache.memoize
+def simulate_threshold_grid(url):
+    """Revenue share lost / problem cases solved for every threshold x scope, computed once."""
+    return simulate_thresholds(load_delay_data(url), calculate_delay_impact_data(url), SIMULATION_THRESHOLDS)
+
+
+@frame_cache.memoize
+def build_time_delta_index(url):
+    """Sorted time deltas per checkin_type and their 15-min bins, built once : slider moves only query it."""
+    df_full = load_delay_data(url)
+    return GroupedRangeIndex(
+        df_full['time_delta_with_previous_rental_in_minutes'],
+        df_full['checkin_type'].astype(str),
+        bin_width=TIME_DELTA_BIN_WIDTH,
     )
-    
-    # Renommer et nettoyer
-    data_delay_rentals_data_withpreviousrental_withdelay = data_delay_rentals_data_withpreviousrental_withdelay.rename(
-        columns={'delay_at_checkout_in_minutes_previous': 'delay_at_checkout_in_minutes_from_previous_rental'}
-    ).drop(columns=['rental_id_previous'])
 
-    # on filtre les locations précédées d'une location avec un retard (delay_at_checkout_in_minutes_from_previous_rental > 0)
-    # On utilise .notna() ici pour s'assurer que le merge a bien fonctionné et on garde seulement les retards positifs
-    condi3 = (data_delay_rentals_data_withpreviousrental_withdelay['delay_at_checkout_in_minutes_from_previous_rental'].notna()) & \
-             (data_delay_rentals_data_withpreviousrental_withdelay['delay_at_checkout_in_minutes_from_previous_rental'] > 0)
-             
-    data_filtered = data_delay_rentals_data_withpreviousrental_withdelay[condi3].copy()
 
-    return data_filtered
+@frame_cache.memoize
+def build_previous_delay_index(url):
+    """Same index on the delay of the previous rental, per state of the current rental."""
+    df_delay_impact = calculate_delay_impact_data(url)
+    return GroupedRangeIndex(
+        df_delay_impact['delay_at_checkout_in_minutes_from_previous_rental'],
+        df_delay_impact['state'].astype(str),
+        bin_width=PREVIOUS_DELAY_BIN_WIDTH,
+        origin=0.0,
+    )
 
 
-@st.cache_data
+@frame_cache.memoize
+def sweep_predictions(base_features, axes_spec):
+    """Sweep grid + option uplift of a car in one model call, memoized per (car, ranges)."""
+    axes = {name: np.linspace(low, high, int(steps)) for name, (low, high, steps) in axes_spec.items()}
+    return run_sweep(predictor.predict_records, base_features, axes)
+
+
+@frame_cache.memoize
 def load_pricing_data(url):
     """Loads the pricing project dataset for the ML section."""
-    df = pd.read_csv(url)
+    df = data_cache.load_csv(url)
     if 'Unnamed: 0' in df.columns:
         df = df.drop('Unnamed: 0', axis=1)
     return df
 
+# Consecutive previous rentals followed in the delay propagation table
+DELAY_CHAIN_MAX_HOPS = 3
+
+# Raw data views : tables shown page by page, line charts reduced to this number of points per line
+RAW_TABLES = {"delay": (load_delay_data, DELAY_ANALYSIS_URL), "pricing": (load_pricing_data, PRICING_DATA_URL)}
+PAGE_SIZES = [25, 50, 100, 500]
+MAX_PLOT_POINTS = 2000
+
+
+@frame_cache.memoize
+def raw_sort_order(table, column, ascending):
+    """Sorted row positions of a raw table, computed once per column and order."""
+    loader, url = RAW_TABLES[table]
+    return sort_positions(loader(url), column, ascending)
+
+
+def paginated_table(table):
+    """
+    Sortable raw table : only the rows of the current page are serialized, so the cost
+    of a rerun does not depend on the size of the table.
+    """
+    loader, url = RAW_TABLES[table]
+    df = loader(url)
+
+    col_sort, col_order, col_size, col_page = st.columns([3, 2, 2, 2])
+    sort_column = col_sort.selectbox("Sort by", ["(none)"] + list(df.columns), key=f"{table}_sort")
+    ascending = col_order.radio("Order", ["Ascending", "Descending"], horizontal=True,
+                                key=f"{table}_order") == "Ascending"
+    page_size = col_size.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{table}_page_size")
+    pages = page_count(len(df), page_size)
+    # No max_value : a page out of range after a change of page size shows the last page
+    page = min(col_page.number_input(f"Page (1 - {pages})", min_value=1, value=1, key=f"{table}_page"), pages)
+
+    positions = raw_sort_order(table, None if sort_column == "(none)" else sort_column, ascending)
+    rows = page_rows(df, positions, page, page_size)
+    st.dataframe(rows)
+    first = (page - 1) * page_size
+    st.caption(f"Rows {first + 1 if len(rows) else 0} - {first + len(rows)} of {len(df)}.")
+
+    numeric_columns = list(df.select_dtypes("number").columns)
+    if numeric_columns and st.checkbox("Plot a column in this order", False, key=f"{table}_plot"):
+        plot_column = st.selectbox("Column", numeric_columns, key=f"{table}_plot_column")
+        series = pd.DataFrame({"row": np.arange(len(positions)),
+                               plot_column: df[plot_column].to_numpy()[positions]})
+        fig = px.line(downsample(series, "row", plot_column, MAX_PLOT_POINTS), x="row", y=plot_column,
+                      title=f"{plot_column} ({min(len(series), MAX_PLOT_POINTS)} of {len(series)} points)")
+        st.plotly_chart(fig, use_container_width=True)
+
 # --- APPLICATION PAGES ---
 
 def rental_analysis_page():
@@ -96,6 +188,7 @@ def rental_analysis_page():
     st.title("📊 Impact of Time Delta & Previous Rental Delay")
 
     df_full = load_delay_data(DELAY_ANALYSIS_URL)
+    delta_index = build_time_delta_index(DELAY_ANALYSIS_URL)
     
     # --- SECTION 1: Time Delta Analysis (Existing Code) ---
     
@@ -104,8 +197,7 @@ def rental_analysis_page():
     total_rentals = len(df_full)
     
     # Calculate non-followed rentals
-    df_notfollow = df_full[df_full['time_delta_with_previous_rental_in_minutes'].isna()]
-    not_followed_count = len(df_notfollow)
+    not_followed_count = total_rentals - delta_index.total
 
     if total_rentals > 0:
         not_followed_percentage = round((not_followed_count / total_rentals) * 100, 2)
@@ -118,19 +210,18 @@ def rental_analysis_page():
     # Display raw data checkbox
     if st.checkbox('Display raw data', False):
         st.subheader('Raw Data')
-        st.dataframe(df_full)
+        paginated_table("delay")
 
     # --- 2. INTERACTIVE FILTER CREATION ---
     st.sidebar.subheader("Time Delta Filter")
 
     # Filter by Interval (Slider for a numerical column)
-    df_clean = df_full.dropna(subset=['time_delta_with_previous_rental_in_minutes'])
-    if df_clean.empty:
+    if delta_index.total == 0:
         st.error("Delay analysis data is empty or all missing.")
         return
 
-    min_val = float(df_clean['time_delta_with_previous_rental_in_minutes'].min())
-    max_val = float(df_clean['time_delta_with_previous_rental_in_minutes'].max())
+    min_val = delta_index.min
+    max_val = delta_index.max
 
     valeur_range = st.sidebar.slider(
         "Select minimum delta time to apply (in minutes):",
@@ -142,28 +233,25 @@ def rental_analysis_page():
 
     # --- 3. APPLYING THE FILTER ---
     
-    # The filter applies to non-NaN data
-    df_filtered_applied = df_clean.loc[
-        (df_clean['time_delta_with_previous_rental_in_minutes'] >= valeur_range[0]) & 
-        (df_clean['time_delta_with_previous_rental_in_minutes'] <= valeur_range[1])
-    ]
-
-    total_clean_rentals = len(df_clean)
-    rentals_followed = len(df_filtered_applied)
+    # The filter applies to non-NaN data : counts come from the sorted index, no row is scanned
+    kept_by_checkin = delta_index.count_by_group(valeur_range[0], valeur_range[1])
+
+    total_clean_rentals = delta_index.total
+    rentals_followed = sum(kept_by_checkin.values())
     rentals_lost = total_clean_rentals - rentals_followed
 
     # --- 4. CREATION and DISPLAY of the Time Delta Histogram ---
-    if not df_clean.empty:
+    if total_clean_rentals > 0:
         
         # 1. Calcul du pourcentage global de locations impactées
         global_impacted_pct = round((rentals_lost / total_rentals) * 100, 2)
 
         # 2. Calcul des locations perdues par type de check-in
-        df_lost = df_clean.loc[
-            (df_clean['time_delta_with_previous_rental_in_minutes'] < valeur_range[0]) | 
-            (df_clean['time_delta_with_previous_rental_in_minutes'] > valeur_range[1])
-        ]
-        lost_by_checkin = df_lost.groupby('checkin_type').size().to_dict()
+        lost_by_checkin = {
+            checkin_type: len(values) - kept_by_checkin[checkin_type]
+            for checkin_type, values in delta_index.sorted_values.items()
+            if len(values) - kept_by_checkin[checkin_type] > 0
+        }
 
 # --- Affichage des Métriques (Global) ---
         st.subheader("Metrics: Time Delta Impact")
@@ -191,16 +279,19 @@ def rental_analysis_page():
 
         st.subheader("Distribution of Time Delta Between Rentals (Filtered)")
         
-        if not df_filtered_applied.empty:
-            # Creating the histogram with Plotly Express
-            fig = px.histogram(
-                df_filtered_applied, 
-                x="time_delta_with_previous_rental_in_minutes",
-                color='checkin_type', 
+        if rentals_followed > 0:
+            # Creating the histogram with Plotly Express from the pre-binned counts (one bar per 15 min bin)
+            df_bins = delta_index.histogram(valeur_range[0], valeur_range[1])
+            fig = px.bar(
+                df_bins, 
+                x="bin_center",
+                y="count",
+                color='group', 
                 barmode='overlay',
-                #nbins=int((valeur_range[1] - valeur_range[0]) / 15) if (valeur_range[1] - valeur_range[0]) > 0 else 1,
+                labels={"group": "checkin_type"},
                 title=f"Distribution of Rentals between {int(valeur_range[0])} and {int(valeur_range[1])} minutes delta"
             )
+            fig.update_traces(width=float(df_bins['bin_width'].iloc[0]))
 
             fig.update_layout(
                 xaxis_title="Time Delta Between Rentals (minutes)",
@@ -223,15 +314,15 @@ def rental_analysis_page():
     st.markdown("---")
     st.header("2. Impact of the Previous Rental's Checkout Delay")
     
-    df_delay_impact = calculate_delay_impact_data(df_full)
+    delay_index = build_previous_delay_index(DELAY_ANALYSIS_URL)
 
-    if df_delay_impact.empty:
+    if delay_index.total == 0:
         st.warning("⚠️ No data available for delay impact analysis (no rentals with a delayed previous rental).")
         return
 
     st.sidebar.subheader("Previous Delay Filter")
     
-    max_delay = float(df_delay_impact['delay_at_checkout_in_minutes_from_previous_rental'].max())
+    max_delay = delay_index.max
     
     default_max_view = min(max_delay, 2000.0) 
 
@@ -243,15 +334,12 @@ def rental_analysis_page():
         step=10.0
     )
     
-    df_viz = df_delay_impact[
-        df_delay_impact['delay_at_checkout_in_minutes_from_previous_rental'] <= delay_range
-    ].copy()
+    kept_for_viz = delay_index.count(0.0, delay_range)
 
 
-    if not df_viz.empty:
+    if kept_for_viz > 0:
         
-        total_impacted = len(df_delay_impact)
-        kept_for_viz = len(df_viz)
+        total_impacted = delay_index.total
         
         impact_pct_of_total_clean = round((total_impacted / total_rentals) * 100, 2)
 
@@ -275,17 +363,20 @@ def rental_analysis_page():
 
         st.subheader("Distribution of the Previous Rental's Delay by Current Rental State")
 
-        fig_delay_impact = px.histogram(
-            df_viz, 
-            x="delay_at_checkout_in_minutes_from_previous_rental",
-            color='state',
+        # About 50 bars whatever the selected range (pre-binned 10 min bins merged together)
+        df_bins = delay_index.histogram(0.0, delay_range, max_bins=50)
+        fig_delay_impact = px.bar(
+            df_bins, 
+            x="bin_center",
+            y="count",
+            color='group',
             barmode='overlay',
-            nbins=50,
+            labels={"group": "state"},
             color_discrete_sequence=px.colors.qualitative.Vivid,
             title="Impact of the Delay on the State of Rental"
         )
         
-        fig_delay_impact.update_traces(opacity=0.6, marker_line_color='black', marker_line_width=1)
+        fig_delay_impact.update_traces(width=float(df_bins['bin_width'].iloc[0]), opacity=0.6, marker_line_color='black', marker_line_width=1)
         
         fig_delay_impact.update_layout(
             xaxis_title="Delay of the Previous Rental at Checkout (minutes)",
@@ -295,10 +386,96 @@ def rental_analysis_page():
         )
 
         st.plotly_chart(fig_delay_impact, use_container_width=True)
+
+        with st.expander("Delay propagation across consecutive rentals"):
+            df_chains = calculate_delay_impact_data(DELAY_ANALYSIS_URL, max_hops=DELAY_CHAIN_MAX_HOPS)
+            propagation = pd.DataFrame([
+                {
+                    "Previous rental": f"{hop} rental(s) before",
+                    "Rentals with a known rental at this rank": int((df_chains['chain_length'] >= hop).sum()),
+                    "Delay still not absorbed at checkin": int((df_chains[f'delay_propagated_from_previous_rental_{hop}'] > 0).sum()),
+                    "Mean delay not absorbed (min)": round(float(df_chains[f'delay_propagated_from_previous_rental_{hop}'].replace(0, np.nan).mean()), 1),
+                }
+                for hop in range(1, DELAY_CHAIN_MAX_HOPS + 1)
+            ])
+            st.dataframe(propagation, hide_index=True)
+            st.caption("A delay is absorbed when the time deltas between the late rental and the current one are longer than the delay.")
     else:
         st.warning("⚠️ No data to display for the selected maximum delay. Please increase the limit.")
 
 
+def threshold_simulation_page():
+    """Displays the trade-off of the minimum delay feature for every threshold and scope."""
+    st.title("🎯 Minimum Delay Threshold Simulator")
+
+    grid = simulate_threshold_grid(DELAY_ANALYSIS_URL)
+    if grid.empty or grid['problem_cases'].max() == 0:
+        st.warning("⚠️ No problem case (previous rental returned later than the time delta) in the data.")
+        return
+
+    st.markdown(
+        "For each **threshold** (minimum time between two rentals) and **scope** (all cars or Connect cars only): "
+        "the share of revenue lost (ended rentals booked closer than the threshold to the previous one) "
+        "and the share of problem cases solved (late previous checkouts the threshold would have absorbed)."
+    )
+
+    threshold = st.select_slider(
+        "Threshold (minutes):",
+        options=SIMULATION_THRESHOLDS.tolist(),
+        value=120,
+    )
+
+    # Every threshold is precomputed : moving the slider is only a lookup in the grid
+    selected = grid[grid['threshold'] == threshold].set_index('scope')
+    columns = st.columns(len(selected))
+    for column, (scope, row) in zip(columns, selected.iterrows()):
+        column.subheader(f"Scope: {scope}")
+        column.metric("Revenue Share Lost", f"{row['revenue_share_lost_pct']}%")
+        column.metric("Rentals Affected", f"{int(row['rentals_affected'])}")
+        column.metric(
+            "Problem Cases Solved",
+            f"{int(row['problem_cases_solved'])} / {int(row['problem_cases'])}",
+            delta=f"{row['problem_cases_solved_pct']}%",
+        )
+
+    fig_tradeoff = px.line(
+        grid,
+        x="revenue_share_lost_pct",
+        y="problem_cases_solved_pct",
+        color="scope",
+        markers=True,
+        hover_data=["threshold", "rentals_affected", "problem_cases_solved"],
+        title="Trade-off: revenue lost vs problem cases solved (one point per threshold)"
+    )
+    fig_tradeoff.add_scatter(
+        x=selected['revenue_share_lost_pct'],
+        y=selected['problem_cases_solved_pct'],
+        mode="markers",
+        marker=dict(size=14, symbol="circle-open", color="black"),
+        name=f"{threshold} min",
+    )
+    fig_tradeoff.update_layout(
+        xaxis_title="Revenue Share Lost (%)",
+        yaxis_title="Problem Cases Solved (%)",
+    )
+    st.plotly_chart(fig_tradeoff, use_container_width=True)
+
+    col_left, col_right = st.columns(2)
+    fig_lost = px.line(downsample(grid, "threshold", "revenue_share_lost_pct", MAX_PLOT_POINTS, group="scope"),
+                       x="threshold", y="revenue_share_lost_pct", color="scope",
+                       title="Revenue Share Lost by Threshold")
+    fig_lost.update_layout(xaxis_title="Threshold (minutes)", yaxis_title="Revenue Share Lost (%)")
+    col_left.plotly_chart(fig_lost, use_container_width=True)
+    fig_solved = px.line(downsample(grid, "threshold", "problem_cases_solved_pct", MAX_PLOT_POINTS, group="scope"),
+                         x="threshold", y="problem_cases_solved_pct", color="scope",
+                         title="Problem Cases Solved by Threshold")
+    fig_solved.update_layout(xaxis_title="Threshold (minutes)", yaxis_title="Problem Cases Solved (%)")
+    col_right.plotly_chart(fig_solved, use_container_width=True)
+
+    with st.expander("Simulation table"):
+        st.dataframe(grid, hide_index=True)
+
+
 def prediction_page():
     """Displays the price prediction page and includes an option to display raw data."""
     st.title("💰 Daily Rental Price Prediction")
@@ -307,11 +484,9 @@ def prediction_page():
         st.error("Machine Learning model could not be loaded. Feature disabled.")
         return
     
-    pricing_df = load_pricing_data(PRICING_DATA_URL)
     if st.checkbox('Display raw pricing data', False):
-        st.subheader('Raw Pricing Data Preview')
-        st.dataframe(pricing_df.head(100)) 
-        st.caption(f"Total rows in dataset: {len(pricing_df)}. Showing first 100 rows.")
+        st.subheader('Raw Pricing Data')
+        paginated_table("pricing")
     
     st.markdown("---")
     st.subheader("Enter vehicle features:")
@@ -342,42 +517,105 @@ def prediction_page():
         has_speed_regulator = st.checkbox("Speed Regulator", value=False)
         winter_tires = st.checkbox("Winter Tires", value=True)
 
+    # Prepare data in the format expected by the model (same schema as the API)
+    input_data = PredictionFeatures(
+        model_key=model_key,
+        mileage=mileage,
+        engine_power=engine_power,
+        fuel=fuel,
+        paint_color=paint_color,
+        car_type=car_type,
+        private_parking_available=private_parking_available,
+        has_gps=has_gps,
+        has_air_conditioning=has_air_conditioning,
+        automatic_car=automatic_car,
+        has_getaround_connect=has_getaround_connect,
+        has_speed_regulator=has_speed_regulator,
+        winter_tires=winter_tires
+    ).model_dump()
 
-    # --- Prediction Button ---
     st.markdown("---")
+    mode = st.radio("Mode", ["Single prediction", "Sweep (what-if)"], horizontal=True)
+    if mode == "Sweep (what-if)":
+        sweep_section(input_data)
+        return
+
+    # --- Prediction Button ---
     if st.button("Calculate Estimated Rental Price", type="primary"):
-        # 1. Prepare data in the format expected by the model
-        input_data = pd.DataFrame({
-            "model_key": [model_key],
-            "mileage": [mileage],
-            "engine_power": [engine_power],
-            "fuel": [fuel],
-            "paint_color": [paint_color],
-            "car_type": [car_type],
-            "private_parking_available": [private_parking_available],
-            "has_gps": [has_gps],
-            "has_air_conditioning": [has_air_conditioning],
-            "automatic_car": [automatic_car],
-            "has_getaround_connect": [has_getaround_connect],
-            "has_speed_regulator": [has_speed_regulator],
-            "winter_tires": [winter_tires]
-        })
-
-        # 2. Prediction (replaces API call)
+        # Prediction (in this process or through the API, depending on GAR_PREDICTION_MODE)
         try:
-            prediction = loaded_model.predict(input_data)
-            predicted_price = round(prediction.tolist()[0], 2)
+            prediction = predictor.predict_records([input_data])
+            predicted_price = round(prediction[0], 2)
             
             st.success(f"## ✅ Prediction Successful")
             st.balloons()
             st.metric(label="Estimated Rental Price (per day)", value=f"{predicted_price} €")
-            st.caption("This estimate is based on the loaded Machine Learning model.")
+            st.caption(f"This estimate is based on the Machine Learning model ({predictor.mode} mode, version {predictor.version or 'unknown'}).")
 
         except Exception as e:
             st.error(f"Error during prediction: {e}")
             st.warning("Please check the model input types.")
 
 
+def sweep_section(input_data):
+    """Price of the current car over one or two feature ranges, and the uplift of each option."""
+    st.subheader("Sensitivity of the price")
+    swept = st.multiselect("Features to sweep (one or two)", list(SWEEP_RANGES), default=["mileage"], max_selections=2)
+    steps = st.slider("Points per feature", min_value=5, max_value=50, value=25)
+
+    axes_spec = {}
+    for name in swept:
+        low, high = SWEEP_RANGES[name]
+        axes_spec[name] = (*st.slider(f"{name} range", min_value=low, max_value=high, value=(low, high)), steps)
+
+    if not st.button("Run Sweep", type="primary"):
+        return
+
+    # The grid and the option variants are scored in one batched call (cached for the same car and ranges)
+    try:
+        grid, uplift = sweep_predictions(input_data, axes_spec)
+    except Exception as e:
+        st.error(f"Error during prediction: {e}")
+        return
+
+    if len(swept) == 1:
+        fig_sweep = px.line(grid, x=swept[0], y="prediction", markers=True,
+                            title=f"Estimated price per day by {swept[0]}")
+        fig_sweep.update_layout(yaxis_title="Estimated Rental Price (€ / day)")
+        st.plotly_chart(fig_sweep, use_container_width=True)
+    elif len(swept) == 2:
+        heatmap = grid.pivot(index=swept[1], columns=swept[0], values="prediction")
+        fig_sweep = px.imshow(
+            heatmap, origin="lower", aspect="auto", color_continuous_scale="Viridis",
+            labels=dict(color="€ / day"),
+            title=f"Estimated price per day by {swept[0]} and {swept[1]}"
+        )
+        st.plotly_chart(fig_sweep, use_container_width=True)
+
+    st.subheader("Uplift of each option for this car")
+    fig_uplift = px.bar(
+        uplift.sort_values("uplift"), x="uplift", y="option", orientation="h", color="current_car",
+        hover_data=["price_without", "price_with"],
+        labels={"current_car": "Current car has it"},
+        title="Price difference with vs without the option (€ / day)"
+    )
+    st.plotly_chart(fig_uplift, use_container_width=True)
+    st.caption(f"{len(grid) + 2 * len(uplift)} configurations scored in one model call.")
+
+
+def cache_debug_panel():
+    """Sidebar panel with the size and hit rate of the shared caches."""
+    with st.sidebar.expander("Cache debug"):
+        stats = frame_cache.stats()
+        used_mb = frame_cache.total_bytes() / 1024 ** 2
+        st.caption(f"{used_mb:.1f} / {CACHE_MAX_MB:.0f} MB, {int(stats['entries'].sum())} / {CACHE_MAX_ENTRIES} entries, "
+                   f"TTL {CACHE_TTL_SECONDS / 3600:g} h")
+        st.dataframe(stats, hide_index=True)
+        st.caption(f"Model: {PREDICTION_MODE} mode" + (f", {predictor.version or 'version unknown'}" if MODEL_LOADED else " (not loaded)"))
+        if st.button("Clear caches"):
+            frame_cache.clear()
+
+
 # --- MAIN FUNCTION FOR PAGE MANAGEMENT ---
 def main():
     st.set_page_config(
@@ -390,12 +628,16 @@ def main():
     
     # Page selection menu in the sidebar
     page = st.sidebar.radio("Select Feature", 
-                            ["Delay Analysis", "ML Price Prediction"])
+                            ["Delay Analysis", "Threshold Simulator", "ML Price Prediction"])
 
     if page == "Delay Analysis":
         rental_analysis_page()
+    elif page == "Threshold Simulator":
+        threshold_simulation_page()
     elif page == "ML Price Prediction":
         prediction_page()
 
+    cache_debug_panel()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+import urllib.request
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Object columns with at most this share of distinct values are stored as categories
+CATEGORY_MAX_RATIO = 0.5
+
+
+def tighten_dtypes(df):
+    """Smallest lossless dtypes : downcast integers / floats, low-cardinality strings as categories"""
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            as_float32 = series.astype("float32")
+            # float32 is exact for the integer minutes / ids of the dataset, otherwise the column is kept
+            if ((as_float32.astype("float64") == series) | series.isna()).all():
+                df[column] = as_float32
+        elif series.nunique() <= CATEGORY_MAX_RATIO * max(len(series), 1):
+            df[column] = series.astype("category")
+    return df
+
+
+def source_version(source, timeout=3):
+    """
+    Identifier of the current source content : ETag (or Last-Modified / size) of a URL,
+    mtime and size of a local file. None if the source cannot be reached (offline).
+    """
+    if source.startswith(("http://", "https://")):
+        try:
+            request = urllib.request.Request(source, method="HEAD")
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                headers = response.headers
+        except OSError:
+            return None
+        return headers.get("ETag") or headers.get("Last-Modified") or headers.get("Content-Length")
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class ColumnarCache:
+    """
+    Local Feather copies of remote / slow-to-parse tables.
+
+    The first load reads the source (xlsx, csv) once and writes an uncompressed Feather file
+    with tight dtypes next to a small JSON file holding the source version. Later loads
+    memory-map the Feather file, unless the source version (ETag / mtime) changed.
+    If the source cannot be reached, the local copy is used as is, so the app keeps working offline.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _paths(self, source, name):
+        digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:10]
+        stem = os.path.splitext(os.path.basename(source))[0]
+        base = os.path.join(self.cache_dir, f"{stem}_{name}_{digest}")
+        return base + ".feather", base + ".json"
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, source, name, reader):
+        """`reader(source)` result for `source`, from the local copy when it is still up to date"""
+        data_path, meta_path = self._paths(source, name)
+        version = source_version(source)
+        meta = self._read_meta(meta_path)
+        if meta is not None and os.path.exists(data_path) and (version is None or meta.get("version") == version):
+            return feather.read_table(data_path, memory_map=True).to_pandas()
+
+        df = tighten_dtypes(reader(source))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Written to temporary files then renamed, so a concurrent reader never sees half a file
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        feather.write_feather(table, data_path + ".tmp", compression="uncompressed")
+        os.replace(data_path + ".tmp", data_path)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"source": source, "name": name, "version": version, "rows": len(df)}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        return df
+
+    def load_excel_sheet(self, source, sheet_name):
+        """One sheet of an Excel file (only this sheet is parsed on a cache miss)"""
+        return self.load(source, sheet_name, lambda path: pd.read_excel(path, sheet_name=sheet_name))
+
+    def load_csv(self, source, **read_csv_kwargs):
+        return self.load(source, "csv", lambda path: pd.read_csv(path, **read_csv_kwargs))
@@ -0,0 +1,149 @@
+import sys
+import time
+import threading
+import functools
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_bytes(value, _depth=0):
+    """Approximate memory used by a cached value (DataFrames, arrays, containers, plain objects)"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if _depth > 3:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(estimate_bytes(item, _depth + 1) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(item, _depth + 1) for item in value)
+    if hasattr(value, "__dict__"):
+        return estimate_bytes(vars(value), _depth + 1)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """Hashable version of a function argument (dicts and lists become tuples)"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class FrameCache:
+    """
+    Process-wide memoization of loaded / derived frames, shared by all Streamlit sessions.
+
+    Unlike `st.cache_data`, values are returned as is (no pickling, no copy per access), so
+    callers must not modify them. The cache is bounded by a number of entries, a time to live
+    and a memory budget : the least recently used entries are evicted first.
+    Arguments of the memoized functions must be hashable once dicts / lists are turned into tuples.
+    """
+
+    def __init__(self, max_entries=32, ttl_seconds=3600, max_bytes=512 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size in bytes, stored at)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._stats = {}
+
+    def _function_stats(self, name):
+        return self._stats.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0})
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, _, stored_at = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._function_stats(key[0])["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _set(self, key, value):
+        size = estimate_bytes(value)
+        with self._lock:
+            self._entries[key] = (value, size, time.monotonic())
+            self._entries.move_to_end(key)
+            total = sum(entry[1] for entry in self._entries.values())
+            # The newest entry is kept even if it is larger than the whole budget on its own
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or total > self.max_bytes):
+                old_key, (_, old_size, _) = self._entries.popitem(last=False)
+                total -= old_size
+                self._function_stats(old_key[0])["evictions"] += 1
+
+    def _count(self, name, counter):
+        with self._lock:
+            self._function_stats(name)[counter] += 1
+
+    def memoize(self, function):
+        """Decorator : one cached value per (function, arguments)"""
+        name = function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = (name, _freeze(args), _freeze(kwargs))
+            entry = self._get(key)
+            if entry is not None:
+                self._count(name, "hits")
+                return entry[0]
+
+            # One computation per key at a time : concurrent sessions wait for the first one
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            try:
+                with key_lock:
+                    entry = self._get(key)
+                    if entry is not None:
+                        self._count(name, "hits")
+                        return entry[0]
+                    self._count(name, "misses")
+                    value = function(*args, **kwargs)
+                    self._set(key, value)
+            finally:
+                # Also when `function` raises : the next call retries with a new lock
+                with self._lock:
+                    self._key_locks.pop(key, None)
+            return value
+
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """One row per memoized function : entries, memory, hits, misses, hit rate, evictions"""
+        with self._lock:
+            entries = list(self._entries.items())
+            stats = {name: dict(values) for name, values in self._stats.items()}
+        rows = []
+        for name, values in stats.items():
+            sizes = [size for key, (_, size, _) in entries if key[0] == name]
+            calls = values["hits"] + values["misses"]
+            rows.append({
+                "function": name,
+                "entries": len(sizes),
+                "size_mb": round(sum(sizes) / 1024 ** 2, 2),
+                "hits": values["hits"],
+                "misses": values["misses"],
+                "hit_rate": round(values["hits"] / calls, 3) if calls else 0.0,
+                "evictions": values["evictions"],
+                "expirations": values["expirations"],
+            })
+        return pd.DataFrame(rows, columns=["function", "entries", "size_mb", "hits", "misses", "hit_rate",
+                                           "evictions", "expirations"])
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry[1] for entry in self._entries.values())
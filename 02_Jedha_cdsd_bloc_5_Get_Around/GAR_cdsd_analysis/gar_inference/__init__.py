@@ -0,0 +1,8 @@
+"""
+Prediction code shared by the API (GAR_cdsd_pred) and the dashboard (GAR_cdsd_analysis):
+input schema and validation, compiled encode-and-predict path, model loading, and
+local / API predictors.
+"""
+from .features import PredictionFeatures, FEATURE_COLUMNS, NUMERIC_COLUMNS, BOOL_COLUMNS, validate_frame
+from .fast_inference import CompiledPredictor
+from .backend import LoadedModel, file_version, load_model, LocalPredictor, ApiPredictor, make_predictor
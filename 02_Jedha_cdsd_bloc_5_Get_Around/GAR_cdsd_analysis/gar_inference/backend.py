@@ -0,0 +1,134 @@
+import os
+import time
+import hashlib
+import logging
+
+import joblib
+import pandas as pd
+
+from .features import FEATURE_COLUMNS, validate_frame
+from .fast_inference import CompiledPredictor
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel:
+    """A loaded model version : the joblib object, its pipeline steps and its compiled fast path"""
+
+    def __init__(self, version, path, model, load_seconds, compiled=None):
+        self.version = version
+        self.path = path
+        self.model = model
+        self.pipeline = getattr(model, "best_estimator_", model)
+        self.load_seconds = load_seconds
+        self.compiled = compiled
+
+
+def file_version(path):
+    """Version of a model file without registry : file name + start of its sha256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return f"{name}@{digest.hexdigest()[:12]}"
+
+
+def load_model(path, version=None, mmap_mode=None, fast_path=True):
+    """Loads a model file, and its compiled fast path if it gives the same predictions"""
+    started = time.perf_counter()
+    model = joblib.load(path, mmap_mode=mmap_mode)
+    load_seconds = time.perf_counter() - started
+
+    compiled = None
+    if fast_path:
+        try:
+            compiled = CompiledPredictor(model)
+            compiled.verify(model)
+        except Exception as e:
+            logger.warning(f"Fast inference path disabled for {path}, using the sklearn pipeline: {e}")
+            compiled = None
+    return LoadedModel(version or file_version(path), path, model, load_seconds, compiled)
+
+
+class LocalPredictor:
+    """Runs the model in this process (compiled fast path when verified, else the sklearn pipeline)"""
+
+    mode = "local"
+
+    def __init__(self, model_path, mmap_mode=None, fast_path=True):
+        self.model = load_model(model_path, mmap_mode=mmap_mode, fast_path=fast_path)
+
+    @property
+    def version(self):
+        return self.model.version
+
+    def predict_frame(self, df):
+        """Predictions for a DataFrame with the model columns (validated first)"""
+        variables = validate_frame(df)
+        if self.model.compiled is not None:
+            return self.model.compiled.predict_frame(variables)
+        return self.model.pipeline.predict(variables)
+
+    def predict_records(self, records):
+        """Predictions for a list of feature dicts, as floats"""
+        if self.model.compiled is not None:
+            return self.model.compiled.predict_rows(records).tolist()
+        return self.predict_frame(pd.DataFrame(records, columns=FEATURE_COLUMNS)).tolist()
+
+
+class ApiPredictor:
+    """
+    Calls the prediction API (`/predict/batch`) instead of loading the model.
+
+    One HTTP client with a pool of keep-alive connections is shared by all callers, so
+    each prediction reuses an open connection instead of paying a new TCP / TLS handshake.
+    """
+
+    mode = "api"
+
+    def __init__(self, base_url, timeout=10.0, pool_size=10):
+        import httpx
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        self.version = None
+        self.refresh_version()
+
+    def refresh_version(self):
+        """Active model version of the API (`/models`), kept as is if the API cannot be reached"""
+        try:
+            response = self.client.get("/models")
+            response.raise_for_status()
+            self.version = response.json()["active"]
+        except Exception as e:
+            logger.warning(f"Model version of {self.base_url} unknown until the first prediction: {e}")
+        return self.version
+
+    def predict_records(self, records):
+        response = self.client.post("/predict/batch", json=records)
+        response.raise_for_status()
+        body = response.json()
+        self.version = body.get("model_version", self.version)
+        return body["prediction"]
+
+    def predict_frame(self, df):
+        variables = validate_frame(df)
+        return pd.Series(self.predict_records(variables.to_dict(orient="records"))).to_numpy()
+
+    def close(self):
+        self.client.close()
+
+
+def make_predictor(mode="local", model_path="modele_GAR.joblib", api_url=None, **kwargs):
+    """`LocalPredictor` (model loaded here) or `ApiPredictor` (calls the API at `api_url`)"""
+    if mode == "api":
+        if not api_url:
+            raise ValueError("api_url is required in api mode")
+        return ApiPredictor(api_url, **kwargs)
+    if mode == "local":
+        return LocalPredictor(model_path, **kwargs)
+    raise ValueError(f"Unknown prediction mode {mode!r}, use 'local' or 'api'")
@@ -0,0 +1,60 @@
+from typing import Optional
+
+import pandas as pd
+from pydantic import BaseModel, ConfigDict
+
+
+class PredictionFeatures(BaseModel):
+    # Categories are text or null (numbers are turned into text), lists / objects are rejected with a 422
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    model_key: Optional[str]
+    mileage: float
+    engine_power: float
+    fuel: Optional[str]
+    paint_color: Optional[str]
+    car_type: Optional[str]
+    private_parking_available: bool
+    has_gps: bool
+    has_air_conditioning: bool
+    automatic_car: bool
+    has_getaround_connect: bool
+    has_speed_regulator: bool
+    winter_tires: bool
+
+# Columns expected by the model, in the order used during training
+FEATURE_COLUMNS = list(PredictionFeatures.model_fields)
+
+NUMERIC_COLUMNS = [col for col, field in PredictionFeatures.model_fields.items() if field.annotation is float]
+BOOL_COLUMNS = [col for col, field in PredictionFeatures.model_fields.items() if field.annotation is bool]
+
+# Text values accepted for boolean columns (CSV files)
+BOOL_VALUES = {"true": True, "false": False, "1": True, "0": False}
+
+
+def validate_frame(df):
+    """
+    Checks a DataFrame against PredictionFeatures, column by column (no per-row pydantic model).
+    Returns the model columns with numeric / boolean columns converted, raises ValueError otherwise.
+    """
+    missing = [col for col in FEATURE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+
+    df = df[FEATURE_COLUMNS].copy()
+    errors = []
+    for col in NUMERIC_COLUMNS:
+        values = pd.to_numeric(df[col], errors="coerce")
+        if values.isna().any():
+            errors.append(f"'{col}' must be a number")
+        df[col] = values
+    for col in BOOL_COLUMNS:
+        if df[col].dtype == bool:
+            continue
+        values = df[col].map(lambda value: BOOL_VALUES.get(str(value).strip().lower()))
+        if values.isna().any():
+            errors.append(f"'{col}' must be a boolean")
+        df[col] = values.astype(bool) if not values.isna().any() else values
+    if errors:
+        raise ValueError("Invalid columns: " + ", ".join(errors))
+    return df
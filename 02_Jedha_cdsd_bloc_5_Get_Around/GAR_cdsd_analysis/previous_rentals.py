@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+PREVIOUS_DELAY_COLUMN = 'delay_at_checkout_in_minutes_from_previous_rental'
+
+
+class RentalIndex:
+    """
+    rental_id -> row position of a rentals table, built once with a sort.
+
+    Replaces the merges on rental_id : looking up N ids is one `searchsorted` on the sorted ids,
+    and only positions (one int per looked-up row) are created, never a full copy of the table.
+    """
+
+    def __init__(self, rental_ids):
+        rental_ids = np.asarray(rental_ids)
+        self.order = np.argsort(rental_ids, kind="stable")
+        self.sorted_ids = rental_ids[self.order]
+
+    def positions(self, keys):
+        """Row position of each key, -1 for missing keys (NaN or unknown id)"""
+        keys = np.asarray(keys, dtype="float64")
+        result = np.full(len(keys), -1, dtype="int64")
+        if not len(self.sorted_ids):
+            return result
+        valid = np.flatnonzero(~np.isnan(keys))
+        found = np.searchsorted(self.sorted_ids, keys[valid]).clip(max=len(self.sorted_ids) - 1)
+        match = self.sorted_ids[found] == keys[valid]
+        result[valid[match]] = self.order[found[match]]
+        return result
+
+
+def take(values, positions):
+    """values[positions] as float, NaN where the position is -1"""
+    result = np.full(len(positions), np.nan)
+    known = positions >= 0
+    result[known] = values[positions[known]]
+    return result
+
+
+def previous_rental_chains(data_delay_rentals, max_hops=1, rows=None):
+    """
+    For each rental (or only the row positions `rows`), the delay at checkout of its previous rental
+    and, up to `max_hops`, of the rentals before it on the same car (previous_ended_rental_id followed
+    hop by hop).
+
+    Returns a DataFrame aligned on `data_delay_rentals` (or its `rows`) with, for each hop h (1 = previous rental):
+    - `delay_at_checkout_in_minutes_from_previous_rental_{h}` : checkout delay of that rental
+    - `delay_propagated_from_previous_rental_{h}` : part of that delay still not absorbed when the
+      current rental starts, i.e. max(0, delay - sum of the time deltas of the rentals in between)
+    and `chain_length`, the number of consecutive previous rentals found (0..max_hops).
+    """
+    index = RentalIndex(data_delay_rentals['rental_id'].to_numpy())
+    previous_position = index.positions(data_delay_rentals['previous_ended_rental_id'].to_numpy())
+    delays = data_delay_rentals['delay_at_checkout_in_minutes'].to_numpy(dtype="float64")
+    time_deltas = data_delay_rentals['time_delta_with_previous_rental_in_minutes'].to_numpy(dtype="float64")
+
+    positions = np.arange(len(data_delay_rentals)) if rows is None else np.asarray(rows, dtype="int64")
+    columns = {}
+    chain_length = np.zeros(len(positions), dtype="int64")
+    buffer = np.zeros(len(positions))  # time between the checkout of the hop-h rental and the current checkin
+    for hop in range(1, max_hops + 1):
+        # Time delta between the hop-(h-1) rental and its own previous rental
+        buffer = buffer + take(time_deltas, positions)
+        positions = np.where(positions >= 0, previous_position[positions.clip(min=0)], -1)
+        chain_length += positions >= 0
+        delay = take(delays, positions)
+        columns[f'{PREVIOUS_DELAY_COLUMN}_{hop}'] = delay
+        columns[f'delay_propagated_from_previous_rental_{hop}'] = np.clip(delay - buffer, 0, None)
+
+    columns['chain_length'] = chain_length
+    index = data_delay_rentals.index if rows is None else data_delay_rentals.index[rows]
+    return pd.DataFrame(columns, index=index)
+
+
+def delay_impact_data(data_delay_rentals, max_hops=1):
+    """
+    Rentals that follow a rental returned late (delay_at_checkout_in_minutes_from_previous_rental > 0),
+    with the columns of the former rental_id merge (`rental_id_current`, `..._current`, ...).
+    With `max_hops` > 1, the chain columns of `previous_rental_chains` for hops 2..max_hops are added.
+    """
+    with_previous_rows = np.flatnonzero(data_delay_rentals['previous_ended_rental_id'].notna().to_numpy())
+    with_previous = data_delay_rentals.iloc[with_previous_rows]
+    index = RentalIndex(data_delay_rentals['rental_id'].to_numpy())
+    previous_delay = take(
+        data_delay_rentals['delay_at_checkout_in_minutes'].to_numpy(),
+        index.positions(with_previous['previous_ended_rental_id'].to_numpy()),
+    )
+    keep = np.flatnonzero(previous_delay > 0)
+
+    # Same columns, dtypes and index as the merge : left columns with a suffix when shared, then the previous delay
+    result = with_previous.iloc[keep].rename(columns={
+        'rental_id': 'rental_id_current',
+        'delay_at_checkout_in_minutes': 'delay_at_checkout_in_minutes_current',
+    })
+    result.index = pd.RangeIndex(len(with_previous))[keep]
+    delay_dtype = data_delay_rentals['delay_at_checkout_in_minutes'].dtype
+    result[PREVIOUS_DELAY_COLUMN] = previous_delay[keep].astype(delay_dtype)
+
+    if max_hops > 1:
+        chains = previous_rental_chains(data_delay_rentals, max_hops, rows=with_previous_rows[keep])
+        chains.index = result.index
+        result['chain_length'] = chains['chain_length']
+        for hop in range(1, max_hops + 1):
+            if hop > 1:
+                result[f'{PREVIOUS_DELAY_COLUMN}_{hop}'] = chains[f'{PREVIOUS_DELAY_COLUMN}_{hop}']
+            result[f'delay_propagated_from_previous_rental_{hop}'] = chains[f'delay_propagated_from_previous_rental_{hop}']
+    return result
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from gar_inference import BOOL_COLUMNS
+
+# Features that can be swept and their default (min, max) range
+SWEEP_RANGES = {
+    "mileage": (0.0, 300000.0),
+    "engine_power": (50.0, 400.0),
+}
+
+
+def sweep_records(base, axes):
+    """
+    Grid of cars around `base` : every combination of the `axes` values ({feature: values}),
+    other features unchanged. Returns the records and the grid coordinates (one row per record).
+    """
+    names = list(axes)
+    mesh = np.meshgrid(*[np.asarray(axes[name], dtype="float64") for name in names], indexing="ij")
+    grid = pd.DataFrame({name: values.ravel() for name, values in zip(names, mesh)})
+    records = [{**base, **row} for row in grid.to_dict(orient="records")]
+    return records, grid
+
+
+def option_records(base, options=BOOL_COLUMNS):
+    """For each option, the `base` car without then with it (2 records per option)"""
+    return [{**base, option: value} for option in options for value in (False, True)]
+
+
+def run_sweep(predict_records, base, axes, options=BOOL_COLUMNS):
+    """
+    Scores the sweep grid and the option variants of `base` in one `predict_records` call.
+
+    Returns (grid, uplift) : the grid coordinates with a `prediction` column, and per option
+    the price without / with it, the uplift and whether the current car has it.
+    """
+    records, grid = sweep_records(base, axes) if axes else ([], pd.DataFrame())
+    variants = option_records(base, options)
+    predictions = np.asarray(predict_records(records + variants), dtype="float64")
+
+    grid = grid.assign(prediction=predictions[:len(records)])
+    without, with_option = predictions[len(records):].reshape(-1, 2).T
+    uplift = pd.DataFrame({
+        "option": list(options),
+        "price_without": without.round(2),
+        "price_with": with_option.round(2),
+        "uplift": (with_option - without).round(2),
+        "current_car": [bool(base[option]) for option in options],
+    })
+    return grid, uplift
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def sort_positions(df, column=None, ascending=True):
+    """
+    Row positions of `df` sorted by `column` (stable, missing values last).
+    Without column the original order is kept. Computed once per (table, column, order),
+    then every page is a slice of these positions.
+    """
+    if column is None:
+        return np.arange(len(df))
+    values = df[column].reset_index(drop=True)
+    return values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def page_rows(df, positions, page, page_size):
+    """Rows of page `page` (1-based) : only these rows are copied and sent to the browser"""
+    page = min(max(int(page), 1), page_count(len(positions), page_size))
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling : positions of `n_out` points of the series (x, y)
+    keeping its visual shape (peaks, drops). x must be sorted. The first and last points are always kept.
+    Series with at most `n_out` points (or n_out < 3) are returned whole.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n - 2 inner points split in n_out - 2 buckets, one point kept per bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (the last point for the last bucket)
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+        # Point of the bucket making the largest triangle with the previous kept point and that average
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(areas)) if not np.isnan(areas).all() else start
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(df, x, y, max_points, group=None):
+    """`df` reduced to at most `max_points` rows per group with `lttb`, for line charts"""
+    if group is None:
+        if len(df) <= max_points:
+            return df
+        data = df.sort_values(x, kind="stable").dropna(subset=[x, y])
+        return data.iloc[lttb(data[x], data[y], max_points)]
+    return pd.concat(
+        [downsample(part, x, y, max_points) for _, part in df.groupby(group, sort=False, observed=True)],
+        ignore_index=True,
+    )
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from previous_rentals import PREVIOUS_DELAY_COLUMN
+
+# Scopes of the minimum delay feature : checkin types it applies to (None = all cars)
+SCOPES = {"all": None, "connect": "connect"}
+
+
+def _in_scope(checkin_types, scope_checkin_type):
+    if scope_checkin_type is None:
+        return np.ones(len(checkin_types), dtype=bool)
+    return np.asarray(checkin_types.astype(str)) == scope_checkin_type
+
+
+def simulate_thresholds(data_delay_rentals, delay_impact, thresholds, scopes=SCOPES):
+    """
+    Effect of a minimum delay between two rentals, for every threshold (minutes) x scope at once.
+
+    - affected rentals : rentals of the scope booked less than `threshold` minutes after the previous
+      one, they could not have been booked with the feature. The revenue share lost is the share of
+      `ended` rentals among them (canceled rentals bring no revenue).
+    - problem cases : rentals whose previous rental was returned later than the time delta between
+      them (the driver had to wait). A case is solved when the threshold covers the late checkout
+      (previous delay <= threshold).
+
+    `delay_impact` is the previous-rental join of `calculate_delay_impact_data`. Each scope needs two
+    sorts, then the whole threshold grid is answered with `searchsorted`.
+    """
+    thresholds = np.asarray(thresholds, dtype="float64")
+    time_delta = data_delay_rentals['time_delta_with_previous_rental_in_minutes'].to_numpy(dtype="float64")
+    ended = np.asarray(data_delay_rentals['state'].astype(str)) == 'ended'
+    total_ended = int(ended.sum())
+
+    impact_delta = delay_impact['time_delta_with_previous_rental_in_minutes'].to_numpy(dtype="float64")
+    previous_delay = delay_impact[PREVIOUS_DELAY_COLUMN].to_numpy(dtype="float64")
+    problem = previous_delay > impact_delta
+
+    frames = []
+    for scope, checkin_type in scopes.items():
+        in_scope = _in_scope(data_delay_rentals['checkin_type'], checkin_type) & ~np.isnan(time_delta)
+        deltas = np.sort(time_delta[in_scope])
+        ended_deltas = np.sort(time_delta[in_scope & ended])
+
+        scope_problems = problem & _in_scope(delay_impact['checkin_type'], checkin_type)
+        problem_delays = np.sort(previous_delay[scope_problems])
+
+        affected = np.searchsorted(deltas, thresholds, side="left")
+        ended_affected = np.searchsorted(ended_deltas, thresholds, side="left")
+        solved = np.searchsorted(problem_delays, thresholds, side="right")
+        frames.append(pd.DataFrame({
+            "threshold": thresholds,
+            "scope": scope,
+            "rentals_affected": affected,
+            "revenue_share_lost_pct": np.round(ended_affected / total_ended * 100, 2) if total_ended else 0.0,
+            "problem_cases": len(problem_delays),
+            "problem_cases_solved": solved,
+            "problem_cases_solved_pct": np.round(solved / len(problem_delays) * 100, 2) if len(problem_delays) else 0.0,
+        }))
+    return pd.concat(frames, ignore_index=True)
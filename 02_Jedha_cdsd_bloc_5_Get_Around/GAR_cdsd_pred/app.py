@@ -1,8 +1,26 @@
+import os
+import time
+import random
+import logging
+import threading
 import uvicorn
+import numpy as np
 import pandas as pd 
-from pydantic import BaseModel
-from fastapi import FastAPI, File, UploadFile
-import joblib
+from typing import List, Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from concurrent.futures import ThreadPoolExecutor
+
+from gar_inference import PredictionFeatures, FEATURE_COLUMNS, validate_frame
+from batching import MicroBatcher
+from prediction_cache import PredictionCache
+from model_registry import ModelRegistry
+from preview_data import PreviewData
+from metrics import MetricsRegistry, process_rss_bytes
+
+logger = logging.getLogger(__name__)
 
 description = """
 Welcome to car price API. This app is made for you to understand how FastAPI works! Try it out 🕹️
@@ -11,6 +29,9 @@ Welcome to car price API. This app is made for you to understand how FastAPI wor
 
 * `/preview` a few rows of your dataset
 * `/predict`: **POST** request that display a car price prediction
+* `/predict/batch`: **POST** request that display price predictions for a list of cars
+* `/predict/batch/file`: **POST** request that display price predictions for a CSV / Parquet / Arrow file
+* `/models`: active / candidate model versions, `/models/reload` to load a new model without restart
 
 ## Preview
 
@@ -24,6 +45,8 @@ This is a preview endpoint where you can see a few rows of your dataset
 This is a Machine Learning endpoint that predict rental car price per day from different variables given.
 
 * `/predict` to predict rental car price per day with multiples variables input
+* `/predict/batch` to predict many cars in one call (JSON array)
+* `/predict/batch/file` to predict many cars in one call (CSV, Parquet or Arrow file)
 
 
 Check out documentation below 👇 for more information on each endpoint. 
@@ -40,68 +63,393 @@ tags_metadata = [
     }
 ]
 
+# Micro-batching of concurrent /predict calls (disabled by default)
+# GAR_BATCHING=1 to enable, window in milliseconds and max number of cars per model call
+BATCHING_ENABLED = os.getenv("GAR_BATCHING", "0") == "1"
+BATCH_WINDOW_MS = float(os.getenv("GAR_BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.getenv("GAR_BATCH_MAX_SIZE", "32"))
+
+# Car used to warm up the model at startup (same as the /predict example)
+WARMUP_FEATURES = {
+    "model_key": "Renault",
+    "mileage": 109839,
+    "engine_power": 135,
+    "fuel": "diesel",
+    "paint_color": "black",
+    "car_type": "sedan",
+    "private_parking_available": True,
+    "has_gps": True,
+    "has_air_conditioning": False,
+    "automatic_car": False,
+    "has_getaround_connect": True,
+    "has_speed_regulator": False,
+    "winter_tires": True,
+}
+
+batcher = None
+model_warm = False
+
+
+def warm_up():
+    """Dummy predictions so the first real request does not pay the lazy initialisations"""
+    global model_warm
+    model = registry.active
+    predict_rows(model, [WARMUP_FEATURES])
+    predict_in_chunks(model, [features_to_frame([PredictionFeatures(**WARMUP_FEATURES)])])
+    model_warm = True
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warms up the model, starts / stops the micro-batching task and the model reload thread with the server (once per worker)"""
+    global batcher
+    try:
+        await run_in_threadpool(warm_up)
+    except Exception as e:
+        logger.warning(f"Model warm-up failed: {e}")
+    if BATCHING_ENABLED:
+        batcher = MicroBatcher(score_rows, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_WINDOW_MS)
+        await batcher.start()
+    registry.start(MODEL_POLL_SECONDS)
+    yield
+    registry.stop()
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+
+
 app = FastAPI(
     title=" Car prices API",
     description=description,
     version="0.1",
-    openapi_tags=tags_metadata
+    openapi_tags=tags_metadata,
+    lifespan=lifespan
 )
 
-# Read data 
-df = pd.DataFrame({"some": ["data"]})
+# Metrics exposed on /metrics (Prometheus text format)
+STAGE_METRIC = "gar_stage_duration_seconds"
+metrics = MetricsRegistry()
+metrics.describe("gar_requests_total", "counter", "HTTP requests by path, method and status code")
+metrics.describe("gar_request_errors_total", "counter", "HTTP requests that failed with a 5xx status or an exception")
+metrics.describe("gar_request_duration_seconds", "histogram", "HTTP request duration by path")
+metrics.describe(STAGE_METRIC, "histogram",
+                 "Duration of each prediction stage (validation, cache, dataframe, encode, preprocess, regressor)")
+metrics.describe("gar_model_load_seconds", "gauge", "Time taken to load the active model file")
+metrics.describe("gar_model_info", "gauge", "Active (role=active) and shadow (role=candidate) model versions")
+metrics.describe("gar_model_reloads_total", "counter", "Active model swaps since startup")
+metrics.describe("gar_model_reload_errors_total", "counter", "New models that could not be loaded (the previous one is kept)")
+metrics.describe("gar_shadow_predictions_total", "counter", "/predict calls also scored on the candidate model")
+metrics.describe("gar_shadow_dropped_total", "counter", "Shadow predictions skipped because the shadow queue was full")
+metrics.describe("gar_shadow_abs_diff", "histogram", "Absolute difference between candidate and active predictions",
+                 buckets=[0.5, 1, 2, 5, 10, 20, 50, 100])
+metrics.describe("gar_model_warm", "gauge", "1 once the warm-up prediction is done")
+metrics.describe("gar_fast_path_enabled", "gauge", "1 if the compiled inference path is used")
+metrics.describe("gar_process_resident_memory_bytes", "gauge", "Resident memory of this worker process")
+metrics.describe("gar_cache_entries", "gauge", "Predictions currently cached")
+for counter in ("hits", "misses", "evictions", "expirations", "invalidations"):
+    metrics.describe(f"gar_cache_{counter}_total", "counter", f"Prediction cache {counter}")
+metrics.describe("gar_batch_size", "histogram", "Number of cars per micro-batch")
+metrics.describe("gar_batch_queue_wait_seconds", "histogram", "Time spent by /predict calls waiting for their micro-batch")
+
+# Read data : loaded once on the first /preview call, reloaded if the file changes
+PREVIEW_DATA_PATH = os.getenv("GAR_PREVIEW_DATA_PATH", "DATA/get_around_pricing_project.csv")
+preview_data = PreviewData(PREVIEW_DATA_PATH)
 
 # Log model from mlflow 
-loaded_model = joblib.load('/home/user/app/modele_GAR.joblib') #lien vers le fichier job lib dans le conteneur
-
-class PredictionFeatures(BaseModel):
-    model_key: object
-    mileage: float
-    engine_power: float
-    fuel: object
-    paint_color: object
-    car_type: object
-    private_parking_available: bool
-    has_gps: bool
-    has_air_conditioning: bool
-    automatic_car: bool
-    has_getaround_connect: bool
-    has_speed_regulator: bool
-    winter_tires: bool
+MODEL_PATH = os.getenv("GAR_MODEL_PATH", '/home/user/app/modele_GAR.joblib') #lien vers le fichier job lib dans le conteneur
+# GAR_MODEL_REGISTRY=<dir> : versioned models `<version>.joblib`, the active one named in `<dir>/ACTIVE`,
+# an optional shadow candidate in `<dir>/CANDIDATE` (GAR_MODEL_PATH is then ignored)
+MODEL_REGISTRY_DIR = os.getenv("GAR_MODEL_REGISTRY") or None
+# Seconds between two checks for a new model (0 : only on POST /models/reload)
+MODEL_POLL_SECONDS = float(os.getenv("GAR_MODEL_POLL_SECONDS", "30"))
+# GAR_MODEL_MMAP=1 : the plain numpy arrays pickled in the model (encoder categories and scaling parameters)
+# are memory-mapped from the file. The XGBoost booster is not : it is shared with the workers by
+# preload_app + gc.freeze (gunicorn.conf.py), not by this option.
+MODEL_MMAP_MODE = "r" if os.getenv("GAR_MODEL_MMAP", "0") == "1" else None
+# Fast inference path : encodes the features with NumPy and calls the regressor directly
+# Used only if it gives the same predictions as the pipeline (GAR_FAST_PATH=0 to disable)
+FAST_PATH_ENABLED = os.getenv("GAR_FAST_PATH", "1") == "1"
+
+
+def on_model_swap(old, new):
+    """Cached predictions belong to the previous model"""
+    if old is not None and prediction_cache is not None:
+        prediction_cache.clear()
+
+
+# Loaded at import (before the gunicorn fork), then swapped in the background when a new version shows up.
+# Requests read `registry.active` once and keep that model until they finish.
+registry = ModelRegistry(
+    model_path=None if MODEL_REGISTRY_DIR else MODEL_PATH,
+    registry_dir=MODEL_REGISTRY_DIR,
+    mmap_mode=MODEL_MMAP_MODE,
+    fast_path=FAST_PATH_ENABLED,
+    on_swap=on_model_swap,
+)
+
+# Shadow mode : a sample of /predict calls is also scored on the candidate model, in a separate thread
+# after the response is computed. Only the difference with the active model is recorded.
+SHADOW_SAMPLE_RATE = float(os.getenv("GAR_SHADOW_SAMPLE_RATE", "0.1"))
+SHADOW_MAX_PENDING = int(os.getenv("GAR_SHADOW_MAX_PENDING", "100"))
+shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+shadow_slots = threading.BoundedSemaphore(SHADOW_MAX_PENDING)
+
+# Default / max number of rows sent to the model in one call for batch endpoints
+DEFAULT_CHUNK_SIZE = 5000
+MAX_CHUNK_SIZE = 100000
+
+# Supported file formats for /predict/batch/file
+BATCH_FILE_READERS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+
+
+# Cache of /predict results (GAR_CACHE=0 to disable)
+# Optional buckets (same unit as the feature) round mileage / engine_power to raise the hit rate
+CACHE_ENABLED = os.getenv("GAR_CACHE", "1") == "1"
+prediction_cache = PredictionCache(
+    FEATURE_COLUMNS,
+    max_entries=int(os.getenv("GAR_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("GAR_CACHE_TTL_SECONDS", "3600")),
+    mileage_bucket=float(os.getenv("GAR_CACHE_MILEAGE_BUCKET", "0")),
+    engine_power_bucket=float(os.getenv("GAR_CACHE_ENGINE_POWER_BUCKET", "0")),
+) if CACHE_ENABLED else None
+
+registry.refresh()
+
+
+def features_to_frame(features_list):
+    """Builds the DataFrame expected by the model from a list of PredictionFeatures"""
+    return pd.DataFrame([features.model_dump() for features in features_list], columns=FEATURE_COLUMNS)
+
+
+def check_feature_columns(df):
+    """Keeps only the model columns, raises a 422 if some are missing or have a wrong type"""
+    try:
+        return validate_frame(df)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def predict_frame(model, variables):
+    """Encodes / preprocesses a DataFrame and runs the regressor of `model`, each stage timed"""
+    if model.compiled is not None:
+        with metrics.timer(STAGE_METRIC, stage="encode"):
+            X = model.compiled.encode_frame(variables)
+    else:
+        with metrics.timer(STAGE_METRIC, stage="preprocess"):
+            X = model.pipeline[:-1].transform(variables)
+    with metrics.timer(STAGE_METRIC, stage="regressor"):
+        return model.pipeline[-1].predict(X)
+
+
+def predict_in_chunks(model, frames):
+    """Runs the model on each DataFrame chunk and concatenates the predictions"""
+    predictions = []
+    for chunk in frames:
+        if not len(chunk):
+            continue
+        with metrics.timer(STAGE_METRIC, stage="validation"):
+            variables = check_feature_columns(chunk)
+        predictions.append(predict_frame(model, variables))
+    if not predictions:
+        return np.array([])
+    return np.concatenate(predictions)
+
+
+def predict_rows(model, rows):
+    """Scores a list of feature dicts in one model call"""
+    if model.compiled is not None:
+        with metrics.timer(STAGE_METRIC, stage="encode"):
+            X = model.compiled.encode_rows(rows)
+        with metrics.timer(STAGE_METRIC, stage="regressor"):
+            return model.pipeline[-1].predict(X).tolist()
+    with metrics.timer(STAGE_METRIC, stage="dataframe"):
+        variables = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+    return predict_frame(model, variables).tolist()
+
+
+def score_rows(rows):
+    """Scores rows with the active model, [(prediction, model version)] (used by /predict and the micro-batcher)"""
+    model = registry.active
+    return [(prediction, model.version) for prediction in predict_rows(model, rows)]
+
+
+def shadow_predict(candidate, features, prediction):
+    try:
+        shadow_prediction = predict_rows(candidate, [features])[0]
+        metrics.inc("gar_shadow_predictions_total", {"version": candidate.version})
+        metrics.observe("gar_shadow_abs_diff", abs(shadow_prediction - prediction), {"version": candidate.version})
+    except Exception as e:
+        logger.warning(f"Shadow prediction failed on {candidate.version}: {e}")
+    finally:
+        shadow_slots.release()
+
+
+def submit_shadow(features, prediction):
+    """Scores a sample of /predict calls on the candidate model, off the request path"""
+    candidate = registry.candidate
+    if candidate is None or random.random() >= SHADOW_SAMPLE_RATE:
+        return
+    if not shadow_slots.acquire(blocking=False):
+        metrics.inc("gar_shadow_dropped_total")
+        return
+    shadow_executor.submit(shadow_predict, candidate, features, prediction)
+
+
+def collect_runtime_metrics():
+    """Metrics read at each /metrics call : memory, model state, cache and batcher stats"""
+    model, candidate = registry.active, registry.candidate
+    samples = [
+        ("gar_process_resident_memory_bytes", None, process_rss_bytes()),
+        ("gar_model_warm", None, int(model_warm)),
+        ("gar_fast_path_enabled", None, int(model.compiled is not None)),
+        ("gar_model_load_seconds", None, model.load_seconds),
+        ("gar_model_info", {"version": model.version, "role": "active"}, 1),
+        ("gar_model_reloads_total", None, registry.reloads),
+        ("gar_model_reload_errors_total", None, registry.reload_errors),
+    ]
+    if candidate is not None:
+        samples.append(("gar_model_info", {"version": candidate.version, "role": "candidate"}, 1))
+    if prediction_cache is not None:
+        stats = prediction_cache.stats()
+        for counter in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            samples.append((f"gar_cache_{counter}_total", None, stats[counter]))
+        samples.append(("gar_cache_entries", None, stats["size"]))
+    if batcher is not None:
+        samples.append(("gar_batch_size", None, batcher.batch_size))
+        samples.append(("gar_batch_queue_wait_seconds", None, batcher.queue_wait))
+    return samples
+
+
+metrics.add_collector(collect_runtime_metrics)
+
+
+def split_frame(df, chunk_size):
+    """Yields successive slices of `chunk_size` rows"""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
 
 #### SOME CODE ####
 ###################
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Counts requests / errors and measures their duration, by route"""
+    request.state.started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.inc("gar_requests_total", {"path": path, "method": request.method, "status": status})
+        if status >= 500:
+            metrics.inc("gar_request_errors_total", {"path": path})
+        metrics.observe("gar_request_duration_seconds", time.perf_counter() - request.state.started, {"path": path})
+
 @app.get("/", tags=["Health"])
 async def root():
     """Root endpoint with API information"""
     return {
         "message": "Welcome to Car Rental Price Prediction API! 🚗",
         "status": "running",
-        "model_loaded": loaded_model is not None,
+        "model_loaded": registry.active is not None,
+        "model_version": registry.active.version,
+        "model_warm": model_warm,
+        "fast_path": registry.active.compiled is not None,
         "endpoints": {
             "documentation": "/docs",
             "preview": "/preview?rows=10",
             "predict": "/predict",
-            "health": "/health"
+            "health": "/health",
+            "models": "/models",
+            "batching": "/batching",
+            "cache": "/cache",
+            "metrics": "/metrics"
         },
         "version": "1.0.0"
     }
 
+@app.get("/health", tags=["Health"])
+async def health():
+    """Readiness of the API : 200 once the model is loaded and warmed up, 503 before"""
+    model, candidate = registry.active, registry.candidate
+    ready = model is not None and model_warm
+    body = {
+        "status": "ok" if ready else "starting",
+        "model_loaded": model is not None,
+        "model_version": model.version,
+        "candidate_version": candidate.version if candidate is not None else None,
+        "model_warm": model_warm,
+        "model_load_seconds": round(model.load_seconds, 3),
+        "fast_path": model.compiled is not None,
+        "batching": batcher is not None,
+        "cache": prediction_cache is not None,
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics", tags=["Health"])
+async def prometheus_metrics():
+    """Request counts, per-stage latency histograms, cache / batching stats and memory in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def models_info():
+    model, candidate = registry.active, registry.candidate
+    return {
+        "active": model.version,
+        "candidate": candidate.version if candidate is not None else None,
+        "versions": registry.versions(),
+        "registry": MODEL_REGISTRY_DIR,
+        "poll_seconds": MODEL_POLL_SECONDS,
+        "reloads": registry.reloads,
+        "reload_errors": registry.reload_errors,
+        "shadow_sample_rate": SHADOW_SAMPLE_RATE if candidate is not None else 0,
+    }
+
+@app.get("/models", tags=["Health"])
+async def models():
+    """Active model version, shadow candidate and versions available in the registry"""
+    return models_info()
+
+@app.post("/models/reload", tags=["Health"])
+async def reload_models():
+    """Loads the active / candidate models now instead of waiting for the next check (this worker only)"""
+    swapped = await run_in_threadpool(registry.try_refresh)
+    return {"swapped": swapped, **models_info()}
+
+@app.get("/batching", tags=["Health"])
+async def batching_stats():
+    """Micro-batching status: batch-size distribution and queue wait time of /predict calls"""
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+@app.get("/cache", tags=["Health"])
+async def cache_stats():
+    """Prediction cache status: hit / miss / eviction counters"""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
 @app.get("/preview", tags=["Preview"])
-async def random_employees(rows: int = 10):
+def random_employees(rows: int = Query(10, ge=1), seed: Optional[int] = None):
     """
     Get a sample of your whole dataset.
     You can specify how many rows you want by specifying a value for `rows`, default is `10`
+    Give a `seed` to always get the same sample.
     """
-    df = pd.read_csv("DATA/get_around_pricing_project.csv")
-    df = df.drop('Unnamed: 0', axis=1)
-    sample = df.sample(rows)
-    return sample.to_dict(orient='records')
+    return preview_data.sample(rows, seed=seed)
 
 
 
 @app.post("/predict", tags=["Machine Learning"])
-async def predict(predictionFeatures: PredictionFeatures):
+async def predict(predictionFeatures: PredictionFeatures, request: Request):
     """
     To predict rental car price per day with multiple variables :
     - Click on 'Try it out'
@@ -147,28 +495,93 @@ async def predict(predictionFeatures: PredictionFeatures):
 
     rental_price_per_day :   152 (real)    //    137.34634 (potential prediction)
     """
-    # Read data 
-    variables = pd.DataFrame({"model_key": [predictionFeatures.model_key],
-                              "mileage": [predictionFeatures.mileage],
-                              "engine_power": [predictionFeatures.engine_power],
-                              "fuel": [predictionFeatures.fuel],
-                              "paint_color": [predictionFeatures.paint_color],
-                              "car_type": [predictionFeatures.car_type],
-                              "private_parking_available": [predictionFeatures.private_parking_available],
-                              "has_gps": [predictionFeatures.has_gps],
-                              "has_air_conditioning": [predictionFeatures.has_air_conditioning],
-                              "automatic_car": [predictionFeatures.automatic_car],
-                              "has_getaround_connect": [predictionFeatures.has_getaround_connect],
-                              "has_speed_regulator": [predictionFeatures.has_speed_regulator],
-                              "winter_tires": [predictionFeatures.winter_tires]})
-
-    # Load model as a PyFuncModel.
-    prediction = loaded_model.predict(variables)
+    # Time between the start of the request and this point : body parsing + pydantic validation
+    metrics.observe(STAGE_METRIC, time.perf_counter() - request.state.started, {"stage": "validation"})
+    features = predictionFeatures.model_dump()
+
+    # Same car already predicted recently by the active model : no model call
+    if prediction_cache is not None:
+        with metrics.timer(STAGE_METRIC, stage="cache"):
+            features = prediction_cache.canonical(features)
+            cache_key = prediction_cache.key(features)
+            version = registry.active.version
+            prediction = prediction_cache.get((version,) + cache_key)
+        if prediction is not None:
+            return {"prediction": prediction, "model_version": version}
+
+    # Model call is CPU bound : it runs in a worker thread, grouped with concurrent calls if batching is enabled
+    if batcher is not None:
+        prediction, version = await batcher.submit(features)
+    else:
+        prediction, version = (await run_in_threadpool(score_rows, [features]))[0]
+
+    if prediction_cache is not None:
+        prediction_cache.set((version,) + cache_key, prediction)
+    submit_shadow(features, prediction)
 
     # Format response
-    response = {"prediction": prediction.tolist()[0]}
+    response = {"prediction": prediction, "model_version": version}
     return response
 
 
+@app.post("/predict/batch", tags=["Machine Learning"])
+def predict_batch(predictionFeatures: List[PredictionFeatures],
+                  chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE)):
+    """
+    To predict rental car price per day for many cars in one call :
+    - Send a JSON array of cars, each car has the same variables as `/predict`
+    - Cars are sent to the model by groups of `chunk_size` rows (default `5000`) to limit memory usage
+
+    Predictions are returned in the same order as the cars sent.
+
+    Exemple to use:
+
+    [
+    {"model_key": "Renault", "mileage": 109839, "engine_power": 135, "fuel": "diesel", "paint_color": "black",
+     "car_type": "sedan", "private_parking_available": true, "has_gps": true, "has_air_conditioning": false,
+     "automatic_car": false, "has_getaround_connect": true, "has_speed_regulator": false, "winter_tires": true},
+    {"model_key": "Peugeot", "mileage": 60000, "engine_power": 110, "fuel": "petrol", "paint_color": "grey",
+     "car_type": "hatchback", "private_parking_available": false, "has_gps": false, "has_air_conditioning": true,
+     "automatic_car": false, "has_getaround_connect": false, "has_speed_regulator": true, "winter_tires": false}
+    ]
+    """
+    model = registry.active
+    variables = features_to_frame(predictionFeatures)
+    prediction = predict_in_chunks(model, split_frame(variables, chunk_size))
+    return {"prediction": prediction.tolist(), "model_version": model.version}
+
+
+@app.post("/predict/batch/file", tags=["Machine Learning"])
+def predict_batch_file(file: UploadFile = File(...),
+                       chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE)):
+    """
+    To predict rental car price per day for a whole file of cars :
+    - Upload a `.csv`, `.parquet` or `.arrow` / `.feather` file with the same columns as `get_around_pricing_project.csv`
+    - Extra columns (`Unnamed: 0`, `rental_price_per_day`, ...) are ignored
+    - CSV files are read and predicted by groups of `chunk_size` rows, so big files do not have to fit in memory
+
+    Predictions are returned in the same order as the rows of the file.
+    """
+    suffix = "." + (file.filename or "").rsplit(".", 1)[-1].lower()
+    file_format = BATCH_FILE_READERS.get(suffix)
+    if file_format is None:
+        raise HTTPException(status_code=415,
+                            detail=f"Unsupported file type '{suffix}', use one of {sorted(BATCH_FILE_READERS)}")
+
+    model = registry.active
+    try:
+        if file_format == "csv":
+            frames = pd.read_csv(file.file, chunksize=chunk_size)
+        elif file_format == "parquet":
+            frames = split_frame(pd.read_parquet(file.file, columns=FEATURE_COLUMNS), chunk_size)
+        else:
+            frames = split_frame(pd.read_feather(file.file, columns=FEATURE_COLUMNS), chunk_size)
+        prediction = predict_in_chunks(model, frames)
+    except (ValueError, KeyError, ImportError) as e:
+        raise HTTPException(status_code=422, detail=f"Could not read file: {e}")
+
+    return {"prediction": prediction.tolist(), "model_version": model.version}
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=7860)
\ No newline at end of file
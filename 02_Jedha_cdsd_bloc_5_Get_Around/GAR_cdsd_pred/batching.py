@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from metrics import Histogram
+
+# Upper bounds of the histogram buckets used in the stats
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+WAIT_SECONDS_BUCKETS = [0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25]
+
+
+class MicroBatcher:
+    """
+    Groups concurrent single predictions into one model call.
+
+    Each call to `submit` puts a row in a queue. A background task waits for the first
+    row, then keeps collecting rows for `max_wait_ms` or until `max_batch_size` rows are
+    queued, scores them together with `predict_fn` in a worker thread (so the event loop
+    is never blocked) and gives each caller back its own prediction.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+        self.errors = 0
+        self.queue_wait_max = 0.0
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait = Histogram(WAIT_SECONDS_BUCKETS)
+
+    async def start(self):
+        """Starts the background batching task (must be called inside the running event loop)"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the background task, pending callers get an error"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    async def submit(self, row):
+        """Queues one row (dict of features) and waits for its prediction"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        """Waits for a first row, then fills the batch until the window closes or it is full"""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            self._record(batch, started)
+
+            rows = [row for row, _, _ in batch]
+            try:
+                predictions = await loop.run_in_executor(None, self.predict_fn, rows)
+            except Exception as e:
+                self.errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future, _), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(prediction)
+
+    def _record(self, batch, started):
+        self.batch_size.observe(len(batch))
+        for _, _, enqueued_at in batch:
+            wait = started - enqueued_at
+            self.queue_wait_max = max(self.queue_wait_max, wait)
+            self.queue_wait.observe(wait)
+
+    def stats(self):
+        """Batch-size distribution and queue wait time since startup"""
+        batch_size = self.batch_size.snapshot()
+        queue_wait = self.queue_wait.snapshot()
+        batches, items = batch_size["count"], batch_size["sum"]
+        return {
+            "batches": batches,
+            "items": int(items),
+            "errors": self.errors,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "mean_batch_size": round(items / batches, 2) if batches else 0,
+            "queue_wait_ms_mean": round(queue_wait["sum"] / queue_wait["count"] * 1000, 3) if queue_wait["count"] else 0,
+            "queue_wait_ms_max": round(self.queue_wait_max * 1000, 3),
+            "batch_size": batch_size["buckets"],
+            "queue_wait_seconds": queue_wait["buckets"],
+        }
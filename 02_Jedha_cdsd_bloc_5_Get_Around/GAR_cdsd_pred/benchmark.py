@@ -0,0 +1,218 @@
+"""
+Load test / latency benchmark of the pricing API.
+
+Replays payloads sampled from DATA/get_around_pricing_project.csv against /predict,
+/preview and /predict/batch, either in-process (ASGI, no network) or against a running
+server, and writes a JSON report with throughput and p50 / p95 / p99 latencies.
+
+The in-process app runs without the prediction cache (GAR_CACHE=0) unless --cache is given, so
+/predict latencies measure the model and not cache hits. The cache hit ratio of each scenario is
+reported next to its latencies whenever the target has the cache enabled.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --cache --output bench_cache.json
+    python benchmark.py --url http://localhost:7860 --concurrency 32 --requests 2000
+    python benchmark.py --output new.json --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from gar_inference import FEATURE_COLUMNS
+
+DATA_PATH = "DATA/get_around_pricing_project.csv"
+
+# Latency increase (in %) above which --compare reports a regression
+DEFAULT_TOLERANCE = 10.0
+
+
+def load_payloads(path, n, seed):
+    """`n` realistic cars sampled from the pricing dataset, as JSON-ready dicts"""
+    df = pd.read_csv(path)[FEATURE_COLUMNS]
+    sample = df.sample(n, replace=len(df) < n, random_state=seed)
+    return sample.to_dict(orient="records")
+
+
+def summarize(latencies, errors, elapsed, items_per_request=1):
+    latencies_ms = np.array(latencies) * 1000
+    ok = len(latencies_ms)
+    summary = {
+        "requests": ok + errors,
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0,
+        "throughput_items_per_s": round(ok * items_per_request / elapsed, 2) if elapsed else 0,
+    }
+    if ok:
+        summary.update({
+            "latency_ms_mean": round(float(latencies_ms.mean()), 3),
+            "latency_ms_p50": round(float(np.percentile(latencies_ms, 50)), 3),
+            "latency_ms_p95": round(float(np.percentile(latencies_ms, 95)), 3),
+            "latency_ms_p99": round(float(np.percentile(latencies_ms, 99)), 3),
+            "latency_ms_max": round(float(latencies_ms.max()), 3),
+        })
+    return summary
+
+
+async def run_scenario(client, method, path, bodies, n_requests, concurrency, items_per_request=1):
+    """Sends `n_requests` requests with `concurrency` concurrent clients and measures each one"""
+    latencies = []
+    errors = 0
+    next_request = 0
+
+    async def worker():
+        nonlocal next_request, errors
+        while next_request < n_requests:
+            i = next_request
+            next_request += 1
+            body = bodies[i % len(bodies)] if bodies else None
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(latencies, errors, time.perf_counter() - started, items_per_request)
+
+
+async def cache_counters(client):
+    """(hits, misses) of the prediction cache, None if it is disabled"""
+    try:
+        stats = (await client.get("/cache")).json()
+    except (httpx.HTTPError, ValueError):
+        return None
+    return (stats["hits"], stats["misses"]) if stats.get("enabled") else None
+
+
+def scenarios(payloads, args):
+    """(name, method, path, bodies, number of requests, items per request)"""
+    batches = [payloads[i:i + args.batch_size] for i in range(0, len(payloads), args.batch_size)]
+    return [
+        ("predict", "POST", "/predict", payloads, args.requests, 1),
+        ("preview", "GET", "/preview?rows=10", None, args.requests, 1),
+        ("predict_batch", "POST", "/predict/batch", batches, max(1, args.requests // 10), args.batch_size),
+    ]
+
+
+async def run(args):
+    payloads = load_payloads(args.data, args.payloads, args.seed)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+        lifespan = None
+    else:
+        # In-process : the app is imported here and called through ASGI, without network
+        if not args.cache:
+            os.environ["GAR_CACHE"] = "0"
+        import app as api
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://benchmark", timeout=60)
+        lifespan = api.app.router.lifespan_context(api.app)
+        await lifespan.__aenter__()
+
+    results = {}
+    try:
+        for name, method, path, bodies, n_requests, items in scenarios(payloads, args):
+            if args.only and name not in args.only:
+                continue
+            # Warm-up requests are not measured
+            await run_scenario(client, method, path, bodies, min(n_requests, args.concurrency), args.concurrency, items)
+            before = await cache_counters(client)
+            results[name] = await run_scenario(client, method, path, bodies, n_requests, args.concurrency, items)
+            after = await cache_counters(client)
+            if before and after:
+                hits, lookups = after[0] - before[0], after[0] + after[1] - before[0] - before[1]
+                if lookups:
+                    results[name]["cache_hit_ratio"] = round(hits / lookups, 4)
+            print(f"{name:>14}: {json.dumps(results[name])}", file=sys.stderr)
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def compare(report, baseline, tolerance):
+    """Latency / throughput changes vs a previous report, flags regressions above `tolerance` %"""
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("latency_ms_p50", "latency_ms_p95", "latency_ms_p99"):
+            if metric in current and previous.get(metric):
+                change = (current[metric] - previous[metric]) / previous[metric] * 100
+                if change > tolerance:
+                    regressions.append(f"{name} {metric}: {previous[metric]} -> {current[metric]} ms (+{change:.1f}%)")
+        if previous.get("throughput_rps"):
+            change = (previous["throughput_rps"] - current["throughput_rps"]) / previous["throughput_rps"] * 100
+            if change > tolerance:
+                regressions.append(f"{name} throughput_rps: {previous['throughput_rps']} -> {current['throughput_rps']} (-{change:.1f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput / latency benchmark of the pricing API")
+    parser.add_argument("--url", help="base URL of a running server (default: in-process ASGI app)")
+    parser.add_argument("--data", default=DATA_PATH, help="dataset used to build payloads (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients (default: %(default)s)")
+    parser.add_argument("--payloads", type=int, default=500, help="distinct cars sampled (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=100, help="cars per /predict/batch call (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="sampling seed (default: %(default)s)")
+    parser.add_argument("--cache", action="store_true",
+                        help="keep the prediction cache of the in-process app (default: GAR_CACHE=0)")
+    parser.add_argument("--only", nargs="+", choices=["predict", "preview", "predict_batch"], help="endpoints to run")
+    parser.add_argument("--output", help="JSON report path (default: stdout)")
+    parser.add_argument("--compare", help="previous JSON report to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed regression in %% before failing --compare (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "target": args.url or "in-process",
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "env": {key: value for key, value in os.environ.items() if key.startswith("GAR_") or key == "WEB_CONCURRENCY"},
+        "results": results,
+    }
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        for regression in report["regressions"]:
+            print(f"⚠️ regression: {regression}", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+
+class CompiledPredictor:
+    """
+    Inference path that skips the pandas DataFrame and the sklearn preprocessing.
+
+    The fitted ColumnTransformer (OneHotEncoder + StandardScaler) is read once: each
+    category becomes an output column index and each numerical column a (index, mean, scale).
+    Features are then written straight into a NumPy matrix and sent to the regressor.
+
+    The preprocessor outputs a sparse matrix, and XGBoost treats the entries absent from a
+    sparse matrix as *missing* (not as 0). To get the same predictions, the matrix is filled
+    with NaN and only the non-zero values are written.
+    """
+
+    def __init__(self, model):
+        pipeline = getattr(model, "best_estimator_", model)
+        preprocessor = pipeline[:-1][-1]
+        self.regressor = pipeline[-1]
+
+        self.categorical = []  # (column, {category: output index}, known categories or None)
+        self.categories = {}   # column -> all fitted categories (dropped one included)
+        self.numerical = []    # (column, output index, mean, scale)
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == "remainder" and transformer == "drop":
+                continue
+            if isinstance(transformer, OneHotEncoder):
+                if getattr(transformer, "_infrequent_enabled", False):
+                    raise ValueError("OneHotEncoder with infrequent categories is not supported")
+                drop_idx = transformer.drop_idx_ if transformer.drop_idx_ is not None else [None] * len(columns)
+                for column, categories, dropped in zip(columns, transformer.categories_, drop_idx):
+                    self.categories[column] = list(categories)
+                    lookup = {}
+                    for i, category in enumerate(categories):
+                        if i == dropped:
+                            continue
+                        lookup[category] = offset
+                        offset += 1
+                    known = set(categories) if transformer.handle_unknown == "error" else None
+                    self.categorical.append((column, lookup, known))
+            elif isinstance(transformer, StandardScaler):
+                mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+                for column, m, s in zip(columns, mean, scale):
+                    self.numerical.append((column, offset, float(m), float(s)))
+                    offset += 1
+            else:
+                raise ValueError(f"Unsupported transformer '{name}': {transformer!r}")
+
+        self.n_features = offset
+        self.fill_value = np.nan if preprocessor.sparse_output_ else 0.0
+        columns = [col for col, _, _ in self.categorical] + [col for col, _, _, _ in self.numerical]
+        self.columns = list(getattr(pipeline, "feature_names_in_", columns))
+
+    @staticmethod
+    def _check_known(column, values, known):
+        """Same behaviour as OneHotEncoder(handle_unknown='error')"""
+        unknown = [value for value in values if value not in known]
+        if unknown:
+            raise ValueError(f"Found unknown categories {unknown[:5]} in column '{column}'")
+
+    def encode_rows(self, rows):
+        """Encodes a list of feature dicts into the model matrix"""
+        X = np.full((len(rows), self.n_features), self.fill_value, dtype=np.float32)
+        for r, row in enumerate(rows):
+            for column, lookup, known in self.categorical:
+                index = lookup.get(row[column])
+                if index is not None:
+                    X[r, index] = 1.0
+                elif known is not None:
+                    self._check_known(column, [row[column]], known)
+            for column, index, mean, scale in self.numerical:
+                value = (row[column] - mean) / scale
+                if value != 0:
+                    X[r, index] = value
+        return X
+
+    def encode_frame(self, df):
+        """Encodes a DataFrame into the model matrix, column by column"""
+        X = np.full((len(df), self.n_features), self.fill_value, dtype=np.float32)
+        positions = np.arange(len(df))
+        for column, lookup, known in self.categorical:
+            values = df[column].to_numpy(dtype=object)
+            if known is not None:
+                self._check_known(column, pd.unique(values), known)
+            index = pd.Series(values).map(lookup).to_numpy(dtype=np.float64)
+            encoded = ~np.isnan(index)
+            X[positions[encoded], index[encoded].astype(np.intp)] = 1.0
+        for column, index, mean, scale in self.numerical:
+            values = (df[column].to_numpy(dtype=np.float64) - mean) / scale
+            if np.isnan(self.fill_value):
+                values = np.where(values == 0, np.nan, values)
+            X[:, index] = values
+        return X
+
+    def predict_rows(self, rows):
+        return self.regressor.predict(self.encode_rows(rows))
+
+    def predict_frame(self, df):
+        return self.regressor.predict(self.encode_frame(df))
+
+    def sample_rows(self, n_numeric=5, seed=0):
+        """Synthetic rows covering every category, an unknown value and centred numerics"""
+        rng = np.random.default_rng(seed)
+        choices = {}
+        for column, _, known in self.categorical:
+            choices[column] = self.categories[column] + ([] if known is not None else ["__unknown__"])
+        longest = max((len(values) for values in choices.values()), default=1)
+        rows = []
+        for i in range(longest):
+            for j in range(n_numeric):
+                row = {column: values[(i + j) % len(values)] for column, values in choices.items()}
+                for column, _, mean, scale in self.numerical:
+                    row[column] = mean if j == 0 else float(mean + scale * rng.normal())
+                rows.append(row)
+        return rows
+
+    def verify(self, model, rows=None, atol=1e-3):
+        """Max absolute difference with `model.predict` on `rows`, raises if above `atol`"""
+        if rows is None:
+            rows = self.sample_rows()
+        frame = pd.DataFrame(rows, columns=self.columns)
+        expected = model.predict(frame)
+        diff_rows = np.abs(self.predict_rows(rows) - expected).max()
+        diff_frame = np.abs(self.predict_frame(frame) - expected).max()
+        max_diff = float(max(diff_rows, diff_frame))
+        if not max_diff <= atol:
+            raise ValueError(f"Compiled predictor differs from the model by {max_diff}")
+        return max_diff
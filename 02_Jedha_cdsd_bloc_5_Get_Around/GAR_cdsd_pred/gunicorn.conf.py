@@ -0,0 +1,26 @@
+# Gunicorn configuration for the multi-worker mode of the API
+# CMD gunicorn -c gunicorn.conf.py app:app
+import gc
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Number of workers : WEB_CONCURRENCY if set, else one per CPU
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# The app (and so the model) is imported once in the master process before the workers are forked :
+# the model memory is shared copy-on-write between the workers instead of being loaded N times
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    # Objects created before the fork are moved out of the garbage collector's reach,
+    # so collections in the workers do not write to (and un-share) their memory pages
+    gc.freeze()
+    server.log.info(f"Model loaded in master, starting {workers} workers")
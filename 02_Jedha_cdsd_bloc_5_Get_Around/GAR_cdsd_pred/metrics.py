@@ -0,0 +1,151 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# Default buckets (in seconds) of the latency histograms
+LATENCY_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+
+
+class Histogram:
+    """Fixed-bucket histogram (same semantics as a Prometheus histogram)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def cumulative(self):
+        """[(upper bound as text, observations <= bound)], ending with +Inf"""
+        with self._lock:
+            counts = list(self.counts)
+        total = 0
+        result = []
+        for bound, count in zip([_format(b) for b in self.buckets] + ["+Inf"], counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self):
+        """JSON-friendly view: count per bucket (not cumulative), sum and count"""
+        with self._lock:
+            return {
+                "buckets": dict(zip([_format(b) for b in self.buckets] + ["+Inf"], self.counts)),
+                "sum": self.sum,
+                "count": self.count,
+            }
+
+
+def _format(value):
+    return f"{value:g}"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{str(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+class MetricsRegistry:
+    """
+    Minimal thread-safe registry rendered in the Prometheus text format.
+
+    Metrics are declared once with `describe`, then updated with `inc`, `observe` or `set`.
+    `add_collector` registers a function called at each scrape that returns
+    (name, labels, value) samples for values owned by other objects (cache, batcher, ...).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}        # name -> (type, help, buckets)
+        self._values = {}      # (name, labels tuple) -> float or Histogram
+        self._collectors = []
+
+    def describe(self, name, metric_type, help_text, buckets=None):
+        self._meta[name] = (metric_type, help_text, buckets)
+
+    def _key(self, name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, labels=None, value=1):
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        with self._lock:
+            self._values[self._key(name, labels)] = value
+
+    def histogram(self, name, labels=None):
+        """Histogram of `name` for these labels (created on first use)"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                buckets = self._meta.get(name, (None, None, None))[2] or LATENCY_BUCKETS
+                histogram = self._values[key] = Histogram(buckets)
+        return histogram
+
+    def observe(self, name, value, labels=None):
+        self.histogram(name, labels).observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observes the duration (in seconds) of the `with` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, labels)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        samples = {}
+        with self._lock:
+            items = list(self._values.items())
+        for (name, labels), value in items:
+            samples.setdefault(name, []).append((dict(labels), value))
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                samples.setdefault(name, []).append((labels or {}, value))
+
+        lines = []
+        for name in sorted(samples):
+            metric_type, help_text, _ = self._meta.get(name, ("gauge", name, None))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples[name]:
+                if isinstance(value, Histogram):
+                    for bound, count in value.cumulative():
+                        lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {value.sum}")
+                    lines.append(f"{name}_count{_labels(labels)} {value.count}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes():
+    """Resident memory of the current process (Linux /proc, else peak RSS from resource)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
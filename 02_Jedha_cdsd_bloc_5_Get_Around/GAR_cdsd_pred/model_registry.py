@@ -0,0 +1,146 @@
+import os
+import logging
+import threading
+
+from gar_inference import load_model
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FILE = "ACTIVE"
+CANDIDATE_FILE = "CANDIDATE"
+MODEL_SUFFIX = ".joblib"
+
+
+def _read_pointer(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class ModelRegistry:
+    """
+    Active model of the API (and optional shadow candidate), reloadable without restart.
+
+    Two layouts are supported:
+    - a single model file (`model_path`) : its version is a hash of its content, and it is
+      reloaded when the file changes on disk;
+    - a registry directory (`registry_dir`) with one `<version>.joblib` file per model,
+      an `ACTIVE` file holding the active version and an optional `CANDIDATE` file holding
+      the version scored in shadow mode.
+
+    New versions are fully loaded (and verified) before being swapped in with one attribute
+    assignment : requests already running keep the model they started with.
+    """
+
+    def __init__(self, model_path=None, registry_dir=None, mmap_mode=None, fast_path=True, on_swap=None):
+        if not model_path and not registry_dir:
+            raise ValueError("model_path or registry_dir is required")
+        self.model_path = model_path
+        self.registry_dir = registry_dir
+        self.mmap_mode = mmap_mode
+        self.fast_path = fast_path
+        self.on_swap = on_swap
+        self.active = None
+        self.candidate = None
+        self.reloads = 0
+        self.reload_errors = 0
+        self._signature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def watch_path(self):
+        """File whose change means a new active model"""
+        return os.path.join(self.registry_dir, ACTIVE_FILE) if self.registry_dir else self.model_path
+
+    def versions(self):
+        """Versions available in the registry directory"""
+        if not self.registry_dir:
+            return [self.active.version] if self.active else []
+        return sorted(name[:-len(MODEL_SUFFIX)] for name in os.listdir(self.registry_dir) if name.endswith(MODEL_SUFFIX))
+
+    def _version_path(self, version):
+        path = os.path.join(self.registry_dir, version + MODEL_SUFFIX)
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.registry_dir):
+            raise ValueError(f"Invalid model version {version!r}")
+        return path
+
+    def _load(self, path, version=None):
+        return load_model(path, version, mmap_mode=self.mmap_mode, fast_path=self.fast_path)
+
+    def _refresh_single_file(self):
+        stat = os.stat(self.model_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+        new = self._load(self.model_path)
+        self._signature = signature
+        if self.active is not None and new.version == self.active.version:
+            return False
+        self._swap(new)
+        return True
+
+    def _refresh_registry(self):
+        changed = False
+        active_version = _read_pointer(os.path.join(self.registry_dir, ACTIVE_FILE))
+        if active_version is None:
+            versions = self.versions()
+            if not versions:
+                raise FileNotFoundError(f"No model in registry {self.registry_dir}")
+            active_version = versions[-1]
+        if self.active is None or self.active.version != active_version:
+            self._swap(self._load(self._version_path(active_version), active_version))
+            changed = True
+
+        candidate_version = _read_pointer(os.path.join(self.registry_dir, CANDIDATE_FILE))
+        if candidate_version is None or candidate_version == active_version:
+            self.candidate = None
+        elif self.candidate is None or self.candidate.version != candidate_version:
+            self.candidate = self._load(self._version_path(candidate_version), candidate_version)
+        return changed
+
+    def _swap(self, new):
+        old, self.active = self.active, new
+        if old is not None:
+            self.reloads += 1
+            logger.info(f"Active model swapped: {old.version} -> {new.version}")
+        if self.on_swap is not None:
+            self.on_swap(old, new)
+
+    def refresh(self):
+        """Loads the active / candidate models if they changed, returns True if the active model was swapped"""
+        with self._lock:
+            if self.registry_dir:
+                return self._refresh_registry()
+            return self._refresh_single_file()
+
+    def try_refresh(self):
+        """`refresh` that keeps the current model (and logs) if the new one cannot be loaded"""
+        try:
+            return self.refresh()
+        except Exception as e:
+            self.reload_errors += 1
+            logger.error(f"Model reload failed, keeping {self.active.version if self.active else None}: {e}")
+            return False
+
+    def start(self, interval):
+        """Checks for new models every `interval` seconds in a background thread"""
+        if interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(interval):
+                self.try_refresh()
+
+        self._thread = threading.Thread(target=poll, name="model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,85 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    In-process LRU + TTL cache of predictions.
+
+    Keys are canonical tuples of the PredictionFeatures values (always in the same column
+    order, numbers as floats, booleans as bools). With `mileage_bucket` / `engine_power_bucket`
+    set, those values are rounded to the nearest bucket before the key is built and before
+    the prediction is computed, so close cars share the same entry (more hits, less precision).
+
+    The app stores entries under `(model version,) + key(features)` and clears the whole cache
+    when the model registry swaps in a new version (`on_model_swap`), so an entry is never served
+    by another model.
+    """
+
+    def __init__(self, columns, max_entries=10000, ttl_seconds=3600, mileage_bucket=0, engine_power_bucket=0):
+        self.columns = list(columns)
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.buckets = {"mileage": mileage_bucket, "engine_power": engine_power_bucket}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def canonical(self, features):
+        """Returns the features with mileage / engine_power rounded to their bucket (if enabled)"""
+        features = dict(features)
+        for col, bucket in self.buckets.items():
+            if bucket:
+                features[col] = float(round(features[col] / bucket) * bucket)
+        return features
+
+    def key(self, features):
+        """Canonical, hashable key of a features dict"""
+        return tuple(
+            float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+            for value in (features[col] for col in self.columns)
+        )
+
+    def get(self, key):
+        """Cached prediction or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self):
+        """Drops every entry (the model changed)"""
+        with self._lock:
+            self._entries.clear()
+            self._counters["invalidations"] += 1
+
+    def stats(self):
+        """Hit / miss / eviction counters and current size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl
+        stats["buckets"] = {col: bucket for col, bucket in self.buckets.items() if bucket}
+        return stats
@@ -0,0 +1,95 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+
+class PreviewData:
+    """
+    Dataset kept in memory for /preview.
+
+    The CSV is read once into a compact frame: text columns as `category`, integers
+    downcast, and all boolean columns packed as bits of a single uint8 / uint16 column.
+    Samples are built from the underlying NumPy arrays (category codes, packed flags),
+    so their cost only depends on the number of rows asked for.
+    The file's mtime is checked on each access and the data is reloaded if it changed.
+    """
+
+    def __init__(self, path, drop_columns=("Unnamed: 0",)):
+        self.path = path
+        self.drop_columns = list(drop_columns)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._state = None  # (frame, flags, decoders), swapped in one assignment on reload
+
+    def _load(self):
+        df = pd.read_csv(self.path)
+        df = df.drop(columns=[col for col in self.drop_columns if col in df.columns])
+        columns = list(df.columns)
+
+        bool_columns = [col for col in columns if df[col].dtype == bool]
+        flag_dtype = np.uint8 if len(bool_columns) <= 8 else np.uint16 if len(bool_columns) <= 16 else np.uint64
+        flags = np.zeros(len(df), dtype=flag_dtype)
+        for bit, col in enumerate(bool_columns):
+            flags |= df[col].to_numpy().astype(flag_dtype) << flag_dtype(bit)
+        df = df.drop(columns=bool_columns)
+
+        for col in df.columns:
+            if df[col].dtype.kind in "OU" or pd.api.types.is_string_dtype(df[col]):
+                df[col] = df[col].astype("category")
+            elif pd.api.types.is_integer_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast="integer")
+            elif pd.api.types.is_float_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast="float")
+
+        # One decoder per original column : turns sampled positions back into Python values
+        decoders = []
+        for col in columns:
+            if col in bool_columns:
+                decoders.append((col, "bool", flag_dtype(bool_columns.index(col))))
+            elif isinstance(df[col].dtype, pd.CategoricalDtype):
+                decoders.append((col, "category", (df[col].cat.codes.to_numpy(), df[col].cat.categories.tolist())))
+            else:
+                decoders.append((col, "value", df[col].to_numpy()))
+
+        self._state = (df.reset_index(drop=True), flags, decoders)
+
+    def _refresh(self):
+        """Loads the file the first time and again whenever its mtime changes"""
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._load()
+                    self._mtime = mtime
+
+    def __len__(self):
+        self._refresh()
+        return len(self._state[0])
+
+    def memory_usage(self):
+        """Bytes used by the in-memory dataset"""
+        self._refresh()
+        frame, flags, _ = self._state
+        return int(frame.memory_usage(deep=True).sum() + flags.nbytes)
+
+    def sample(self, rows, seed=None):
+        """`rows` random records (without replacement), reproducible when `seed` is given"""
+        self._refresh()
+        frame, flags, decoders = self._state
+        rows = min(rows, len(frame))
+        positions = np.random.default_rng(seed).choice(len(frame), size=rows, replace=False)
+
+        packed = flags[positions]
+        values = []
+        for col, kind, data in decoders:
+            if kind == "bool":
+                values.append(((packed >> data) & 1).astype(bool).tolist())
+            elif kind == "category":
+                codes, categories = data
+                values.append([categories[code] if code >= 0 else None for code in codes[positions].tolist()])
+            else:
+                values.append(data[positions].tolist())
+
+        names = [col for col, _, _ in decoders]
+        return [dict(zip(names, row)) for row in zip(*values)]
@@ -0,0 +1,142 @@
+"""
+Offline bulk scoring with the pricing model of the API.
+
+Streams a CSV or Parquet file with the `get_around_pricing_project.csv` columns in chunks,
+scores each chunk and appends the predictions to the output file as it goes, so memory
+stays flat whatever the input size.
+
+Usage:
+    python score.py DATA/get_around_pricing_project.csv predictions.csv
+    python score.py fleet.parquet predictions.parquet --chunk-size 100000 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from gar_inference import FEATURE_COLUMNS, validate_frame, load_model
+
+DEFAULT_MODEL_PATH = os.getenv("GAR_MODEL_PATH", "modele_GAR.joblib")
+PREDICTION_COLUMN = "prediction"
+
+# Model of the current process (loaded once per worker process)
+_predict_frame = None
+
+
+def load_predictor(model_path):
+    """Fast path when it matches the pipeline, else the pipeline itself"""
+    model = load_model(model_path)
+    if model.compiled is None:
+        print("Fast inference path disabled, using the sklearn pipeline", file=sys.stderr)
+        return model.pipeline.predict
+    return model.compiled.predict_frame
+
+
+def _init_worker(model_path):
+    global _predict_frame
+    _predict_frame = load_predictor(model_path)
+
+
+def score_chunk(chunk):
+    """Validates a chunk and returns it with a prediction column"""
+    features = validate_frame(chunk)
+    chunk = chunk.copy()
+    chunk[PREDICTION_COLUMN] = _predict_frame(features)
+    return chunk
+
+
+def read_chunks(path, chunk_size):
+    """Yields DataFrames of `chunk_size` rows from a CSV or Parquet file"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file"""
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.columns = columns
+        self._parquet = None
+        self._header = True
+
+    def write(self, chunk):
+        if self.columns is not None:
+            chunk = chunk[self.columns]
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def scored_chunks(chunks, model_path, workers):
+    """Scores the chunks in order, in this process or in a pool of `workers` processes"""
+    if workers <= 1:
+        _init_worker(model_path)
+        for chunk in chunks:
+            yield score_chunk(chunk)
+        return
+
+    # At most 2 chunks per worker are read ahead, so the input is never fully loaded
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(score_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk scoring of a car file with the pricing model")
+    parser.add_argument("input", help="CSV or Parquet file with the get_around_pricing_project.csv columns")
+    parser.add_argument("output", help="CSV or Parquet file to write (input columns + prediction)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="joblib model (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows per chunk (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1, help="processes scoring chunks in parallel (default: %(default)s)")
+    parser.add_argument("--only-predictions", action="store_true",
+                        help="write only the model columns and the prediction")
+    args = parser.parse_args(argv)
+
+    columns = FEATURE_COLUMNS + [PREDICTION_COLUMN] if args.only_predictions else None
+    writer = ChunkWriter(args.output, columns)
+    rows = 0
+    started = time.perf_counter()
+    try:
+        for i, chunk in enumerate(scored_chunks(read_chunks(args.input, args.chunk_size), args.model, args.workers)):
+            writer.write(chunk)
+            rows += len(chunk)
+            elapsed = time.perf_counter() - started
+            print(f"chunk {i + 1}: {rows} rows scored ({rows / elapsed:,.0f} rows/sec)", file=sys.stderr)
+    except ValueError as e:
+        print(f"Error at row {rows}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {rows} rows scored in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/sec) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Copies the prediction code shared with the API (GAR_cdsd_pred/gar_inference) and the model file
+into the dashboard folder. Each app folder is a standalone Hugging Face Space built from its own
+directory, so the dashboard keeps its own copy; GAR_cdsd_pred holds the source to edit.
+
+    python sync_shared.py          # copy after changing gar_inference or the model
+    python sync_shared.py --check  # exit 1 if the dashboard copy differs (tests/test_shared_copies.py)
+"""
+import os
+import sys
+import shutil
+import filecmp
+import argparse
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(ROOT, "GAR_cdsd_pred")
+COPY_DIRS = [os.path.join(ROOT, "GAR_cdsd_analysis")]
+SHARED = ["gar_inference", "modele_GAR.joblib"]
+
+
+def shared_files(folder):
+    """Shared files of an app folder, as paths relative to it (__pycache__ left out)"""
+    files = set()
+    for name in SHARED:
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            files.add(name)
+        for root, dirs, names in os.walk(path):
+            dirs[:] = [d for d in dirs if d != "__pycache__"]
+            files.update(os.path.relpath(os.path.join(root, n), folder) for n in names if not n.endswith(".pyc"))
+    return files
+
+
+def differences():
+    """Files that are missing, extra or different in the copies"""
+    source = shared_files(SOURCE_DIR)
+    found = []
+    for folder in COPY_DIRS:
+        copy = shared_files(folder)
+        for name in sorted(source | copy):
+            if name not in copy or name not in source or not filecmp.cmp(
+                    os.path.join(SOURCE_DIR, name), os.path.join(folder, name), shallow=False):
+                found.append(os.path.relpath(os.path.join(folder, name), ROOT))
+    return found
+
+
+def sync():
+    for folder in COPY_DIRS:
+        for name in SHARED:
+            source, target = os.path.join(SOURCE_DIR, name), os.path.join(folder, name)
+            if os.path.isdir(source):
+                shutil.rmtree(target, ignore_errors=True)
+                shutil.copytree(source, target, ignore=shutil.ignore_patterns("__pycache__", "*.pyc"))
+            else:
+                shutil.copy2(source, target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy gar_inference and the model into the dashboard folder")
+    parser.add_argument("--check", action="store_true", help="only report differences")
+    args = parser.parse_args()
+    if not args.check:
+        sync()
+    found = differences()
+    for path in found:
+        print(f"out of sync: {path}")
+    sys.exit(1 if found else 0)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same layout as the API image (gar_inference inside the API folder), plus this folder for sync_shared
+# and the dashboard modules (after the API folder, whose app.py is the one imported as `app`)
+sys.path[:0] = [ROOT, os.path.join(ROOT, "GAR_cdsd_pred"), os.path.join(ROOT, "GAR_cdsd_analysis")]
+os.environ.setdefault("GAR_MODEL_PATH", os.path.join(ROOT, "GAR_cdsd_pred", "modele_GAR.joblib"))
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from delay_index import GroupedRangeIndex
+
+WIDTH = 15.0
+
+
+@pytest.fixture
+def rentals():
+    rng = np.random.default_rng(0)
+    # Integer minutes like the dataset, many of them on the bin edges, and a few missing values
+    delta = rng.integers(0, 48, 2000).astype(float) * 15
+    delta[::7] += rng.integers(1, 15, len(delta[::7]))
+    delta[::50] = np.nan
+    return pd.DataFrame({"delta": delta, "checkin_type": rng.choice(["mobile", "connect"], len(delta))})
+
+
+def masked(rentals, low, high):
+    return rentals[(rentals["delta"] >= low) & (rentals["delta"] <= high)]
+
+
+@pytest.mark.parametrize("low, high", [(0, 720), (60, 120), (30, 30), (17, 333), (120, 60), (705, 2000)])
+def test_counts_match_the_mask(rentals, low, high):
+    index = GroupedRangeIndex(rentals["delta"], rentals["checkin_type"], bin_width=WIDTH)
+    expected = masked(rentals, low, high).groupby("checkin_type").size()
+    assert index.count_by_group(low, high) == {group: int(expected.get(group, 0)) for group in index.groups}
+    assert index.count(low, high) == len(masked(rentals, low, high))
+
+
+@pytest.mark.parametrize("low, high", [(0, 705), (60, 120), (0, 15), (30, 30), (600, 705)])
+def test_histogram_matches_the_mask(rentals, low, high):
+    index = GroupedRangeIndex(rentals["delta"], rentals["checkin_type"], bin_width=WIDTH)
+    histogram = index.histogram(low, high)
+    edges = np.arange(low, high + WIDTH, WIDTH) if high > low else np.array([low, low + WIDTH])
+    for group in index.groups:
+        rows = histogram[histogram["group"] == group]
+        values = masked(rentals, low, high).query("checkin_type == @group")["delta"]
+        # Bins [start, start + width), the last one closed on high like np.histogram
+        expected, _ = np.histogram(values, bins=edges)
+        assert list(rows["bin_start"]) == list(edges[:-1])
+        assert list(rows["count"]) == list(expected)
+        assert rows["count"].sum() == index.count_by_group(low, high)[group]
+
+
+def test_merged_bins_keep_the_total(rentals):
+    index = GroupedRangeIndex(rentals["delta"], rentals["checkin_type"], bin_width=WIDTH, origin=0.0)
+    histogram = index.histogram(0, 600, max_bins=7)
+    assert histogram.groupby("group").size().max() <= 7
+    assert histogram.groupby("group")["count"].sum().to_dict() == index.count_by_group(0, 600)
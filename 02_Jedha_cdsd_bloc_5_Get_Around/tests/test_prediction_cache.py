@@ -0,0 +1,114 @@
+import pytest
+
+import prediction_cache
+from prediction_cache import PredictionCache
+from gar_inference import FEATURE_COLUMNS
+
+CAR = {
+    "model_key": "Renault",
+    "mileage": 109839,
+    "engine_power": 135,
+    "fuel": "diesel",
+    "paint_color": "black",
+    "car_type": "sedan",
+    "private_parking_available": True,
+    "has_gps": True,
+    "has_air_conditioning": False,
+    "automatic_car": False,
+    "has_getaround_connect": True,
+    "has_speed_regulator": False,
+    "winter_tires": True,
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(prediction_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_key_is_canonical():
+    cache = PredictionCache(FEATURE_COLUMNS)
+    same_car = dict(reversed(list(CAR.items())), mileage=109839.0)
+    assert cache.key(CAR) == cache.key(same_car)
+    assert cache.key(CAR) != cache.key(dict(CAR, has_gps=False))
+    assert cache.key(dict(CAR, has_gps=True))[FEATURE_COLUMNS.index("has_gps")] is True
+
+
+def test_buckets_round_before_the_key():
+    cache = PredictionCache(FEATURE_COLUMNS, mileage_bucket=1000, engine_power_bucket=10)
+    near = cache.canonical(dict(CAR, mileage=110200, engine_power=138))
+    assert near["mileage"] == 110000.0 and near["engine_power"] == 140.0
+    assert cache.key(cache.canonical(CAR)) == cache.key(near)
+    assert PredictionCache(FEATURE_COLUMNS).canonical(CAR) == CAR
+
+
+def test_lru_eviction_and_stats():
+    cache = PredictionCache(FEATURE_COLUMNS, max_entries=2)
+    keys = [cache.key(dict(CAR, mileage=mileage)) for mileage in (1, 2, 3)]
+    cache.set(keys[0], 10.0)
+    cache.set(keys[1], 20.0)
+    assert cache.get(keys[0]) == 10.0  # keys[1] becomes the least recently used
+    cache.set(keys[2], 30.0)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 10.0 and cache.get(keys[2]) == 30.0
+
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+    assert stats["hit_rate"] == 0.75
+
+
+def test_entries_expire(clock):
+    cache = PredictionCache(FEATURE_COLUMNS, ttl_seconds=60)
+    key = cache.key(CAR)
+    cache.set(key, 137.0)
+    clock.now += 59
+    assert cache.get(key) == 137.0
+    clock.now += 2
+    assert cache.get(key) is None
+    assert cache.stats()["expirations"] == 1 and cache.stats()["size"] == 0
+
+
+def test_clear_drops_every_version():
+    cache = PredictionCache(FEATURE_COLUMNS)
+    key = cache.key(CAR)
+    cache.set(("v1",) + key, 137.0)
+    assert cache.get(("v2",) + key) is None
+    cache.clear()
+    assert cache.get(("v1",) + key) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+@pytest.fixture(scope="module")
+def client():
+    from fastapi.testclient import TestClient
+    import app
+
+    with TestClient(app.app) as client:
+        yield client
+
+
+def test_predict_is_served_from_the_cache(client):
+    first = client.post("/predict", json=CAR).json()
+    before = client.get("/cache").json()
+    second = client.post("/predict", json=dict(CAR, mileage=109839.0)).json()
+    after = client.get("/cache").json()
+    assert first == second
+    assert first["model_version"].startswith("modele_GAR@")
+    assert after["hits"] == before["hits"] + 1
+
+
+def test_predict_rejects_unhashable_categories(client):
+    response = client.post("/predict", json=dict(CAR, model_key=["Renault"]))
+    assert response.status_code == 422
+    assert client.post("/predict", json=dict(CAR, model_key=None)).status_code == 200
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from previous_rentals import delay_impact_data, previous_rental_chains
+
+NAN = np.nan
+
+
+def rentals(rows):
+    columns = ["rental_id", "car_id", "checkin_type", "delay_at_checkout_in_minutes",
+               "previous_ended_rental_id", "time_delta_with_previous_rental_in_minutes"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def merge_delay_impact(data_delay_rentals):
+    """The former pd.merge of the dashboard, kept as the reference"""
+    with_previous = data_delay_rentals[data_delay_rentals["previous_ended_rental_id"].notna()].copy()
+    merged = pd.merge(
+        with_previous,
+        data_delay_rentals[["rental_id", "delay_at_checkout_in_minutes"]],
+        left_on="previous_ended_rental_id",
+        right_on="rental_id",
+        how="left",
+        suffixes=("_current", "_previous"),
+    )
+    merged = merged.rename(
+        columns={"delay_at_checkout_in_minutes_previous": "delay_at_checkout_in_minutes_from_previous_rental"}
+    ).drop(columns=["rental_id_previous"])
+    previous_delay = merged["delay_at_checkout_in_minutes_from_previous_rental"]
+    return merged[previous_delay.notna() & (previous_delay > 0)].copy()
+
+
+def test_one_hop_matches_the_merge():
+    df = rentals([
+        [10, 1, "mobile", 45.0, NAN, NAN],
+        [11, 1, "connect", -10.0, 10.0, 60.0],    # previous returned late
+        [12, 1, "mobile", 0.0, 11.0, 30.0],       # previous returned early
+        [20, 2, "connect", NAN, NAN, NAN],
+        [21, 2, "mobile", 5.0, 20.0, 0.0],        # previous delay unknown
+        [22, 2, "mobile", 120.0, 999.0, 90.0],    # previous rental not in the table
+        [30, 3, "connect", 0.0, NAN, NAN],
+        [31, 3, "connect", 15.0, 30.0, 120.0],    # previous returned on time
+        [40, 4, "mobile", 200.0, NAN, NAN],
+        [41, 4, "mobile", 3.0, 40.0, 180.0],      # previous returned late
+        [42, 4, "mobile", NAN, 41.0, 60.0],       # previous returned late
+    ])
+    expected = merge_delay_impact(df)
+    assert list(expected["rental_id_current"]) == [11, 41, 42]
+    assert_frame_equal(delay_impact_data(df, max_hops=1), expected)
+
+
+def test_two_hop_chain():
+    df = rentals([
+        [1, 7, "mobile", 60.0, NAN, NAN],         # first rental of the car
+        [2, 7, "mobile", 10.0, 1.0, 30.0],
+        [3, 7, "connect", -5.0, 2.0, 0.0],
+        [4, 7, "mobile", 0.0, 3.0, 20.0],
+        [5, 8, "mobile", 30.0, 999.0, 60.0],      # previous rental not in the table
+    ])
+    chains = previous_rental_chains(df, max_hops=2)
+
+    assert list(chains["chain_length"]) == [0, 1, 2, 2, 0]
+    assert_frame_equal(
+        chains[["delay_at_checkout_in_minutes_from_previous_rental_1",
+                "delay_at_checkout_in_minutes_from_previous_rental_2"]],
+        pd.DataFrame({"delay_at_checkout_in_minutes_from_previous_rental_1": [NAN, 60.0, 10.0, -5.0, NAN],
+                      "delay_at_checkout_in_minutes_from_previous_rental_2": [NAN, NAN, 60.0, 10.0, NAN]}),
+    )
+    # Delay left after the time deltas of the rentals in between : rental 3 starts 0 min after
+    # rental 2, itself 30 min after rental 1 returned 60 min late
+    assert_frame_equal(
+        chains[["delay_propagated_from_previous_rental_1", "delay_propagated_from_previous_rental_2"]],
+        pd.DataFrame({"delay_propagated_from_previous_rental_1": [NAN, 30.0, 10.0, 0.0, NAN],
+                      "delay_propagated_from_previous_rental_2": [NAN, NAN, 30.0, 0.0, NAN]}),
+    )
+
+    # Only the rentals whose previous rental was late, with the same chain columns
+    impact = delay_impact_data(df, max_hops=2)
+    assert list(impact["rental_id_current"]) == [2, 3]
+    assert list(impact["chain_length"]) == [1, 2]
+    assert list(impact["delay_at_checkout_in_minutes_from_previous_rental"]) == [60.0, 10.0]
+    np.testing.assert_array_equal(impact["delay_at_checkout_in_minutes_from_previous_rental_2"], [NAN, 60.0])
+    assert list(impact["delay_propagated_from_previous_rental_1"]) == [30.0, 10.0]
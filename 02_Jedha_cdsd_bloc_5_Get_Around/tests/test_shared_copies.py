@@ -0,0 +1,6 @@
+import sync_shared
+
+
+def test_dashboard_copies_match_the_api():
+    # Run `python sync_shared.py` after changing gar_inference/ or the model in GAR_cdsd_pred
+    assert sync_shared.differences() == []
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from previous_rentals import delay_impact_data
+from threshold_simulator import simulate_thresholds
+
+NAN = np.nan
+THRESHOLDS = [0, 15, 30, 60, 120, 240]
+
+
+def test_affected_and_solved_per_threshold_and_scope():
+    df = pd.DataFrame([
+        [1, "mobile", "ended", 100.0, NAN, NAN],
+        [2, "mobile", "ended", 0.0, 1.0, 30.0],       # previous 100 min late for a 30 min delta : problem
+        [3, "connect", "ended", 50.0, NAN, NAN],
+        [4, "connect", "canceled", NAN, 3.0, 60.0],   # previous 50 min late for a 60 min delta : no problem
+        [5, "connect", "ended", 10.0, 6.0, 120.0],    # previous 200 min late : problem
+        [6, "connect", "ended", 200.0, NAN, NAN],
+        [7, "mobile", "canceled", 5.0, 2.0, 0.0],     # previous on time
+        [8, "mobile", "ended", 20.0, NAN, NAN],
+        [9, "connect", "ended", -5.0, 8.0, 15.0],     # previous 20 min late for a 15 min delta : problem
+    ], columns=["rental_id", "checkin_type", "state", "delay_at_checkout_in_minutes",
+                "previous_ended_rental_id", "time_delta_with_previous_rental_in_minutes"])
+
+    result = simulate_thresholds(df, delay_impact_data(df), THRESHOLDS).set_index(["scope", "threshold"])
+    all_cars, connect = result.loc["all"], result.loc["connect"]
+
+    # Rentals booked less than `threshold` min after the previous one : deltas 0, 15, 30, 60, 120
+    assert list(all_cars["rentals_affected"]) == [0, 1, 2, 3, 4, 5]
+    assert list(connect["rentals_affected"]) == [0, 0, 1, 1, 2, 3]
+    # Ended rentals among them (deltas 15, 30, 120 ; connect 15, 120), out of the 7 ended rentals
+    assert list(all_cars["revenue_share_lost_pct"]) == [0.0, 0.0, 14.29, 28.57, 28.57, 42.86]
+    assert list(connect["revenue_share_lost_pct"]) == [0.0, 0.0, 14.29, 14.29, 14.29, 28.57]
+
+    # Problem cases solved when the threshold covers the previous delay : 20, 100, 200 (connect : 20, 200)
+    assert set(all_cars["problem_cases"]) == {3} and set(connect["problem_cases"]) == {2}
+    assert list(all_cars["problem_cases_solved"]) == [0, 0, 1, 1, 2, 3]
+    assert list(connect["problem_cases_solved"]) == [0, 0, 1, 1, 1, 2]
+    assert list(all_cars["problem_cases_solved_pct"]) == [0.0, 0.0, 33.33, 33.33, 66.67, 100.0]
+    assert list(connect["problem_cases_solved_pct"]) == [0.0, 0.0, 50.0, 50.0, 50.0, 100.0]